@@ -0,0 +1,235 @@
+import itertools
+import math
+import os
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Union
+import numpy as np
+from .indicators import compute_indicators, rolling_moments, rsi
+from .patterns import CROSSOVER_SIGNALS, Hits, crossover_signals
+from .process_backend import SharedArrayHandle, _release, attach_array, share_array
+
+# Transaction cost per unit of position traded (5 basis points)
+DEFAULT_COST = 0.0005
+# Bars per year used to annualize the Sharpe ratio (daily bars)
+PERIODS_PER_YEAR = 252
+
+# Parameter grid strategy: (close, grid) -> positions of shape (len(grid),) + close.shape
+Strategy = Callable[[np.ndarray, Sequence[Mapping[str, Any]]], np.ndarray]
+
+def parameter_grid(**axes: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Every combination of the given parameter values"""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+def hold(events: np.ndarray) -> np.ndarray:
+    """Carry the latest non-zero event forward along the last axis (0 before the first)"""
+    events = np.asarray(events, dtype=np.float64)
+    positions = np.arange(events.shape[-1])
+    latest = np.maximum.accumulate(np.where(events != 0, positions, 0), axis=-1)
+    return np.take_along_axis(events, latest, axis=-1)
+
+def signal_positions(
+    hits: Mapping[str, Hits],
+    shape: Sequence[int],
+    directions: Mapping[str, str] = CROSSOVER_SIGNALS,
+    long_only: bool = False
+) -> np.ndarray:
+    """Positions that follow TechnicalAnalysisAgent signals
+
+    Takes the sparse hits of crossover_signals (or candlestick_patterns):
+    long after a bullish hit, short (flat if long_only) after a bearish one,
+    until the opposite signal. Opposing hits on the same bar cancel out.
+    """
+    events = np.zeros(int(np.prod(shape)))
+    for name, (at, _) in hits.items():
+        sign = {'bullish': 1.0, 'bearish': -1.0}.get(directions[name], 0.0)
+        if sign:
+            np.add.at(events, at, sign)
+    positions = hold(np.sign(events).reshape(shape))
+    return np.maximum(positions, 0.0) if long_only else positions
+
+def backtest(
+    close: np.ndarray,
+    positions: np.ndarray,
+    cost: float = DEFAULT_COST,
+    periods_per_year: int = PERIODS_PER_YEAR
+) -> Dict[str, np.ndarray]:
+    """Evaluate positions against close prices along the last axis
+
+    positions[t] is the holding chosen at the close of bar t, so it earns the
+    return from t to t + 1; every change of position pays cost per unit
+    traded. Leading axes of positions (parameter sets) broadcast against
+    close, which may itself be a (symbols x time) panel.
+
+    Returns:
+        Per series: 'pnl' (compounded net return), 'max_drawdown', 'hit_rate'
+        (share of invested bars with a positive net return), 'turnover'
+        (units traded), 'costs' (return paid in costs), 'exposure' (share of
+        bars invested) and annualized 'sharpe'
+    """
+    close = np.asarray(close, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64)
+    returns = np.zeros(close.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        np.divide(close[..., 1:], close[..., :-1], out=returns[..., 1:])
+    returns[..., 1:] -= 1.0
+    returns[~np.isfinite(returns)] = 0.0
+
+    held = np.zeros(np.broadcast_shapes(positions.shape, close.shape))
+    held[..., 1:] = np.nan_to_num(positions[..., :-1])
+    traded = np.abs(np.diff(held, axis=-1, prepend=0.0))
+    net = held * returns
+    net -= cost * traded
+
+    with np.errstate(divide='ignore'):
+        equity = np.exp(np.cumsum(np.log1p(net), axis=-1))
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=-1)
+    invested = held != 0
+    bars = close.shape[-1]
+    mean = net.mean(axis=-1) if bars else np.zeros(net.shape[:-1])
+    std = net.std(axis=-1) if bars else np.zeros(net.shape[:-1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hit_rate = (invested & (net > 0)).sum(axis=-1) / invested.sum(axis=-1)
+        sharpe = np.where(std > 0, mean / std * math.sqrt(periods_per_year), 0.0)
+    return {
+        'pnl': equity[..., -1] - 1.0 if bars else np.zeros(net.shape[:-1]),
+        'max_drawdown': (1.0 - equity / peak).max(axis=-1, initial=0.0),
+        'hit_rate': np.nan_to_num(hit_rate),
+        'turnover': traded.sum(axis=-1),
+        'costs': cost * traded.sum(axis=-1),
+        'exposure': invested.mean(axis=-1) if bars else np.zeros(net.shape[:-1]),
+        'sharpe': sharpe
+    }
+
+def sma_crossover_positions(close: np.ndarray, grid: Sequence[Mapping[str, Any]]) -> np.ndarray:
+    """Long while the 'fast' SMA is above the 'slow' one, else short (flat if 'long_only')
+
+    All windows in the grid share one rolling pass.
+    """
+    windows = sorted({int(params[key]) for params in grid for key in ('fast', 'slow')})
+    means, _ = rolling_moments(close, windows)
+    positions = np.empty((len(grid),) + np.shape(close))
+    for row, params in enumerate(grid):
+        np.sign(means[int(params['fast'])] - means[int(params['slow'])], out=positions[row])
+        if params.get('long_only', False):
+            np.maximum(positions[row], 0.0, out=positions[row])
+    return np.nan_to_num(positions, copy=False)
+
+def rsi_positions(close: np.ndarray, grid: Sequence[Mapping[str, Any]]) -> np.ndarray:
+    """Long once RSI leaves 'oversold', short (flat if 'long_only') once it leaves 'overbought'
+
+    RSI is computed once per distinct 'window' (default 14).
+    """
+    values = {window: rsi(close, window) for window in {int(params.get('window', 14)) for params in grid}}
+    positions = np.empty((len(grid),) + np.shape(close))
+    for row, params in enumerate(grid):
+        level = values[int(params.get('window', 14))]
+        events = np.zeros(level.shape)
+        previous, current = level[..., :-1], level[..., 1:]
+        events[..., 1:][(previous <= params['oversold']) & (current > params['oversold'])] = 1.0
+        events[..., 1:][(previous >= params['overbought']) & (current < params['overbought'])] = -1.0
+        positions[row] = hold(events)
+        if params.get('long_only', False):
+            np.maximum(positions[row], 0.0, out=positions[row])
+    return positions
+
+def agent_signal_positions(close: np.ndarray, grid: Sequence[Mapping[str, Any]]) -> np.ndarray:
+    """Follow the agent's crossover signals listed in 'signals' (default all)
+
+    Signals weaker than 'min_strength' are ignored. Indicators and signals are
+    computed once for the whole grid.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    hits = crossover_signals(close, compute_indicators(close))
+    positions = np.empty((len(grid),) + close.shape)
+    for row, params in enumerate(grid):
+        names = params.get('signals', list(CROSSOVER_SIGNALS))
+        min_strength = params.get('min_strength', 0.0)
+        selected = {
+            name: (hits[name][0][hits[name][1] >= min_strength], hits[name][1][hits[name][1] >= min_strength])
+            for name in names
+        }
+        positions[row] = signal_positions(selected, close.shape, long_only=params.get('long_only', False))
+    return positions
+
+# Built-in strategies, selectable by name in sweep
+STRATEGIES: Dict[str, Strategy] = {
+    'sma_crossover': sma_crossover_positions,
+    'rsi': rsi_positions,
+    'signals': agent_signal_positions
+}
+
+def _evaluate(
+    close: np.ndarray,
+    strategy: Union[str, Strategy],
+    grid: Sequence[Mapping[str, Any]],
+    cost: float,
+    periods_per_year: int
+) -> List[Dict[str, Any]]:
+    """Backtest one chunk of a parameter grid"""
+    if isinstance(strategy, str):
+        strategy = STRATEGIES[strategy]
+    metrics = backtest(close, strategy(close, grid), cost, periods_per_year)
+    return [
+        dict({'params': dict(params)}, **{key: values[row] for key, values in metrics.items()})
+        for row, params in enumerate(grid)
+    ]
+
+def _evaluate_shared(
+    handle: SharedArrayHandle,
+    strategy: Union[str, Strategy],
+    grid: Sequence[Mapping[str, Any]],
+    cost: float,
+    periods_per_year: int
+) -> List[Dict[str, Any]]:
+    """Backtest a grid chunk against close prices held in shared memory"""
+    shm, close = attach_array(handle)
+    try:
+        return _evaluate(close, strategy, grid, cost, periods_per_year)
+    finally:
+        del close
+        _release([shm])
+
+def sweep(
+    close: np.ndarray,
+    strategy: Union[str, Strategy],
+    grid: Sequence[Mapping[str, Any]],
+    cost: float = DEFAULT_COST,
+    periods_per_year: int = PERIODS_PER_YEAR,
+    executor: Optional[Executor] = None,
+    chunk_size: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Backtest a strategy over every parameter set in a grid
+
+    Args:
+        close: Close prices, (time,) or (symbols x time)
+        strategy: Name in STRATEGIES, or a module-level function mapping
+            (close, grid) to one position array per parameter set
+        grid: Parameter sets, e.g. from parameter_grid
+        cost: Transaction cost per unit of position traded
+        periods_per_year: Bars per year for the Sharpe ratio
+        executor: Optional ProcessPoolExecutor; chunks of the grid then run
+            in its workers, which read close from shared memory
+        chunk_size: Parameter sets evaluated together (bounds memory use)
+
+    Returns:
+        One record per parameter set, in grid order, with 'params' and the
+        metrics of backtest
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    grid = list(grid)
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(grid) // (os.cpu_count() or 1)))
+    chunks = [grid[start:start + chunk_size] for start in range(0, len(grid), chunk_size)]
+    if executor is None:
+        return [record for chunk in chunks for record in _evaluate(close, strategy, chunk, cost, periods_per_year)]
+
+    shm, handle = share_array(close)
+    try:
+        futures = [
+            executor.submit(_evaluate_shared, handle, strategy, chunk, cost, periods_per_year)
+            for chunk in chunks
+        ]
+        return [record for future in futures for record in future.result()]
+    finally:
+        _release([shm], unlink=True)
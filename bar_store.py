@@ -0,0 +1,195 @@
+import json
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from .price_data import REQUIRED_COLUMNS, to_price_frame
+
+# Column files per symbol; 'time' holds int64 UTC nanoseconds and is written last
+COLUMN_DTYPES = {
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'time': np.int64
+}
+
+# Loader: symbol (plus keyword arguments) -> OHLCV DataFrame with a time index
+Loader = Callable[..., pd.DataFrame]
+
+# Symbols name directories, so only ticker characters (BRK.B, ^GSPC, EURUSD=X, BTC-USD)
+_SYMBOL = re.compile(r'[A-Za-z0-9._^=-]+')
+
+def _is_valid_symbol(symbol: Any) -> bool:
+    # '.' and '..' would resolve outside the symbol's own directory
+    return isinstance(symbol, str) and bool(_SYMBOL.fullmatch(symbol)) and symbol.strip('.') != ''
+
+class BarStore:
+    """Append-only local OHLCV store with memory-mapped columnar files
+
+    Each symbol is a directory holding one raw binary file per column. Reads
+    memory-map the files, find a date range with a binary search on the
+    sorted time column and return views, so agents analyze the stored bars
+    without copying them. Appends only write bars newer than the last stored
+    one; the time column is written last, so a partially written append is
+    ignored by readers. Symbols are limited to ticker characters and raise
+    ValueError otherwise.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _directory(self, symbol: str) -> str:
+        if not _is_valid_symbol(symbol):
+            raise ValueError(f"Invalid symbol: {symbol!r}")
+        return os.path.join(self.root, symbol)
+
+    def _path(self, symbol: str, name: str) -> str:
+        return os.path.join(self._directory(symbol), name)
+
+    def __contains__(self, symbol: str) -> bool:
+        return os.path.exists(self._path(symbol, 'time'))
+
+    def __len__(self) -> int:
+        return len(self.symbols())
+
+    def symbols(self) -> List[str]:
+        """Symbols with stored bars"""
+        return sorted(name for name in os.listdir(self.root) if _is_valid_symbol(name) and name in self)
+
+    def _map(self, symbol: str, column: str, rows: Optional[int] = None) -> np.ndarray:
+        """Memory-map a column file read-only (empty files map to empty arrays)"""
+        path = self._path(symbol, column)
+        dtype = np.dtype(COLUMN_DTYPES[column])
+        available = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+        rows = available if rows is None else min(rows, available)
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(rows,))
+
+    def _timezone(self, symbol: str) -> Optional[str]:
+        path = self._path(symbol, 'meta.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f).get('tz')
+
+    def count(self, symbol: str) -> int:
+        """Number of stored bars for a symbol"""
+        return len(self._map(symbol, 'time')) if symbol in self else 0
+
+    def append(self, symbol: str, price_data: Any) -> int:
+        """Append bars newer than the last stored one and return how many were written
+
+        Accepts any price_data format with a time index (or time column).
+        """
+        df = to_price_frame(price_data)
+        if isinstance(df.index, pd.RangeIndex):
+            raise ValueError("Bars need a time index or a time column")
+        index = pd.DatetimeIndex(pd.to_datetime(df.index))
+        if not index.is_monotonic_increasing:
+            order = np.argsort(index.asi8, kind='stable')
+            df, index = df.iloc[order], index[order]
+        tz = str(index.tz) if index.tz is not None else None
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        times = index.as_unit('ns').asi8
+
+        os.makedirs(self._directory(symbol), exist_ok=True)
+        stored = self._map(symbol, 'time')
+        if len(stored):
+            keep = times > stored[-1]
+            times = times[keep]
+        else:
+            keep = slice(None)
+            with open(self._path(symbol, 'meta.json'), 'w') as f:
+                json.dump({'tz': tz}, f)
+        if len(times) == 0:
+            return 0
+        rows = len(stored)
+        del stored
+        for column in REQUIRED_COLUMNS:
+            values = np.ascontiguousarray(df[column].to_numpy(dtype=np.float64, na_value=np.nan)[keep])
+            self._write(symbol, column, values, rows)
+        self._write(symbol, 'time', np.ascontiguousarray(times), rows)
+        return len(times)
+
+    def _write(self, symbol: str, column: str, values: np.ndarray, rows: int) -> None:
+        """Append values after the first rows of a column, dropping any torn tail"""
+        path = self._path(symbol, column)
+        size = rows * np.dtype(COLUMN_DTYPES[column]).itemsize
+        if os.path.exists(path) and os.path.getsize(path) != size:
+            os.truncate(path, size)
+        with open(path, 'ab') as f:
+            values.astype(COLUMN_DTYPES[column], copy=False).tofile(f)
+
+    def ingest(self, symbol: str, loader: Loader, **kwargs: Any) -> int:
+        """Fetch bars with a loader and append the new ones"""
+        return self.append(symbol, loader(symbol, **kwargs))
+
+    def columns(
+        self,
+        symbol: str,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None
+    ) -> Dict[str, np.ndarray]:
+        """Memory-mapped column views of bars with start <= time < end
+
+        'time' holds int64 UTC nanoseconds.
+        """
+        if symbol not in self:
+            raise KeyError(f"No stored bars for {symbol}")
+        times = self._map(symbol, 'time')
+        first = 0 if start is None else int(np.searchsorted(times, self._nanoseconds(start), side='left'))
+        last = len(times) if end is None else int(np.searchsorted(times, self._nanoseconds(end), side='left'))
+        columns = {column: self._map(symbol, column, len(times))[first:last] for column in REQUIRED_COLUMNS}
+        columns['time'] = times[first:last]
+        return columns
+
+    def read(self, symbol: str, start: Optional[Any] = None, end: Optional[Any] = None) -> pd.DataFrame:
+        """Bars with start <= time < end as an OHLCV DataFrame over the mapped files"""
+        columns = self.columns(symbol, start, end)
+        index = pd.DatetimeIndex(columns.pop('time').view('datetime64[ns]'), name='date')
+        tz = self._timezone(symbol)
+        if tz is not None:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    @staticmethod
+    def _nanoseconds(value: Any) -> int:
+        timestamp = pd.Timestamp(value)
+        if timestamp.tz is not None:
+            timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+        return timestamp.as_unit('ns').value
+
+def yfinance_loader(symbol: str, **kwargs: Any) -> pd.DataFrame:
+    """Download bars with yfinance (keyword arguments go to Ticker.history)"""
+    try:
+        import yfinance as yf
+    except ImportError:
+        raise ImportError("yfinance is required to download bars; install it or use another loader")
+    return yf.Ticker(symbol).history(**kwargs)
+
+def random_walk_loader(
+    symbol: str,
+    periods: int = 252,
+    freq: str = 'B',
+    end: Optional[Any] = None,
+    seed: Optional[int] = None
+) -> pd.DataFrame:
+    """Generate geometric random-walk OHLCV bars, for offline runs and tests"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(end=pd.Timestamp(end or pd.Timestamp.now(tz='UTC').normalize()), periods=periods, freq=freq)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, periods)))
+    open_ = np.concatenate([[close[0]], close[:-1]]) * np.exp(rng.normal(0.0, 0.002, periods))
+    spread = np.abs(rng.normal(0.0, 0.005, periods))
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) * (1 + spread),
+        'low': np.minimum(open_, close) * (1 - spread),
+        'close': close,
+        'volume': rng.integers(100_000, 1_000_000, periods).astype(np.float64)
+    }, index=index)
@@ -1,26 +1,70 @@
+import asyncio
+import contextvars
+import functools
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional
 from pydantic import BaseModel
+from .instrumentation import instrument_process, timed_blocking
 
 class AgentResponse(BaseModel):
     """Base response model for all agents"""
     success: bool
     data: Dict[str, Any]
     error: Optional[str] = None
+    # Timings and resource usage, present when instrumentation is enabled
+    metrics: Optional[Dict[str, Any]] = None
 
 class BaseAgent(ABC):
     """Base class for all agents in the system"""
     
-    def __init__(self, name: str, description: str):
+    def __init__(self, name: str, description: str, executor: Optional[Executor] = None):
         self.name = name
         self.description = description
         self.context: Dict[str, Any] = {}
+        # Executor for blocking work; None means the event loop's default executor
+        self.executor = executor
+        self.instrumentation_enabled = False
+    
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # Wrap every process implementation with the opt-in instrumentation
+        process = cls.__dict__.get('process')
+        if process is not None and not getattr(process, '__instrumented__', False):
+            cls.process = instrument_process(process)
     
     @abstractmethod
     async def process(self, input_data: Dict[str, Any]) -> AgentResponse:
         """Process the input data and return results"""
         pass
     
+    def set_executor(self, executor: Optional[Executor]) -> None:
+        """Set the executor used for blocking (CPU- or model-bound) work"""
+        self.executor = executor
+    
+    def enable_instrumentation(self, enabled: bool = True) -> None:
+        """Record timings and resource usage in AgentResponse.metrics"""
+        self.instrumentation_enabled = enabled
+    
+    async def run_blocking(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking call on the agent's executor without stalling the event loop"""
+        loop = asyncio.get_running_loop()
+        # Carry the context over so instrumented sub-steps are recorded
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self.executor,
+            context.run,
+            timed_blocking(functools.partial(func, *args, **kwargs))
+        )
+    
+    def worker_options(self) -> Dict[str, Any]:
+        """Picklable settings to apply to copies of this agent in worker processes"""
+        return {}
+    
+    def cache_identity(self) -> Dict[str, Any]:
+        """Models and settings that change this agent's results, for result-cache keys"""
+        return self.worker_options()
+    
     def update_context(self, new_context: Dict[str, Any]) -> None:
         """Update the agent's context with new information"""
         self.context.update(new_context)
@@ -31,4 +75,4 @@ class BaseAgent(ABC):
     
     def clear_context(self) -> None:
         """Clear the agent's context"""
-        self.context = {} 
\ No newline at end of file
+        self.context = {}
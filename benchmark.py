@@ -0,0 +1,369 @@
+"""
+Offline benchmark suite for the agents and the orchestrator
+
+Uses synthetic data only (no yfinance or network access) and small, randomly
+initialized stand-ins for the FinBERT, BLIP and RoBERTa pipelines, so the
+numbers track the framework's own overhead rather than model quality.
+
+    python benchmark.py --output results.json
+    python benchmark.py --full --output results.json --baseline previous.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from PIL import Image
+from agents.chart_analysis_agent import ChartAnalysisAgent
+from agents.chart_qa_agent import ChartQAAgent
+from agents.orchestrator_agent import OrchestratorAgent
+from agents.report_generation_agent import ReportGenerationAgent
+from agents.sentiment_analysis_agent import SentimentAnalysisAgent
+from agents.technical_analysis_agent import TechnicalAnalysisAgent
+
+QUICK_BARS = [1_000, 10_000, 100_000]
+FULL_BARS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+QUICK_RESOLUTIONS = [(640, 480), (1280, 720)]
+FULL_RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080), (3840, 2160)]
+QUICK_CORPORA = [10, 100]
+FULL_CORPORA = [10, 100, 1_000]
+
+SUBJECTS = ["Apple", "Alphabet", "Microsoft", "the company", "the chipmaker", "the bank", "the retailer"]
+VERBS = ["beats", "misses", "raises", "cuts", "reaffirms", "withdraws"]
+OBJECTS = ["quarterly earnings estimates", "full-year guidance", "its dividend", "revenue forecasts", "margin targets"]
+CONTEXTS = ["as demand slows", "amid supply chain pressure", "after strong iPhone sales",
+            "on weaker ad spending", "as rates stay higher", "ahead of the Fed meeting"]
+
+# Synthetic data
+
+def generate_ohlcv(n_bars: int, seed: int = 0) -> pd.DataFrame:
+    """Generate a minute-bar OHLCV series from a geometric random walk"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0, 0.001, n_bars)
+    close = 100.0 * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0.0, 0.0005, n_bars)) * close
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.integers(1_000, 100_000, n_bars).astype(np.float64)
+    }, index=pd.date_range("2020-01-01", periods=n_bars, freq="min"))
+
+def render_chart(close: np.ndarray, width: int, height: int) -> Image.Image:
+    """Render a price line chart at the given pixel resolution"""
+    dpi = 100
+    fig = plt.figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    plt.plot(close)
+    plt.title("Synthetic Price")
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=dpi)
+    plt.close(fig)
+    buf.seek(0)
+    image = Image.open(buf)
+    image.load()
+    return image.convert('RGB')
+
+def generate_headlines(n_texts: int, seed: int = 0) -> List[str]:
+    """Generate a synthetic financial headline corpus"""
+    rng = np.random.default_rng(seed)
+    return [
+        f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(CONTEXTS)}"
+        for _ in range(n_texts)
+    ]
+
+# Model stand-ins
+
+def build_stub_pipelines() -> Dict[str, Any]:
+    """Build tiny randomly initialized FinBERT, BLIP and QA pipelines"""
+    import torch
+    from transformers import (
+        BertConfig, BertForQuestionAnswering, BertForSequenceClassification,
+        BertTokenizerFast, BlipConfig, BlipForConditionalGeneration,
+        BlipImageProcessor, pipeline
+    )
+    torch.manual_seed(0)
+
+    words = sorted({
+        word.lower().strip('.,')
+        for phrase in SUBJECTS + VERBS + OBJECTS + CONTEXTS
+        for word in phrase.split()
+    })
+    vocab = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + list('abcdefghijklmnopqrstuvwxyz0123456789') + words
+    vocab_dir = tempfile.mkdtemp(prefix="bench_vocab_")
+    vocab_file = os.path.join(vocab_dir, 'vocab.txt')
+    with open(vocab_file, 'w') as f:
+        f.write('\n'.join(vocab))
+    tokenizer = BertTokenizerFast(vocab_file=vocab_file)
+
+    bert = dict(
+        vocab_size=len(vocab),
+        hidden_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=128,
+        max_position_embeddings=512
+    )
+    labels = {0: 'positive', 1: 'negative', 2: 'neutral'}
+    sentiment_model = BertForSequenceClassification(BertConfig(
+        **bert,
+        num_labels=3,
+        id2label=labels,
+        label2id={label: i for i, label in labels.items()}
+    )).eval()
+    qa_model = BertForQuestionAnswering(BertConfig(**bert)).eval()
+    caption_model = BlipForConditionalGeneration(BlipConfig(
+        text_config=dict(
+            vocab_size=len(vocab), hidden_size=64, num_hidden_layers=1, num_attention_heads=2,
+            intermediate_size=128, bos_token_id=2, sep_token_id=3, pad_token_id=0,
+            max_position_embeddings=64
+        ),
+        vision_config=dict(
+            hidden_size=64, num_hidden_layers=1, num_attention_heads=2,
+            intermediate_size=128, image_size=64, patch_size=16
+        ),
+        projection_dim=64
+    )).eval()
+
+    return {
+        'sentiment': pipeline("sentiment-analysis", model=sentiment_model, tokenizer=tokenizer),
+        'qa': pipeline("question-answering", model=qa_model, tokenizer=tokenizer),
+        'caption': pipeline(
+            "image-to-text",
+            model=caption_model,
+            tokenizer=tokenizer,
+            image_processor=BlipImageProcessor(size={'height': 64, 'width': 64}),
+            max_new_tokens=8
+        )
+    }
+
+# Measurement
+
+async def measure(
+    name: str,
+    params: Dict[str, Any],
+    call: Callable[[], Awaitable[Any]],
+    repeats: int,
+    warmup: int = 1,
+    items_per_call: int = 1
+) -> Dict[str, Any]:
+    """Time repeated calls and measure peak traced memory of one extra call"""
+    for _ in range(warmup):
+        await call()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        call_start = time.perf_counter()
+        response = await call()
+        latencies.append(time.perf_counter() - call_start)
+        if hasattr(response, 'success') and not response.success:
+            raise RuntimeError(f"{name} failed: {response.error}")
+    total = time.perf_counter() - start
+
+    # Measured separately so tracing overhead does not skew the latencies
+    tracemalloc.start()
+    await call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    result = {
+        'benchmark': name,
+        'params': params,
+        'repeats': repeats,
+        'latency_mean': statistics.fmean(latencies),
+        'latency_p50': _percentile(latencies, 50),
+        'latency_p90': _percentile(latencies, 90),
+        'latency_p99': _percentile(latencies, 99),
+        'throughput': repeats * items_per_call / total if total > 0 else float('inf'),
+        'peak_memory': peak
+    }
+    print(
+        f"{name:<22} {json.dumps(params):<36} "
+        f"p50={result['latency_p50'] * 1e3:9.2f}ms p99={result['latency_p99'] * 1e3:9.2f}ms "
+        f"{result['throughput']:9.1f}/s peak={peak / 2 ** 20:8.1f}MiB"
+    )
+    return result
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Percentile with linear interpolation over sorted values"""
+    return float(np.percentile(sorted_values, q)) if sorted_values else 0.0
+
+def _repeats_for(n_items: int, base: int) -> int:
+    """Use fewer repeats for large inputs"""
+    if n_items >= 1_000_000:
+        return 1
+    if n_items >= 100_000:
+        return max(2, base // 4)
+    return base
+
+async def run_suite(
+    bars: List[int],
+    resolutions: List[Tuple[int, int]],
+    corpora: List[int],
+    repeats: int,
+    concurrency: int
+) -> List[Dict[str, Any]]:
+    """Benchmark every agent and the orchestrator end to end"""
+    stubs = build_stub_pipelines()
+    results = []
+
+    technical = TechnicalAnalysisAgent()
+    for n_bars in bars:
+        df = generate_ohlcv(n_bars)
+        results.append(await measure(
+            'technical_analysis', {'bars': n_bars},
+            lambda: technical.process({'price_data': df}),
+            _repeats_for(n_bars, repeats)
+        ))
+        del df
+
+    chart = ChartAnalysisAgent()
+    close = generate_ohlcv(2_000)['close'].to_numpy()
+    images = {resolution: render_chart(close, *resolution) for resolution in resolutions}
+    for (width, height), image in images.items():
+        results.append(await measure(
+            'chart_analysis', {'width': width, 'height': height},
+            lambda: chart.process({'image': image}),
+            repeats
+        ))
+
+    sentiment = SentimentAnalysisAgent(sentiment_analyzer=stubs['sentiment'])
+    for n_texts in corpora:
+        texts = generate_headlines(n_texts)
+        results.append(await measure(
+            'sentiment_analysis', {'texts': n_texts},
+            lambda: sentiment.process({'text_data': texts}),
+            repeats
+        ))
+
+    quantized = SentimentAnalysisAgent(sentiment_analyzer=stubs['sentiment'], backend='int8')
+    for n_texts in corpora:
+        texts = generate_headlines(n_texts)
+        results.append(await measure(
+            'sentiment_analysis', {'texts': n_texts, 'backend': 'int8'},
+            lambda: quantized.process({'text_data': texts}),
+            repeats
+        ))
+
+    chart_qa = ChartQAAgent(chart_analyzer=stubs['caption'], qa_model=stubs['qa'])
+    smallest = images[resolutions[0]]
+    results.append(await measure(
+        'chart_qa', {'width': resolutions[0][0], 'height': resolutions[0][1]},
+        lambda: chart_qa.process({'chart_image': smallest, 'question': "What is the overall trend?"}),
+        repeats
+    ))
+
+    report = ReportGenerationAgent()
+    analysis = {
+        'chart_analysis': (await chart.process({'image': smallest})).data,
+        'technical_analysis': (await technical.process({'price_data': generate_ohlcv(bars[0])})).data,
+        'sentiment_analysis': (await sentiment.process({'text_data': generate_headlines(corpora[0])})).data
+    }
+    results.append(await measure(
+        'report_generation', {},
+        lambda: report.process(analysis),
+        repeats
+    ))
+
+    orchestrator = OrchestratorAgent(sentiment_agent=sentiment)
+    n_bars = bars[min(1, len(bars) - 1)]
+    request = {
+        'chart_data': smallest,
+        'price_data': generate_ohlcv(n_bars),
+        'text_data': generate_headlines(corpora[0])
+    }
+    results.append(await measure(
+        'orchestrator', {'bars': n_bars, 'texts': corpora[0]},
+        lambda: orchestrator.process(request),
+        repeats
+    ))
+
+    batch = [dict(request) for _ in range(concurrency * 4)]
+    results.append(await measure(
+        'orchestrator_batch', {'bars': n_bars, 'requests': len(batch), 'concurrency': concurrency},
+        lambda: orchestrator.process_many(batch, max_concurrency=concurrency),
+        max(1, repeats // 4),
+        items_per_call=len(batch)
+    ))
+
+    return results
+
+# Reporting
+
+def environment() -> Dict[str, Any]:
+    """Describe the environment the benchmarks ran in"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__
+    }
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any]) -> None:
+    """Print latency and memory changes against a previous results file"""
+    previous = {
+        (entry['benchmark'], json.dumps(entry['params'], sort_keys=True)): entry
+        for entry in baseline.get('results', [])
+    }
+    print(f"\nComparison with {baseline.get('environment', {}).get('commit')}:")
+    for entry in results:
+        key = (entry['benchmark'], json.dumps(entry['params'], sort_keys=True))
+        old = previous.get(key)
+        if old is None:
+            continue
+        latency = (entry['latency_p50'] / old['latency_p50'] - 1) * 100 if old['latency_p50'] else 0.0
+        memory = (entry['peak_memory'] / old['peak_memory'] - 1) * 100 if old['peak_memory'] else 0.0
+        print(f"{entry['benchmark']:<22} {key[1]:<36} p50 {latency:+7.1f}%  peak memory {memory:+7.1f}%")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the analysis agents")
+    parser.add_argument('--full', action='store_true', help="Include 1M and 10M bars and 4K charts")
+    parser.add_argument('--bars', type=int, nargs='+', help="OHLCV series lengths to benchmark")
+    parser.add_argument('--repeats', type=int, default=10, help="Timed calls per benchmark")
+    parser.add_argument('--concurrency', type=int, default=4, help="Concurrency for the batch benchmark")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--baseline', help="Compare against a previous JSON results file")
+    args = parser.parse_args()
+
+    bars = args.bars or (FULL_BARS if args.full else QUICK_BARS)
+    resolutions = FULL_RESOLUTIONS if args.full else QUICK_RESOLUTIONS
+    corpora = FULL_CORPORA if args.full else QUICK_CORPORA
+
+    results = asyncio.run(run_suite(bars, resolutions, corpora, args.repeats, args.concurrency))
+    report = {'environment': environment(), 'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import cv2
 import numpy as np
 from PIL import Image
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .base_agent import BaseAgent, AgentResponse
+from .instrumentation import timed_step
 
 class ChartAnalysisAgent(BaseAgent):
     """Agent responsible for visual analysis of financial charts"""
@@ -12,20 +13,22 @@ class ChartAnalysisAgent(BaseAgent):
             name="ChartAnalysisAgent",
             description="Analyzes financial charts for visual patterns and key elements"
         )
+        # Optional ProcessPoolBackend for running analysis in worker processes
+        self.process_backend: Optional[Any] = None
         
     async def process(self, input_data: Dict[str, Any]) -> AgentResponse:
         try:
             # Extract image data
             image_data = input_data.get('image')
-            if not image_data:
+            if image_data is None:
                 return AgentResponse(
                     success=False,
                     data={},
                     error="No image data provided"
                 )
             
-            # Convert image data to numpy array
-            image = self._preprocess_image(image_data)
+            # Convert image data to numpy array (off the event loop)
+            image = await self.run_blocking(self._preprocess_image, image_data)
             
             # Perform visual analysis
             analysis_results = await self._analyze_chart(image)
@@ -42,6 +45,11 @@ class ChartAnalysisAgent(BaseAgent):
                 error=str(e)
             )
     
+    def set_process_backend(self, backend: Optional[Any]) -> None:
+        """Run the CPU-bound analysis in worker processes (None runs in-process)"""
+        self.process_backend = backend
+    
+    @timed_step
     def _preprocess_image(self, image_data: Any) -> np.ndarray:
         """Preprocess the input image for analysis"""
         if isinstance(image_data, str):  # If image path is provided
@@ -60,6 +68,12 @@ class ChartAnalysisAgent(BaseAgent):
     
     async def _analyze_chart(self, image: np.ndarray) -> Dict[str, Any]:
         """Analyze the chart for patterns and key elements"""
+        if self.process_backend is not None:
+            return await self.process_backend.analyze_image(self, image)
+        return await self.run_blocking(self._run_analysis, image)
+    
+    def _run_analysis(self, image: np.ndarray) -> Dict[str, Any]:
+        """Run the blocking OpenCV analysis steps"""
         results = {
             'patterns': self._detect_patterns(image),
             'key_levels': self._detect_key_levels(image),
@@ -68,21 +82,25 @@ class ChartAnalysisAgent(BaseAgent):
         }
         return results
     
+    @timed_step
     def _detect_patterns(self, image: np.ndarray) -> List[Dict[str, Any]]:
         """Detect chart patterns like head and shoulders, double tops/bottoms"""
         # TODO: Implement pattern detection using computer vision techniques
         return []
     
+    @timed_step
     def _detect_key_levels(self, image: np.ndarray) -> List[Dict[str, Any]]:
         """Detect support and resistance levels"""
         # TODO: Implement key level detection
         return []
     
+    @timed_step
     def _detect_trend_lines(self, image: np.ndarray) -> List[Dict[str, Any]]:
         """Detect trend lines in the chart"""
         # TODO: Implement trend line detection
         return []
     
+    @timed_step
     def _analyze_volume_profile(self, image: np.ndarray) -> Dict[str, Any]:
         """Analyze volume profile of the chart"""
         # TODO: Implement volume profile analysis
@@ -2,27 +2,47 @@ import cv2
 import numpy as np
 from PIL import Image
 from typing import Dict, Any, List, Optional
-from transformers import pipeline
 from .base_agent import BaseAgent, AgentResponse
+from .inference_backends import with_backend
+from .model_registry import ModelRegistry, default_registry, model_identity
 
 class ChartQAAgent(BaseAgent):
     """Agent responsible for understanding financial charts and answering questions"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        chart_analyzer: Optional[Any] = None,
+        qa_model: Optional[Any] = None,
+        model_registry: Optional[ModelRegistry] = None,
+        backend: str = 'fp32'
+    ):
         super().__init__(
             name="ChartQAAgent",
             description="Understands financial charts and answers questions about them"
         )
-        # Initialize vision-language model for chart understanding
-        self.chart_analyzer = pipeline(
-            "image-to-text",
-            model="Salesforce/blip-image-captioning-base"
-        )
-        # Initialize question-answering model
-        self.qa_model = pipeline(
-            "question-answering",
-            model="deepset/roberta-base-squad2"
-        )
+        registry = model_registry or default_registry
+        # Vision-language model for chart understanding (shared, loaded on first use)
+        if chart_analyzer is None:
+            chart_analyzer = registry.lazy('chart_captioning')
+        self.chart_analyzer = chart_analyzer
+        # Question-answering model (shared, loaded on first use) on the
+        # fp32, int8 or ONNX Runtime backend
+        if qa_model is None:
+            qa_model = registry.lazy('question_answering', backend)
+        else:
+            qa_model = with_backend(qa_model, backend)
+        self.qa_model = qa_model
+        self.backend = backend
+    
+    def worker_options(self) -> Dict[str, Any]:
+        return {'backend': self.backend}
+    
+    def cache_identity(self) -> Dict[str, Any]:
+        return {
+            **self.worker_options(),
+            'chart_model': model_identity(self.chart_analyzer),
+            'qa_model': model_identity(self.qa_model)
+        }
         
     async def process(self, input_data: Dict[str, Any]) -> AgentResponse:
         try:
@@ -30,7 +50,7 @@ class ChartQAAgent(BaseAgent):
             chart_image = input_data.get('chart_image')
             question = input_data.get('question')
             
-            if not chart_image or not question:
+            if chart_image is None or not question:
                 return AgentResponse(
                     success=False,
                     data={},
@@ -58,6 +78,11 @@ class ChartQAAgent(BaseAgent):
         question: str
     ) -> Dict[str, Any]:
         """Analyze chart and answer the question"""
+        # BLIP and RoBERTa inference block, so run them off the event loop
+        return await self.run_blocking(self._run_analysis, chart_image, question)
+    
+    def _run_analysis(self, chart_image: Any, question: str) -> Dict[str, Any]:
+        """Run the blocking chart analysis and question answering steps"""
         # Preprocess chart image
         processed_image = self._preprocess_image(chart_image)
         
@@ -114,6 +139,10 @@ class ChartQAAgent(BaseAgent):
     
     def _generate_chart_description(self, image: Any) -> str:
         """Generate a natural language description of the chart"""
+        # The image-to-text pipeline expects PIL images, not raw arrays
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        
         # Use vision-language model to generate description
         description = self.chart_analyzer(image)[0]['generated_text']
         return description
@@ -1,8 +1,8 @@
 import asyncio
 from PIL import Image
 import matplotlib.pyplot as plt
-import yfinance as yf
 import io
+from agents.bar_store import BarStore, yfinance_loader
 from agents.chart_qa_agent import ChartQAAgent
 
 async def analyze_chart_and_qa(symbol: str, period: str = "1y"):
@@ -11,18 +11,21 @@ async def analyze_chart_and_qa(symbol: str, period: str = "1y"):
     
     Args:
         symbol (str): Stock symbol (e.g., "AAPL" for Apple)
-        period (str): Time period for analysis (e.g., "1y", "6mo", "1mo")
+        period (str): Time period downloaded if the symbol is not stored yet
+            (e.g., "1y", "6mo", "1mo")
     """
     # Initialize the Chart QA Agent
     chart_qa_agent = ChartQAAgent()
     
-    # Get historical price data
-    stock = yf.Ticker(symbol)
-    hist = stock.history(period=period)
+    # Get historical price data from the local bar store (downloaded only once)
+    store = BarStore("data/bars")
+    if symbol not in store:
+        store.ingest(symbol, yfinance_loader, period=period)
+    hist = store.read(symbol)
     
     # Create a price chart
     plt.figure(figsize=(12, 6))
-    plt.plot(hist.index, hist['Close'])
+    plt.plot(hist.index, hist['close'])
     plt.title(f"{symbol} Stock Price")
     plt.xlabel("Date")
     plt.ylabel("Price")
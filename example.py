@@ -3,27 +3,28 @@ import yfinance as yf
 from PIL import Image
 import io
 import matplotlib.pyplot as plt
+from agents.bar_store import BarStore, yfinance_loader
 from agents.orchestrator_agent import OrchestratorAgent
 import pandas as pd
 
-async def analyze_stock(symbol: str, period: str = "1y"):
+def build_input(store: BarStore, symbol: str, period: str = "1y"):
     """
-    Analyze a stock using the multi-agent framework
+    Build the orchestrator input for a stock
     
     Args:
+        store (BarStore): Local bar store holding the price history
         symbol (str): Stock symbol (e.g., "AAPL" for Apple)
-        period (str): Time period for analysis (e.g., "1y", "6mo", "1mo")
+        period (str): Time period downloaded if the symbol is not stored yet
+            (e.g., "1y", "6mo", "1mo")
     """
-    # Initialize the orchestrator agent
-    orchestrator = OrchestratorAgent()
-    
-    # Get historical price data
-    stock = yf.Ticker(symbol)
-    hist = stock.history(period=period)
+    # Get historical price data from the local store (downloaded only once)
+    if symbol not in store:
+        store.ingest(symbol, yfinance_loader, period=period)
+    hist = store.read(symbol)
     
     # Create a price chart
     plt.figure(figsize=(12, 6))
-    plt.plot(hist.index, hist['Close'])
+    plt.plot(hist.index, hist['close'])
     plt.title(f"{symbol} Stock Price")
     plt.xlabel("Date")
     plt.ylabel("Price")
@@ -31,11 +32,12 @@ async def analyze_stock(symbol: str, period: str = "1y"):
     # Convert plot to image
     buf = io.BytesIO()
     plt.savefig(buf, format='png')
+    plt.close()
     buf.seek(0)
     chart_image = Image.open(buf)
     
     # Get news articles
-    news = stock.news
+    news = yf.Ticker(symbol).news
     news_texts = []
     for article in news[:5]:
         if isinstance(article, dict):
@@ -44,15 +46,14 @@ async def analyze_stock(symbol: str, period: str = "1y"):
             news_texts.append(f"{title} {summary}")
     
     # Prepare input data
-    input_data = {
+    return {
         'chart_data': chart_image,
-        'price_data': hist.to_dict('records'),
+        'price_data': hist,
         'text_data': news_texts if news_texts else [f"Analysis for {symbol} stock"]
     }
-    
-    # Run analysis
-    result = await orchestrator.process(input_data)
-    
+
+def print_results(symbol: str, result):
+    """Print the analysis results for a stock"""
     if result.success:
         print(f"\nAnalysis Results for {symbol}:")
         print("-----------------")
@@ -89,14 +90,23 @@ async def analyze_stock(symbol: str, period: str = "1y"):
         print(f"Overall Risk Level: {risk_assessment.get('overall_risk_level')}")
         
     else:
-        print("Error:", result.error)
+        print(f"Error for {symbol}:", result.error)
 
 async def main():
-    # Example: Analyze multiple stocks
+    # Example: Analyze multiple stocks with one shared set of agents,
+    # so FinBERT is loaded once for the whole watchlist
+    orchestrator = OrchestratorAgent()
+    
+    store = BarStore("data/bars")
     stocks = ["AAPL", "GOOGL", "MSFT"]
+    inputs = {}
     for symbol in stocks:
-        print(f"\nAnalyzing {symbol}...")
-        await analyze_stock(symbol)
+        print(f"\nPreparing {symbol}...")
+        inputs[symbol] = build_input(store, symbol)
+    
+    results = await orchestrator.process_many(inputs, max_concurrency=4)
+    for symbol, result in results.items():
+        print_results(symbol, result)
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main())
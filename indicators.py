@@ -0,0 +1,532 @@
+import math
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Values per block of the blocked rolling sums; bounds rounding error growth
+_ROLLING_BLOCK = 1024
+# Largest weight growth allowed inside one segment of the blocked EMA
+_EMA_MAX_GROWTH = 1e12
+
+# Bars fitted when determining the current trend
+TREND_WINDOW = 50
+# Fit quality below which a trend is reported as neutral
+TREND_MIN_R_SQUARED = 0.3
+
+# Names the ta library gives each indicator series
+SERIES_NAMES = {
+    'sma_20': 'sma_20',
+    'sma_50': 'sma_50',
+    'ema_20': 'ema_20',
+    'macd': 'MACD_12_26',
+    'macd_signal': 'MACD_sign_12_26',
+    'macd_diff': 'MACD_diff_12_26',
+    'rsi': 'rsi',
+    'bb_high': 'hband',
+    'bb_low': 'lband',
+    'bb_mid': 'mavg'
+}
+
+def span_alpha(span: int) -> float:
+    """Smoothing factor of an EMA with the given span"""
+    return 2.0 / (span + 1.0)
+
+def ema(values: np.ndarray, alpha: float, min_periods: int = 1) -> np.ndarray:
+    """Exponential moving average along the last axis, seeded with the first value
+
+    Matches pandas ewm(alpha=alpha, adjust=False). The recurrence
+    y[t] = (1 - alpha) * y[t-1] + alpha * x[t] is evaluated in fixed-length
+    segments as a scaled cumulative sum, and each segment's starting value is
+    carried in from the end of the previous one.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not 0.0 < alpha < 1.0:
+        raise ValueError("alpha must be between 0 and 1")
+    n = values.shape[-1]
+    if n == 0:
+        return values.copy()
+    decay = 1.0 - alpha
+    # Segment length keeps decay ** -length within _EMA_MAX_GROWTH
+    length = int(min(n, max(1, math.log(_EMA_MAX_GROWTH) // -math.log(decay))))
+    blocks = -(-n // length)
+    lead_shape = values.shape[:-1]
+
+    segments = np.zeros(lead_shape + (blocks * length,))
+    segments[..., :n] = values
+    segments = segments.reshape(lead_shape + (blocks, length))
+    powers = decay ** np.arange(1, length + 1)
+
+    # EMA of each segment as if it started from zero
+    segments *= alpha / powers
+    np.cumsum(segments, axis=-1, out=segments)
+    segments *= powers
+
+    # Value carried into each segment; y[-1] = x[0] seeds the first one
+    carry = np.empty(lead_shape + (blocks,))
+    carry[..., 0] = values[..., 0]
+    carry[..., 1:] = segments[..., :-1, -1]
+    segment_decay = powers[-1]
+    if blocks > 1 and segment_decay > 0.0:
+        # carry[j] = end[j-1] + segment_decay * carry[j-1], truncated once
+        # segment_decay ** k is far below double precision
+        terms = min(blocks - 1, max(1, math.ceil(-40.0 / math.log10(segment_decay))))
+        increments = carry.copy()
+        for k in range(1, terms + 1):
+            carry[..., k:] += segment_decay ** k * increments[..., :-k]
+    segments += powers * carry[..., None]
+
+    result = segments.reshape(lead_shape + (blocks * length,))[..., :n]
+    result[..., :max(0, min_periods - 1)] = np.nan
+    return result
+
+def _zero_flat_windows(
+    values: np.ndarray,
+    std: np.ndarray,
+    window: int,
+    candidates: np.ndarray
+) -> None:
+    """Set the deviation of windows holding a single repeated value to exactly zero"""
+    positions = np.nonzero(candidates & (np.arange(values.shape[-1]) >= window - 1))
+    if len(positions[-1]) == 0:
+        return
+    windows = sliding_window_view(values, window, axis=-1)
+    ends = positions[:-1] + (positions[-1] - (window - 1),)
+    selected = windows[ends]
+    flat = (selected == selected[..., :1]).all(axis=-1)
+    std[tuple(axis[flat] for axis in positions)] = 0.0
+
+def rolling_moments(
+    values: np.ndarray,
+    windows: Sequence[int],
+    std_windows: Sequence[int] = ()
+) -> Tuple[Dict[int, np.ndarray], Dict[int, np.ndarray]]:
+    """Rolling means and population standard deviations along the last axis
+
+    All windows share one pass: values are split into blocks centred on each
+    block's first value, and every window's sums are differences of the same
+    cumulative sums, which keeps rounding error bounded by the block length.
+    Positions before a full window are NaN, as with pandas min_periods.
+
+    Returns:
+        Means keyed by window (for windows and std_windows) and standard
+        deviations keyed by window (for std_windows)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[-1]
+    lead_shape = values.shape[:-1]
+    all_windows = list(dict.fromkeys(list(windows) + list(std_windows)))
+    smallest, largest = min(all_windows), max(all_windows)
+    if smallest < 1:
+        raise ValueError("windows must be positive")
+    if n < smallest:
+        empty = lambda: np.full(values.shape, np.nan)
+        return {w: empty() for w in all_windows}, {w: empty() for w in std_windows}
+
+    # Outputs start at the end of the first full window of the smallest size;
+    # leading padding lets larger windows use the same blocks (and is masked)
+    count = n - smallest + 1
+    block = min(_ROLLING_BLOCK, count)
+    blocks = -(-count // block)
+    lead = largest - smallest
+    tail = blocks * block + largest - 1 - lead - n
+    padded = np.pad(values, [(0, 0)] * len(lead_shape) + [(lead, tail)], mode='edge')
+
+    segments = sliding_window_view(padded, block + largest - 1, axis=-1)[..., ::block, :]
+    centers = segments[..., :1]
+    centered = segments - centers
+    sums = np.zeros(lead_shape + (blocks, block + largest))
+    np.cumsum(centered, axis=-1, out=sums[..., 1:])
+    if std_windows:
+        centered *= centered
+        squares = np.zeros(lead_shape + (blocks, block + largest))
+        np.cumsum(centered, axis=-1, out=squares[..., 1:])
+        # Below this a window's variance is indistinguishable from rounding
+        tolerance = 1e-10 * squares[..., -1:]
+    del centered
+
+    def output() -> Tuple[np.ndarray, np.ndarray]:
+        # Results are written into place as (blocks, block) and viewed as (n,)
+        full = np.empty(lead_shape + (smallest - 1 + blocks * block,))
+        body = full[..., smallest - 1:].reshape(lead_shape + (blocks, block))
+        return full[..., :n], body
+
+    means: Dict[int, np.ndarray] = {}
+    stds: Dict[int, np.ndarray] = {}
+    for window in all_windows:
+        start = largest - window
+        mean, window_mean = output()
+        np.subtract(sums[..., largest:], sums[..., start:start + block], out=window_mean)
+        window_mean /= window
+
+        if window in std_windows:
+            std, variance = output()
+            np.subtract(squares[..., largest:], squares[..., start:start + block], out=variance)
+            variance /= window
+            variance -= window_mean * window_mean
+            np.maximum(variance, 0.0, out=variance)
+            candidates = (variance <= tolerance).reshape(lead_shape + (-1,))[..., :count]
+            np.sqrt(variance, out=variance)
+            std[..., :window - 1] = np.nan
+            flat = np.zeros(values.shape, dtype=bool)
+            flat[..., smallest - 1:] = candidates
+            _zero_flat_windows(values, std, window, flat)
+            stds[window] = std
+
+        window_mean += centers
+        mean[..., :window - 1] = np.nan
+        means[window] = mean
+    return means, stds
+
+def rolling_mean_std(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Rolling mean and population standard deviation over full windows"""
+    means, stds = rolling_moments(values, [], [window])
+    return means[window], stds[window]
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Relative Strength Index along the last axis, matching ta's RSIIndicator"""
+    close = np.asarray(close, dtype=np.float64)
+    diff = np.zeros(close.shape)
+    np.subtract(close[..., 1:], close[..., :-1], out=diff[..., 1:])
+    up = ema(np.maximum(diff, 0.0), 1.0 / window, window)
+    np.negative(diff, out=diff)
+    np.maximum(diff, 0.0, out=diff)
+    down = ema(diff, 1.0 / window, window)
+    no_losses = down == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 100 - 100 / (1 + up / down), computed in place
+        up /= down
+        up += 1.0
+        np.divide(100.0, up, out=up)
+        np.subtract(100.0, up, out=up)
+    up[no_losses] = 100.0
+    return up
+
+def compute_indicators(close: np.ndarray) -> Dict[str, np.ndarray]:
+    """Compute every default indicator of TechnicalAnalysisAgent in one pass
+
+    Matches the ta library defaults (SMA 20/50, EMA 20, MACD 12/26/9, RSI 14,
+    Bollinger Bands 20/2) along the last axis of a finite close array. The
+    rolling sums are shared between sma_20, sma_50 and the bands, and the
+    MACD line is built from the fast and slow EMAs directly.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    indicators: Dict[str, np.ndarray] = {}
+
+    means, stds = rolling_moments(close, [50], [20])
+    mean_20, std_20 = means[20], stds[20]
+    indicators['sma_20'] = mean_20
+    indicators['sma_50'] = means[50]
+    indicators['ema_20'] = ema(close, span_alpha(20), 20)
+
+    macd = ema(close, span_alpha(12), 12)
+    macd -= ema(close, span_alpha(26), 26)
+    # The signal line starts at the first defined MACD value
+    signal = np.full(close.shape, np.nan)
+    start = 25
+    if close.shape[-1] > start:
+        signal[..., start:] = ema(macd[..., start:], span_alpha(9), 9)
+    indicators['macd'] = macd
+    indicators['macd_signal'] = signal
+    indicators['macd_diff'] = macd - signal
+
+    indicators['rsi'] = rsi(close, 14)
+
+    band = 2 * std_20
+    indicators['bb_high'] = mean_20 + band
+    indicators['bb_low'] = mean_20 - band
+    indicators['bb_mid'] = mean_20.copy()
+    return indicators
+
+class IndicatorBlock(Mapping):
+    """Indicators held as one float32 (indicators x time) block
+
+    Behaves as a read-only mapping of indicator name to a pandas Series (a view
+    of its row), so code written against the Series output keeps working,
+    while the block pickles and serializes at a fraction of the size.
+    """
+
+    def __init__(self, values: np.ndarray, names: Sequence[str], index: pd.Index):
+        if values.shape != (len(names), len(index)):
+            raise ValueError(f"Block of shape {values.shape} does not match {len(names)} names and {len(index)} bars")
+        self.values = values
+        self.names = list(names)
+        self.index = index
+        self._rows = {name: row for row, name in enumerate(self.names)}
+
+    @classmethod
+    def from_arrays(
+        cls,
+        indicators: Mapping[str, np.ndarray],
+        index: pd.Index,
+        window: Optional[int] = None
+    ) -> "IndicatorBlock":
+        """Pack full-length indicator arrays, keeping only the last `window` bars"""
+        start = 0 if window is None else max(0, len(index) - window)
+        values = np.empty((len(indicators), len(index) - start), dtype=np.float32)
+        for row, series in enumerate(indicators.values()):
+            values[row] = np.asarray(series)[start:]
+        return cls(values, list(indicators), index[start:])
+
+    def __getitem__(self, name: str) -> pd.Series:
+        return pd.Series(
+            self.values[self._rows[name]],
+            index=self.index,
+            name=SERIES_NAMES.get(name, name),
+            copy=False
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __repr__(self) -> str:
+        return f"IndicatorBlock({len(self.names)} indicators x {len(self.index)} bars)"
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the indicator values in bytes"""
+        return self.values.nbytes
+
+    def latest(self) -> Dict[str, float]:
+        """Value of every indicator at the last bar"""
+        if len(self.index) == 0:
+            return {name: math.nan for name in self.names}
+        return {name: float(value) for name, value in zip(self.names, self.values[:, -1])}
+
+    def tail(self, window: int) -> "IndicatorBlock":
+        """View of the last `window` bars"""
+        start = max(0, len(self.index) - window)
+        return IndicatorBlock(self.values[:, start:], self.names, self.index[start:])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Indicators as a (time x indicators) DataFrame"""
+        return pd.DataFrame(self.values.T, index=self.index, columns=self.names)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain index and per-indicator arrays, for serialization"""
+        return {
+            'index': self.index,
+            'indicators': {name: self.values[row] for row, name in enumerate(self.names)}
+        }
+
+def volatility(close: np.ndarray) -> np.ndarray:
+    """Sample standard deviation of bar-to-bar returns along the last axis
+
+    Missing closes are skipped, as with pandas pct_change().std(); fewer than
+    two returns gives NaN.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = close[..., 1:] / close[..., :-1] - 1.0
+    returns[~np.isfinite(returns)] = np.nan
+    valid = np.count_nonzero(~np.isnan(returns), axis=-1)
+    result = np.full(close.shape[:-1], np.nan)
+    enough = valid >= 2
+    if np.any(enough):
+        result[enough] = np.nanstd(returns[enough], axis=-1, ddof=1)
+    return result[()]
+
+def trend_statistics(close: np.ndarray, window: int = TREND_WINDOW) -> Tuple[np.ndarray, np.ndarray]:
+    """Least-squares slope and R-squared of the last `window` closes (last axis)
+
+    The slope is relative to the mean close, in fractions per bar. Missing
+    closes are left out of the fit; fewer than three points gives NaN.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    recent = close[..., -window:]
+    valid = ~np.isnan(recent)
+    count = valid.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        level = np.nansum(recent, axis=-1) / count
+        y = np.where(valid, recent - level[..., None], 0.0)
+        x = np.where(valid, np.arange(recent.shape[-1], dtype=np.float64), 0.0)
+        x -= (x.sum(axis=-1) / count)[..., None]
+        x[~valid] = 0.0
+        sxx = (x * x).sum(axis=-1)
+        syy = (y * y).sum(axis=-1)
+        sxy = (x * y).sum(axis=-1)
+        slope = sxy / sxx / np.abs(level)
+        r_squared = np.where(syy > 0, sxy * sxy / (sxx * syy), 0.0)
+    insufficient = count < 3
+    slope = np.where(insufficient, np.nan, slope)
+    r_squared = np.where(insufficient, np.nan, r_squared)
+    return slope[()], r_squared[()]
+
+def classify_trend(slope: float, r_squared: float) -> str:
+    """Label a fitted trend as bullish, bearish or neutral"""
+    if not r_squared >= TREND_MIN_R_SQUARED:
+        return "neutral"
+    if slope > 0:
+        return "bullish"
+    if slope < 0:
+        return "bearish"
+    return "neutral"
+
+class _SlidingWindow:
+    """Mean and sum of squared deviations of the last `window` values"""
+
+    # Updates between exact recomputations, which bound accumulated drift
+    REFRESH_INTERVAL = 256
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+
+    def push(self, value: float, dropped: float) -> None:
+        """Add a value, replacing `dropped` once the window is full"""
+        if self.count < self.window:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+        else:
+            mean = self.mean + (value - dropped) / self.window
+            self.m2 += (value - dropped) * (value - mean + dropped - self.mean)
+            self.mean = mean
+
+    def reset(self, values: Sequence[float]) -> None:
+        """Recompute both moments exactly from the window's values"""
+        self.count = len(values)
+        self.mean = math.fsum(values) / self.count if self.count else 0.0
+        self.m2 = math.fsum((value - self.mean) ** 2 for value in values)
+        self.updates = 0
+
+    def std(self) -> float:
+        """Population standard deviation of the window"""
+        return math.sqrt(max(self.m2, 0.0) / self.count)
+
+class IndicatorState:
+    """Streaming state for compute_indicators, updated in constant time per bar
+
+    Holds the last 50 closes, the running window moments and every EMA, so
+    update() returns the latest values a full recompute over the whole
+    history would produce.
+    """
+
+    _HISTORY = 50
+
+    def __init__(self):
+        self.count = 0
+        self._closes = [0.0] * self._HISTORY
+        self._window_20 = _SlidingWindow(20)
+        self._window_50 = _SlidingWindow(50)
+        self._run_length = 0
+        self._last_close = math.nan
+        self._ema = {20: 0.0, 12: 0.0, 26: 0.0}
+        self._signal = 0.0
+        self._up = 0.0
+        self._down = 0.0
+
+    @classmethod
+    def from_history(cls, close: np.ndarray) -> "IndicatorState":
+        """Build the state for a close history with vectorized passes"""
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        if close.ndim != 1:
+            raise ValueError("close history must be one-dimensional")
+        if not np.isfinite(close).all():
+            raise ValueError("close history must be finite")
+        state = cls()
+        n = len(close)
+        if n == 0:
+            return state
+
+        state.count = n
+        tail = close[-cls._HISTORY:].tolist()
+        for offset, value in enumerate(tail):
+            state._closes[(n - len(tail) + offset) % cls._HISTORY] = value
+        state._window_20.reset(tail[-20:])
+        state._window_50.reset(tail)
+        state._last_close = tail[-1]
+        changes = np.flatnonzero(close[1:] != close[:-1])
+        state._run_length = int(n - 1 - changes[-1]) if len(changes) else n
+
+        emas = {span: ema(close, span_alpha(span)) for span in state._ema}
+        for span, values in emas.items():
+            state._ema[span] = float(values[-1])
+        if n > 25:
+            macd = emas[12][25:] - emas[26][25:]
+            state._signal = float(ema(macd, span_alpha(9))[-1])
+        diff = np.zeros(n)
+        diff[1:] = np.diff(close)
+        state._up = float(ema(np.maximum(diff, 0.0), 1.0 / 14)[-1])
+        state._down = float(ema(np.maximum(-diff, 0.0), 1.0 / 14)[-1])
+        return state
+
+    def update(self, close: float) -> Dict[str, float]:
+        """Fold in the next close and return the indicators at that bar"""
+        close = float(close)
+        if not math.isfinite(close):
+            raise ValueError("close must be finite")
+        position = self.count % self._HISTORY
+        dropped_20 = self._closes[(position - 20) % self._HISTORY]
+        dropped_50 = self._closes[position]
+        self._closes[position] = close
+        self.count += 1
+
+        self._window_20.push(close, dropped_20)
+        self._window_50.push(close, dropped_50)
+        for window in (self._window_20, self._window_50):
+            window.updates += 1
+            if window.updates >= window.REFRESH_INTERVAL:
+                window.reset(self._recent(window.count))
+
+        if self.count == 1:
+            for span in self._ema:
+                self._ema[span] = close
+            diff = 0.0
+        else:
+            for span in self._ema:
+                self._ema[span] += span_alpha(span) * (close - self._ema[span])
+            diff = close - self._last_close
+        self._run_length = self._run_length + 1 if close == self._last_close else 1
+        self._last_close = close
+
+        if self.count == 26:
+            self._signal = self._ema[12] - self._ema[26]
+        elif self.count > 26:
+            self._signal += span_alpha(9) * (self._ema[12] - self._ema[26] - self._signal)
+        self._up += (max(diff, 0.0) - self._up) / 14
+        self._down += (max(-diff, 0.0) - self._down) / 14
+        return self.values()
+
+    def values(self) -> Dict[str, float]:
+        """Indicators at the latest bar (NaN until each has a full window)"""
+        nan = math.nan
+        count = self.count
+        mean_20 = self._window_20.mean if count >= 20 else nan
+        std_20 = nan
+        if count >= 20:
+            std_20 = 0.0 if self._run_length >= 20 else self._window_20.std()
+        macd = self._ema[12] - self._ema[26] if count >= 26 else nan
+        signal = self._signal if count >= 34 else nan
+        if count < 14:
+            rsi_value = nan
+        elif self._down == 0:
+            rsi_value = 100.0
+        else:
+            rsi_value = 100.0 - 100.0 / (1.0 + self._up / self._down)
+        return {
+            'sma_20': mean_20,
+            'sma_50': self._window_50.mean if count >= 50 else nan,
+            'ema_20': self._ema[20] if count >= 20 else nan,
+            'macd': macd,
+            'macd_signal': signal,
+            'macd_diff': macd - signal,
+            'rsi': rsi_value,
+            'bb_high': mean_20 + 2 * std_20,
+            'bb_low': mean_20 - 2 * std_20,
+            'bb_mid': mean_20
+        }
+
+    def _recent(self, size: int) -> List[float]:
+        """The last `size` closes, oldest first"""
+        return [
+            self._closes[(self.count - size + offset) % self._HISTORY]
+            for offset in range(size)
+        ]
@@ -0,0 +1,164 @@
+import copy
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import torch
+from .micro_batching import LengthBucketedClassifier
+
+# Inference backends selectable per agent; fp32 runs the pipeline unchanged
+BACKENDS = ['fp32', 'int8', 'onnx']
+
+def quantize_dynamic(model: torch.nn.Module) -> torch.nn.Module:
+    """Copy of a model with int8 weights in its Linear layers
+
+    Activations are quantized on the fly at each call, so no calibration
+    data is needed. Embeddings and layer norms stay in float32.
+    """
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+class OnnxModel:
+    """ONNX Runtime session standing in for a transformers model in pipelines
+
+    The model is exported once with dynamic batch and sequence axes. Calls
+    take the tokenizer's tensors and return the same output class as the
+    original model, so text-classification and question-answering pipelines
+    run on it unchanged. Without a path the export is written to a temporary
+    directory, removed once the session has loaded it. Requires the onnx and
+    onnxruntime packages.
+    """
+
+    def __init__(self, model: torch.nn.Module, tokenizer: Any, path: Optional[str] = None):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("onnxruntime is required for the onnx backend; install it or use 'int8'")
+        self.config = model.config
+        self.device = torch.device('cpu')
+        self.dtype = torch.float32
+
+        sample = dict(tokenizer(["warm up the exporter"], return_tensors='pt'))
+        with torch.inference_mode():
+            outputs = model(**sample)
+        self._output_type = type(outputs)
+        self.input_names = list(sample)
+        self.output_names = list(outputs.keys())
+        directory = tempfile.TemporaryDirectory(prefix="onnx_") if path is None else None
+        if directory is not None:
+            path = os.path.join(directory.name, "model.onnx")
+        axes = {0: 'batch', 1: 'sequence'}
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        try:
+            torch.onnx.export(
+                model,
+                (),
+                path,
+                kwargs=sample,
+                input_names=self.input_names,
+                output_names=self.output_names,
+                dynamic_axes={name: axes for name in self.input_names + self.output_names},
+                opset_version=17
+            )
+            self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        finally:
+            if directory is not None:
+                directory.cleanup()
+        self.path = path if directory is None else None
+
+    def forward(self, **inputs: Any) -> Any:
+        feed = {name: inputs[name].cpu().numpy() for name in self.input_names if name in inputs}
+        outputs = self.session.run(self.output_names, feed)
+        return self._output_type(**{name: torch.from_numpy(value) for name, value in zip(self.output_names, outputs)})
+
+    __call__ = forward
+
+    def to(self, *args: Any, **kwargs: Any) -> 'OnnxModel':
+        return self
+
+    def eval(self) -> 'OnnxModel':
+        return self
+
+def with_backend(pipeline: Any, backend: str) -> Any:
+    """Copy of a text-classification or question-answering pipeline on another backend
+
+    The copy shares the tokenizer; 'fp32' returns the pipeline itself. A
+    LengthBucketedClassifier is unwrapped and its converted pipeline put in
+    a new classifier with the same settings.
+
+    Raises:
+        ValueError: Unknown backend, or a pipeline without a model to convert
+    """
+    if backend == 'fp32':
+        return pipeline
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+    if isinstance(pipeline, LengthBucketedClassifier):
+        return LengthBucketedClassifier(
+            with_backend(pipeline.pipeline, backend),
+            batch_size=pipeline.batch_size,
+            max_length=pipeline.max_length
+        )
+    model = getattr(pipeline, 'model', None)
+    if not isinstance(model, torch.nn.Module):
+        raise ValueError(f"{type(pipeline).__name__} has no model to run on the {backend} backend")
+    if backend == 'int8':
+        model = quantize_dynamic(model)
+    else:
+        model = OnnxModel(model, pipeline.tokenizer)
+    converted = copy.copy(pipeline)
+    converted.model = model
+    return converted
+
+def _predict(pipeline: Any, inputs: Sequence[Any]) -> List[Tuple[Any, float]]:
+    """(label or answer, score) per input, as returned by the pipeline"""
+    if pipeline.task == 'question-answering':
+        answers = pipeline(
+            question=[item['question'] for item in inputs],
+            context=[item['context'] for item in inputs]
+        )
+        # The pipeline unwraps single-item batches
+        answers = [answers] if isinstance(answers, dict) else answers
+        return [(answer['answer'], float(answer['score'])) for answer in answers]
+    return [(result['label'], float(result['score'])) for result in pipeline(list(inputs))]
+
+def compare_backends(
+    pipeline: Any,
+    inputs: Sequence[Any],
+    backends: Sequence[str] = ('int8',),
+    repeats: int = 3
+) -> Dict[str, Dict[str, Any]]:
+    """Check other backends against the fp32 pipeline on the same inputs
+
+    Args:
+        pipeline: fp32 text-classification or question-answering pipeline
+        inputs: Texts, or {'question', 'context'} dicts for question answering
+        backends: Backends to compare (fp32 is always included)
+        repeats: Timed passes over the inputs per backend
+
+    Returns:
+        Per backend: 'latency' (best seconds per pass), 'speedup' over fp32,
+        'agreement' (share of inputs with the fp32 label or answer) and
+        'max_score_diff'
+    """
+    inputs = list(inputs)
+    report: Dict[str, Dict[str, Any]] = {}
+    reference: List[Tuple[Any, float]] = []
+    for backend in ['fp32'] + [backend for backend in backends if backend != 'fp32']:
+        candidate = with_backend(pipeline, backend)
+        predictions = _predict(candidate, inputs)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            _predict(candidate, inputs)
+            timings.append(time.perf_counter() - start)
+        if backend == 'fp32':
+            reference = predictions
+        latency = min(timings) if timings else float('nan')
+        report[backend] = {
+            'latency': latency,
+            'speedup': report['fp32']['latency'] / latency if backend != 'fp32' else 1.0,
+            'agreement': sum(p[0] == r[0] for p, r in zip(predictions, reference)) / len(inputs) if inputs else 1.0,
+            'max_score_diff': max((abs(p[1] - r[1]) for p, r in zip(predictions, reference)), default=0.0)
+        }
+    return report
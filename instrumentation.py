@@ -0,0 +1,188 @@
+import functools
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+class MetricsCollector:
+    """Collects timings for one instrumented agent call"""
+
+    def __init__(self, agent: Any):
+        self.agent = agent
+        self.cpu_time = 0.0
+        self.steps: Dict[str, Dict[str, float]] = {}
+        self.agents: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record_step(self, name: str, wall_time: float, cpu_time: float) -> None:
+        """Accumulate the time spent in a named sub-step"""
+        with self._lock:
+            step = self.steps.setdefault(name, {'calls': 0, 'wall_time': 0.0, 'cpu_time': 0.0})
+            step['calls'] += 1
+            step['wall_time'] += wall_time
+            step['cpu_time'] += cpu_time
+
+    def add_cpu_time(self, cpu_time: float) -> None:
+        """Add CPU time spent by blocking work run on behalf of the agent"""
+        with self._lock:
+            self.cpu_time += cpu_time
+
+    def record_agent(self, name: str, metrics: Optional[Dict[str, Any]]) -> None:
+        """Attach the metrics of a downstream agent to this call"""
+        if metrics is not None:
+            self.agents[name] = metrics
+
+_current_collector: ContextVar[Optional[MetricsCollector]] = ContextVar('agent_metrics', default=None)
+
+def current_collector() -> Optional[MetricsCollector]:
+    """Get the collector of the instrumented call running in this context"""
+    return _current_collector.get()
+
+@contextmanager
+def step(name: str) -> Iterator[None]:
+    """Time a named sub-step if an instrumented call is active"""
+    collector = _current_collector.get()
+    if collector is None:
+        yield
+        return
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        collector.record_step(
+            name,
+            time.perf_counter() - wall_start,
+            time.thread_time() - cpu_start
+        )
+
+def timed_step(func: Callable) -> Callable:
+    """Decorator recording a method as a named sub-step of the agent call"""
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if _current_collector.get() is None:
+            return func(*args, **kwargs)
+        with step(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+def timed_blocking(func: Callable) -> Callable:
+    """Wrap a blocking call so its thread CPU time is charged to the active call"""
+    collector = _current_collector.get()
+    if collector is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        cpu_start = time.thread_time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            collector.add_cpu_time(time.thread_time() - cpu_start)
+    return wrapper
+
+def describe_input_sizes(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize the size of each input value without copying it"""
+    sizes: Dict[str, Any] = {}
+    for key, value in input_data.items():
+        if hasattr(value, 'memory_usage') and hasattr(value, 'columns'):
+            # DataFrame
+            sizes[key] = {
+                'rows': int(len(value)),
+                'columns': int(len(value.columns)),
+                'nbytes': int(value.memory_usage(index=True, deep=False).sum())
+            }
+        elif hasattr(value, 'shape') and hasattr(value, 'nbytes'):
+            # NumPy array
+            sizes[key] = {'shape': list(value.shape), 'nbytes': int(value.nbytes)}
+        elif isinstance(value, (str, bytes, list, tuple, dict)):
+            sizes[key] = {'length': len(value)}
+        elif hasattr(value, 'size') and hasattr(value, 'mode'):
+            # PIL image
+            sizes[key] = {'size': list(value.size)}
+    return sizes
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+def _start_tracemalloc() -> int:
+    """Start tracing allocations for an instrumented call; return its baseline in bytes
+
+    The shared peak is only reset when no other instrumented call is
+    running, so overlapping calls never clear each other's peak.
+    """
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _tracemalloc_owned = True
+            tracemalloc.reset_peak()
+        _tracemalloc_users += 1
+        current, _ = tracemalloc.get_traced_memory()
+        return current
+
+def _stop_tracemalloc(baseline: int) -> int:
+    """Stop tracing once no instrumented call needs it; return the peak above baseline in bytes"""
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _, peak = tracemalloc.get_traced_memory()
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+        return max(peak - baseline, 0)
+
+def instrument_process(process: Callable) -> Callable:
+    """Wrap an agent's process coroutine with opt-in instrumentation
+
+    Records wall time, CPU time of blocking work run through run_blocking,
+    peak traced Python memory, input sizes and named sub-steps, and attaches
+    them to AgentResponse.metrics. The peak is the highest traced memory
+    above the level at which the call started. tracemalloc keeps a single
+    process-wide peak, so when calls overlap it includes the other calls'
+    allocations, and a call starting while another runs may be charged with
+    a peak the other call reached before it started. It is exact for calls
+    that run alone.
+    """
+    @functools.wraps(process)
+    async def wrapper(self: Any, input_data: Dict[str, Any]) -> Any:
+        active = _current_collector.get()
+        if not self.instrumentation_enabled or (active is not None and active.agent is self):
+            return await process(self, input_data)
+
+        collector = MetricsCollector(self)
+        token = _current_collector.set(collector)
+        baseline = _start_tracemalloc()
+        wall_start = time.perf_counter()
+        try:
+            response = await process(self, input_data)
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            peak_memory = _stop_tracemalloc(baseline)
+            _current_collector.reset(token)
+
+        # Roll up downstream agents, whose peaks are measured from their own baselines
+        cpu_time = collector.cpu_time
+        for agent_metrics in collector.agents.values():
+            cpu_time += agent_metrics.get('cpu_time', 0.0)
+            peak_memory = max(peak_memory, agent_metrics.get('peak_memory', 0))
+
+        metrics: Dict[str, Any] = {
+            'agent': self.name,
+            'wall_time': wall_time,
+            'cpu_time': cpu_time,
+            'peak_memory': peak_memory,
+            'input_sizes': describe_input_sizes(input_data),
+            'steps': collector.steps
+        }
+        if collector.agents:
+            metrics['agents'] = collector.agents
+        response.metrics = metrics
+        return response
+
+    wrapper.__instrumented__ = True
+    return wrapper
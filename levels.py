@@ -0,0 +1,219 @@
+from typing import Any, Callable, Dict, List, Tuple, Union
+import numpy as np
+
+# Bars on each side a pivot must dominate
+PIVOT_ORDER = 5
+# Relative price distance within which touches count as one level
+LEVEL_TOLERANCE = 0.005
+# Levels reported on each side of the last close
+MAX_LEVELS = 5
+# Upper bound on histogram bins per symbol
+MAX_BINS = 4096
+
+def _rolling_extreme(values: np.ndarray, window: int, op: Callable, fill: float) -> np.ndarray:
+    """Sliding-window extreme along the last axis in O(n) (van Herk/Gil-Werman)
+
+    Each window spans at most two aligned blocks, so its extreme combines the
+    suffix extreme of the first block with the prefix extreme of the second.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[-1]
+    lead_shape = values.shape[:-1]
+    if window < 1:
+        raise ValueError("window must be positive")
+    if n < window:
+        return np.empty(lead_shape + (0,))
+    blocks = -(-n // window)
+    padded = np.full(lead_shape + (blocks * window,), fill)
+    padded[..., :n] = values
+    shaped = padded.reshape(lead_shape + (blocks, window))
+    prefix = op.accumulate(shaped, axis=-1).reshape(lead_shape + (-1,))
+    suffix = op.accumulate(shaped[..., ::-1], axis=-1)[..., ::-1].reshape(lead_shape + (-1,))
+    return op(suffix[..., :n - window + 1], prefix[..., window - 1:n])
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """Maximum of every full window along the last axis (length n - window + 1)"""
+    return _rolling_extreme(values, window, np.maximum, -np.inf)
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Minimum of every full window along the last axis (length n - window + 1)"""
+    return _rolling_extreme(values, window, np.minimum, np.inf)
+
+def find_pivots(high: np.ndarray, low: np.ndarray, order: int = PIVOT_ORDER) -> Tuple[np.ndarray, np.ndarray]:
+    """Flag bars whose high (low) is the extreme of the `order` bars on each side"""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    n = high.shape[-1]
+    pivot_highs = np.zeros(high.shape, dtype=bool)
+    pivot_lows = np.zeros(low.shape, dtype=bool)
+    window = 2 * order + 1
+    if n >= window:
+        centre = slice(order, n - order)
+        pivot_highs[..., centre] = high[..., centre] == rolling_max(high, window)
+        pivot_lows[..., centre] = low[..., centre] == rolling_min(low, window)
+    return pivot_highs, pivot_lows
+
+def _empty_levels() -> Dict[str, Any]:
+    return {'support': [], 'resistance': [], 'levels': []}
+
+def key_levels(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    order: int = PIVOT_ORDER,
+    tolerance: float = LEVEL_TOLERANCE,
+    max_levels: int = MAX_LEVELS
+) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+    """Support and resistance levels from pivots and the volume profile
+
+    Pivot highs and lows are binned on a log-price grid one tolerance wide,
+    with their volume as weights; adjacent occupied bins closer than the
+    tolerance are merged into one level at its volume-weighted price. Each level is
+    scored from its number of touches and the volume traded at its prices
+    (both relative to the strongest level), and the strongest levels below
+    and above the last close are reported as support and resistance. Runs in
+    linear time; (symbols x time) inputs return one result per symbol. Only
+    positive prices are considered.
+
+    Returns:
+        'support' and 'resistance' prices (nearest first) and 'levels' with
+        price, type, strength (0-1), touches and volume for each
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    single = high.ndim == 1
+    if single:
+        high, low, close, volume = high[None], low[None], close[None], volume[None]
+    rows = high.shape[0]
+    results = [_empty_levels() for _ in range(rows)]
+    if high.shape[-1] == 0:
+        return results[0] if single else results
+    volume = np.where(np.isfinite(volume) & (volume > 0), volume, 0.0)
+
+    # Per-symbol log-price grid, so every bin is one tolerance wide
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bottom = np.log(np.nanmin(np.where(low > 0, low, np.nan), axis=-1))
+        top = np.log(np.nanmax(np.where(high > 0, high, np.nan), axis=-1))
+    usable = np.isfinite(bottom) & np.isfinite(top)
+    step = np.log1p(tolerance)
+    bottom = np.where(usable, bottom, 0.0)
+    bins = np.where(usable, np.minimum(MAX_BINS, np.floor((top - bottom) / step) + 1), 1).astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(bins)[:-1]])
+    total_bins = int(bins.sum())
+
+    def bin_of(row: np.ndarray, price: np.ndarray) -> np.ndarray:
+        local = np.floor((np.log(price) - bottom[row]) / step)
+        return offsets[row] + np.clip(local, 0, bins[row] - 1).astype(np.int64)
+
+    # Volume profile of every bar's typical price; unusable bars go to a spare
+    # last bin so the whole matrix is binned without gathering
+    typical = (high + low + close) / 3
+    finite = np.isfinite(typical) & (typical > 0) & usable[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bar_bins = np.floor((np.log(typical) - bottom[:, None]) / step)
+    bar_bins = np.where(finite, np.clip(bar_bins, 0, bins[:, None] - 1) + offsets[:, None], total_bins)
+    profile = np.bincount(
+        bar_bins.astype(np.int64).ravel(),
+        weights=volume.ravel(),
+        minlength=total_bins + 1
+    )[:total_bins]
+
+    # Touches: pivot highs and lows alike, weighted by their bar's volume
+    pivot_highs, pivot_lows = find_pivots(high, low, order)
+    high_rows, high_positions = np.nonzero(pivot_highs & (high > 0) & usable[:, None])
+    low_rows, low_positions = np.nonzero(pivot_lows & (low > 0) & usable[:, None])
+    pivot_rows = np.concatenate([high_rows, low_rows])
+    pivot_prices = np.concatenate([high[high_rows, high_positions], low[low_rows, low_positions]])
+    pivot_volumes = np.concatenate([volume[high_rows, high_positions], volume[low_rows, low_positions]])
+    if len(pivot_rows) == 0:
+        return results[0] if single else results
+    pivot_bins = bin_of(pivot_rows, pivot_prices)
+    touches = np.bincount(pivot_bins, minlength=total_bins)
+    weight = np.bincount(pivot_bins, weights=pivot_volumes, minlength=total_bins)
+    weighted_price = np.bincount(pivot_bins, weights=pivot_prices * pivot_volumes, minlength=total_bins)
+    price_sum = np.bincount(pivot_bins, weights=pivot_prices, minlength=total_bins)
+
+    # Occupied bins in (symbol, price) order; a bin within tolerance of the
+    # previous one joins it unless that bin already joined its own predecessor,
+    # so merges never chain and each level spans at most the tolerance
+    occupied = np.flatnonzero(touches)
+    occupied_rows = np.searchsorted(offsets, occupied, side='right') - 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        prices = np.where(
+            weight[occupied] > 0,
+            weighted_price[occupied] / weight[occupied],
+            price_sum[occupied] / touches[occupied]
+        )
+    joins = np.zeros(len(occupied), dtype=bool)
+    joins[1:] = (occupied_rows[1:] == occupied_rows[:-1]) & (prices[1:] - prices[:-1] <= tolerance * prices[:-1])
+    # Within a run of joinable bins only every other one (from the first) joins
+    run_start = np.maximum.accumulate(np.where(joins, 0, np.arange(len(joins))))
+    breaks = ~joins | ((np.arange(len(joins)) - run_start) % 2 == 0)
+    group = np.cumsum(breaks) - 1
+    groups = int(group[-1]) + 1
+    group_rows = occupied_rows[breaks]
+    group_touches = np.bincount(group, weights=touches[occupied], minlength=groups)
+    group_weight = np.bincount(group, weights=weight[occupied], minlength=groups)
+    group_weighted_price = np.bincount(group, weights=weighted_price[occupied], minlength=groups)
+    group_price_sum = np.bincount(group, weights=price_sum[occupied], minlength=groups)
+    group_volume = np.bincount(group, weights=profile[occupied], minlength=groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        group_prices = np.where(
+            group_weight > 0,
+            group_weighted_price / group_weight,
+            group_price_sum / group_touches
+        )
+
+    # Strength relative to the symbol's strongest level on each measure
+    max_touches = np.zeros(rows)
+    np.maximum.at(max_touches, group_rows, group_touches)
+    max_volume = np.zeros(rows)
+    np.maximum.at(max_volume, group_rows, group_volume)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        volume_score = np.where(max_volume[group_rows] > 0, group_volume / max_volume[group_rows], 0.0)
+    strength = 0.5 * group_touches / max_touches[group_rows] + 0.5 * volume_score
+
+    last_close = _last_finite(close)
+    starts = np.flatnonzero(np.concatenate([[True], group_rows[1:] != group_rows[:-1]]))
+    ends = np.concatenate([starts[1:], [groups]])
+    for start, end in zip(starts, ends):
+        row = int(group_rows[start])
+        reference = last_close[row]
+        if not np.isfinite(reference):
+            continue
+        levels = [
+            {
+                'price': float(group_prices[g]),
+                'type': 'support' if group_prices[g] < reference else 'resistance',
+                'strength': float(strength[g]),
+                'touches': int(group_touches[g]),
+                'volume': float(group_volume[g])
+            }
+            for g in range(start, end)
+        ]
+        support = sorted(
+            (level for level in levels if level['type'] == 'support'),
+            key=lambda level: -level['strength']
+        )[:max_levels]
+        resistance = sorted(
+            (level for level in levels if level['type'] == 'resistance'),
+            key=lambda level: -level['strength']
+        )[:max_levels]
+        support.sort(key=lambda level: -level['price'])
+        resistance.sort(key=lambda level: level['price'])
+        results[row] = {
+            'support': [level['price'] for level in support],
+            'resistance': [level['price'] for level in resistance],
+            'levels': support + resistance
+        }
+    return results[0] if single else results
+
+def _last_finite(values: np.ndarray) -> np.ndarray:
+    """Last finite value of each row, NaN for rows without one"""
+    finite = np.isfinite(values)
+    positions = values.shape[-1] - 1 - np.argmax(finite[:, ::-1], axis=-1)
+    last = values[np.arange(len(values)), positions]
+    return np.where(finite.any(axis=-1), last, np.nan)
@@ -3,6 +3,7 @@ import yfinance as yf
 from PIL import Image
 import io
 import matplotlib.pyplot as plt
+from agents.bar_store import BarStore, yfinance_loader
 from agents.orchestrator_agent import OrchestratorAgent
 
 async def main():
@@ -12,13 +13,15 @@ async def main():
     # Example: Analyze AAPL stock
     symbol = "AAPL"
     
-    # Get historical price data
-    stock = yf.Ticker(symbol)
-    hist = stock.history(period="1y")
+    # Get historical price data from the local bar store (downloaded only once)
+    store = BarStore("data/bars")
+    if symbol not in store:
+        store.ingest(symbol, yfinance_loader, period="1y")
+    hist = store.read(symbol)
     
     # Create a price chart
     plt.figure(figsize=(12, 6))
-    plt.plot(hist.index, hist['Close'])
+    plt.plot(hist.index, hist['close'])
     plt.title(f"{symbol} Stock Price")
     plt.xlabel("Date")
     plt.ylabel("Price")
@@ -30,13 +33,13 @@ async def main():
     chart_image = Image.open(buf)
     
     # Get news articles (example)
-    news = stock.news
+    news = yf.Ticker(symbol).news
     news_texts = [article['title'] + " " + article['summary'] for article in news[:5]]
     
     # Prepare input data
     input_data = {
         'chart_data': chart_image,
-        'price_data': hist.to_dict('records'),
+        'price_data': hist,
         'text_data': news_texts
     }
     
@@ -0,0 +1,298 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import torch
+
+class _PendingRequest:
+    """Items submitted by one caller, filled in as their batches complete"""
+
+    def __init__(self, size: int):
+        self.results: List[Any] = [None] * size
+        self.remaining = size
+        self.future: Future = Future()
+
+class MicroBatcher:
+    """Coalesces concurrent model calls into batched invocations
+
+    Callers (typically executor threads) block in submit() while a background
+    thread gathers pending items until max_batch_size items are queued or
+    max_wait seconds have passed since the oldest one, then runs batch_fn once
+    for all of them and hands each caller its own results in order. A caller
+    whose items fail gets the exception; other callers in the same batch
+    still get their results.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait: float = 0.01
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: Deque[Tuple[_PendingRequest, int, Any]] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._stats = {'batches': 0, 'items': 0, 'requests': 0}
+        self._thread = threading.Thread(target=self._run, name="MicroBatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, items: List[Any]) -> List[Any]:
+        """Queue items for the next batch and wait for their results"""
+        request = _PendingRequest(len(items))
+        if not items:
+            return []
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            for index, item in enumerate(items):
+                self._pending.append((request, index, item))
+            self._stats['requests'] += 1
+            self._condition.notify()
+        return request.future.result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batch counters, including the mean batch size"""
+        with self._condition:
+            batches = self._stats['batches']
+            return {
+                **self._stats,
+                'mean_batch_size': self._stats['items'] / batches if batches else 0.0
+            }
+
+    def close(self) -> None:
+        """Flush pending items and stop the background thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._execute(batch)
+
+    def _next_batch(self) -> Optional[List[Tuple[_PendingRequest, int, Any]]]:
+        """Wait for a full batch or for max_wait to pass since the first item"""
+        with self._condition:
+            while not self._pending:
+                if self._closed:
+                    return None
+                self._condition.wait()
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            size = min(len(self._pending), self.max_batch_size)
+            return [self._pending.popleft() for _ in range(size)]
+
+    def _execute(self, batch: List[Tuple[_PendingRequest, int, Any]]) -> None:
+        """Run one batched call and distribute its results
+
+        If the batched call fails, its items are retried one at a time, so
+        an item the model rejects only fails the request it came from.
+        """
+        try:
+            outputs = self.batch_fn([item for _, _, item in batch])
+            if len(outputs) != len(batch):
+                raise RuntimeError(f"Batch function returned {len(outputs)} results for {len(batch)} items")
+        except Exception as e:
+            if len(batch) > 1:
+                for entry in batch:
+                    # Requests that already failed need no more work
+                    if not entry[0].future.done():
+                        self._execute([entry])
+                return
+            request = batch[0][0]
+            if not request.future.done():
+                request.future.set_exception(e)
+            return
+
+        with self._condition:
+            self._stats['batches'] += 1
+            self._stats['items'] += len(batch)
+        for (request, index, _), output in zip(batch, outputs):
+            if request.future.done():
+                continue
+            request.results[index] = output
+            request.remaining -= 1
+            if request.remaining == 0:
+                request.future.set_result(request.results)
+
+def _freeze(kwargs: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Turn call keyword arguments into a dictionary key"""
+    return tuple(sorted((key, repr(value)) for key, value in kwargs.items()))
+
+class BatchedTextClassifier:
+    """Drop-in wrapper for a text-classification pipeline that batches across callers"""
+
+    def __init__(self, pipeline: Any, max_batch_size: int = 32, max_wait: float = 0.01):
+        self.pipeline = pipeline
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._batchers: Dict[Tuple[Tuple[str, Any], ...], MicroBatcher] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, texts: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        if isinstance(texts, str):
+            texts = [texts]
+        return self._batcher(kwargs).submit(list(texts))
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the wrapped pipeline's attributes (tokenizer, model, ...)
+        if name.startswith('_') or name == 'pipeline':
+            raise AttributeError(name)
+        return getattr(self.pipeline, name)
+
+    def _batcher(self, kwargs: Dict[str, Any]) -> MicroBatcher:
+        """Get the batcher for one set of call arguments"""
+        key = _freeze(kwargs)
+        with self._lock:
+            batcher = self._batchers.get(key)
+            if batcher is None:
+                batcher = MicroBatcher(
+                    self._batch_fn(kwargs),
+                    max_batch_size=self.max_batch_size,
+                    max_wait=self.max_wait
+                )
+                self._batchers[key] = batcher
+            return batcher
+
+    def _batch_fn(self, kwargs: Dict[str, Any]) -> Callable[[List[Any]], List[Any]]:
+        """Build the function that runs one batch through the pipeline"""
+        return lambda texts: self.pipeline(texts, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Aggregate batch counters across call signatures"""
+        totals = {'batches': 0, 'items': 0, 'requests': 0}
+        for batcher in list(self._batchers.values()):
+            for key, value in batcher.stats().items():
+                if key in totals:
+                    totals[key] += value
+        totals['mean_batch_size'] = totals['items'] / totals['batches'] if totals['batches'] else 0.0
+        return totals
+
+    def close(self) -> None:
+        """Stop every batcher thread"""
+        for batcher in list(self._batchers.values()):
+            batcher.close()
+
+class BatchedQuestionAnswerer(BatchedTextClassifier):
+    """Drop-in wrapper for a question-answering pipeline that batches across callers"""
+
+    def __call__(self, question: str, context: str, **kwargs: Any) -> Dict[str, Any]:
+        return self._batcher(kwargs).submit([(question, context)])[0]
+
+    def _batch_fn(self, kwargs: Dict[str, Any]) -> Callable[[List[Any]], List[Any]]:
+        return lambda items: self._answer_batch(items, kwargs)
+
+    def _answer_batch(self, items: List[Tuple[str, str]], kwargs: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Answer a batch of (question, context) pairs in one pipeline call"""
+        answers = self.pipeline(
+            question=[question for question, _ in items],
+            context=[context for _, context in items],
+            **kwargs
+        )
+        # The pipeline unwraps single-item batches
+        return [answers] if isinstance(answers, dict) else list(answers)
+
+class LengthBucketedClassifier:
+    """Drop-in wrapper for a text-classification pipeline that batches by length
+
+    Texts are tokenized once (truncated to max_length tokens), sorted by
+    token count and run through the model batch_size at a time under
+    torch.inference_mode, so each batch pads only to its own longest text
+    and a single long article no longer pads every headline. Results come
+    back in the original order. Calls with pipeline keyword arguments, or
+    pipelines without a tokenizer and model, go to the pipeline unchanged.
+    """
+
+    def __init__(self, pipeline: Any, batch_size: int = 32, max_length: int = 512):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.pipeline = pipeline
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._lock = threading.Lock()
+        self._stats = {'batches': 0, 'items': 0, 'tokens': 0, 'padded_tokens': 0}
+
+    def __call__(self, texts: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        if isinstance(texts, str):
+            texts = [texts]
+        texts = list(texts)
+        tokenizer = getattr(self.pipeline, 'tokenizer', None)
+        model = getattr(self.pipeline, 'model', None)
+        if kwargs or tokenizer is None or model is None:
+            return self.pipeline(texts, **kwargs)
+        if not texts:
+            return []
+
+        encoded = tokenizer(texts, truncation=True, max_length=self.max_length)
+        lengths = [len(ids) for ids in encoded['input_ids']]
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+        results: List[Dict[str, Any]] = [{}] * len(texts)
+        padded = 0
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                batch = order[start:start + self.batch_size]
+                features = self._pad(tokenizer, encoded, batch, max(lengths[i] for i in batch))
+                logits = model(**{key: value.to(model.device) for key, value in features.items()}).logits
+                scores, labels = self._scores(model, logits.float()).max(dim=-1)
+                for i, score, label in zip(batch, scores.tolist(), labels.tolist()):
+                    results[i] = {'label': model.config.id2label[label], 'score': score}
+                padded += features['input_ids'].numel()
+
+        with self._lock:
+            self._stats['batches'] += -(-len(order) // self.batch_size)
+            self._stats['items'] += len(texts)
+            self._stats['tokens'] += sum(lengths)
+            self._stats['padded_tokens'] += padded
+        return results
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the wrapped pipeline's attributes (tokenizer, model, ...)
+        if name.startswith('_') or name == 'pipeline':
+            raise AttributeError(name)
+        return getattr(self.pipeline, name)
+
+    @staticmethod
+    def _pad(tokenizer: Any, encoded: Any, batch: List[int], width: int) -> Dict[str, torch.Tensor]:
+        """Pad the encodings of one batch to its longest text"""
+        features = {}
+        for key in encoded.keys():
+            fill = tokenizer.pad_token_id if key == 'input_ids' else 0
+            tensor = torch.full((len(batch), width), fill, dtype=torch.long)
+            for row, i in enumerate(batch):
+                values = torch.tensor(encoded[key][i], dtype=torch.long)
+                if tokenizer.padding_side == 'left':
+                    tensor[row, width - len(values):] = values
+                else:
+                    tensor[row, :len(values)] = values
+            features[key] = tensor
+        return features
+
+    @staticmethod
+    def _scores(model: Any, logits: torch.Tensor) -> torch.Tensor:
+        """Turn logits into label scores the way the text-classification pipeline does"""
+        config = model.config
+        if config.problem_type == 'multi_label_classification' or config.num_labels == 1:
+            return logits.sigmoid()
+        return logits.softmax(dim=-1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batch and token counters, including the share of padding"""
+        with self._lock:
+            padded = self._stats['padded_tokens']
+            return {
+                **self._stats,
+                'padding_ratio': 1.0 - self._stats['tokens'] / padded if padded else 0.0
+            }
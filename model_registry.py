@@ -0,0 +1,246 @@
+import functools
+import gc
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import torch
+from transformers import pipeline
+from .inference_backends import BACKENDS, with_backend
+
+# Loader: no arguments -> a loaded pipeline
+Loader = Callable[[], Any]
+
+# Task and checkpoint of each default pipeline, by registry name
+DEFAULT_MODELS = {
+    'finbert': ("sentiment-analysis", "ProsusAI/finbert"),
+    'chart_captioning': ("image-to-text", "Salesforce/blip-image-captioning-base"),
+    'question_answering': ("question-answering", "deepset/roberta-base-squad2")
+}
+
+def model_memory(model: Any) -> int:
+    """Bytes held by the weights and buffers of a pipeline's model
+
+    Counts each tensor of the state dict once, including the packed int8
+    weights of quantized layers.
+    """
+    module = getattr(model, 'model', model)
+    if not hasattr(module, 'state_dict'):
+        return 0
+    seen = set()
+    total = 0
+    pending = list(module.state_dict().values())
+    while pending:
+        value = pending.pop()
+        if isinstance(value, (tuple, list)):
+            pending.extend(value)
+        elif isinstance(value, torch.Tensor) and value.data_ptr() not in seen:
+            seen.add(value.data_ptr())
+            total += value.numel() * value.element_size()
+    return total
+
+class _Entry:
+    """A registered model and its load/usage bookkeeping"""
+
+    def __init__(self, loader: Loader, identity: str):
+        self.loader = loader
+        self.identity = identity
+        self.model: Optional[Any] = None
+        self.lock = threading.Lock()
+        self.requested = False
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.last_used = 0.0
+
+class ModelRegistry:
+    """Lazily loaded model pipelines shared by every agent in the process
+
+    Agents hold LazyPipeline proxies from lazy(), so constructing an agent
+    loads nothing; a model is loaded on its first call and then shared by
+    every proxy. Servers can load the models agents asked for up front with
+    warmup(), and short-lived jobs can drop models they no longer need with
+    evict() or evict_idle().
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Loader, identity: Optional[str] = None) -> None:
+        """Register (or replace) the loader of a model, evicting any loaded copies
+
+        identity names the weights the loader returns (e.g. checkpoint and
+        revision) for result-cache keys; it defaults to the loader's name.
+        """
+        entry = _Entry(loader, identity or _callable_name(loader))
+        with self._lock:
+            previous = self._entries.get(name)
+            entry.requested = previous is not None and previous.requested
+            self._entries[name] = entry
+            # Backend variants were built from the old loader
+            for key in [key for key in self._entries if key.startswith(f"{name}:")]:
+                del self._entries[key]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def names(self) -> List[str]:
+        """Registered model names"""
+        return list(self._entries)
+
+    def _entry(self, name: str) -> _Entry:
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Unknown model: {name}")
+        return entry
+
+    def get(self, name: str) -> Any:
+        """Return a model, loading it on first use"""
+        entry = self._entry(name)
+        with entry.lock:
+            if entry.model is None:
+                start = time.perf_counter()
+                entry.model = entry.loader()
+                entry.load_seconds = time.perf_counter() - start
+                entry.loads += 1
+            entry.last_used = time.monotonic()
+            return entry.model
+
+    def _variant(self, name: str, backend: str) -> str:
+        """Name of a model on an inference backend, registering it on first request"""
+        base = self._entry(name)
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend: {backend}")
+        if backend == 'fp32':
+            return name
+        key = f"{name}:{backend}"
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = _Entry(lambda: with_backend(base.loader(), backend), f"{base.identity}:{backend}")
+        return key
+
+    def lazy(self, name: str, backend: str = 'fp32') -> 'LazyPipeline':
+        """Proxy that loads the model on first use; marks it for warmup()
+
+        Other backends (see inference_backends) are converted from a fresh
+        load and registered as '<name>:<backend>'.
+        """
+        key = self._variant(name, backend)
+        self._entry(key).requested = True
+        return LazyPipeline(self, key)
+
+    def identity(self, name: str) -> str:
+        """Identity of a registered model's weights, without loading it"""
+        return self._entry(name).identity
+
+    def is_loaded(self, name: str) -> bool:
+        return self._entry(name).model is not None
+
+    def warmup(self, names: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """Load models now (by default every model an agent holds a proxy for)
+
+        Returns:
+            Load time in seconds per model (0 for models already loaded)
+        """
+        if names is None:
+            names = [name for name, entry in self._entries.items() if entry.requested]
+        timings = {}
+        for name in names:
+            loaded = self.is_loaded(name)
+            self.get(name)
+            timings[name] = 0.0 if loaded else self._entry(name).load_seconds
+        return timings
+
+    def evict(self, name: str) -> bool:
+        """Drop a loaded model (it reloads on next use); returns whether one was loaded
+
+        Memory is released once callers still running the model finish.
+        """
+        entry = self._entry(name)
+        with entry.lock:
+            if entry.model is None:
+                return False
+            entry.model = None
+        gc.collect()
+        return True
+
+    def evict_idle(self, max_idle: float) -> List[str]:
+        """Drop models unused for at least max_idle seconds and return their names"""
+        now = time.monotonic()
+        idle = [
+            name for name, entry in list(self._entries.items())
+            if entry.model is not None and now - entry.last_used >= max_idle
+        ]
+        return [name for name in idle if self.evict(name)]
+
+    def memory(self) -> Dict[str, int]:
+        """Parameter and buffer bytes per loaded model"""
+        return {
+            name: model_memory(entry.model)
+            for name, entry in list(self._entries.items())
+            if entry.model is not None
+        }
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Load state, load count and time, idle time and memory per model"""
+        now = time.monotonic()
+        report = {}
+        for name, entry in list(self._entries.items()):
+            model = entry.model
+            report[name] = {
+                'loaded': model is not None,
+                'loads': entry.loads,
+                'load_seconds': entry.load_seconds,
+                'idle_seconds': now - entry.last_used if model is not None else None,
+                'memory_bytes': model_memory(model) if model is not None else 0
+            }
+        return report
+
+class LazyPipeline:
+    """Callable stand-in for a registry model that loads it on first use"""
+
+    def __init__(self, registry: ModelRegistry, name: str):
+        self.registry = registry
+        self.name = name
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.registry.get(self.name)(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the loaded pipeline's attributes (tokenizer, model, ...)
+        if name.startswith('_') or name in ('registry', 'name'):
+            raise AttributeError(name)
+        return getattr(self.registry.get(self.name), name)
+
+def _callable_name(func: Any) -> str:
+    func = getattr(func, 'func', func)
+    if not hasattr(func, '__qualname__'):
+        func = type(func)
+    return f"{func.__module__}.{func.__qualname__}"
+
+def model_identity(model: Any) -> str:
+    """Name of the model behind a pipeline, wrapper or registry proxy, for cache keys
+
+    Registry proxies report their entry's identity without loading it;
+    transformers pipelines report their checkpoint and revision; other
+    callables their qualified name.
+    """
+    # Unwrap batching wrappers without going through their attribute forwarding
+    while 'pipeline' in getattr(model, '__dict__', {}):
+        model = model.__dict__['pipeline']
+    if isinstance(model, LazyPipeline):
+        return model.registry.identity(model.name)
+    config = getattr(getattr(model, 'model', None), 'config', None)
+    if config is not None:
+        name = getattr(config, '_name_or_path', '') or type(model.model).__name__
+        revision = getattr(config, '_commit_hash', None)
+        return f"{name}@{revision}" if revision else name
+    return _callable_name(model)
+
+def _build_default_registry() -> ModelRegistry:
+    registry = ModelRegistry()
+    for name, (task, model) in DEFAULT_MODELS.items():
+        registry.register(name, functools.partial(pipeline, task, model=model), identity=model)
+    return registry
+
+# Registry shared by agents that are not given their own models
+default_registry = _build_default_registry()
@@ -0,0 +1,175 @@
+import re
+import zlib
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from .result_cache import normalize_text
+
+# MinHash functions per signature
+NUM_PERMUTATIONS = 128
+# LSH bands (NUM_PERMUTATIONS / BANDS rows each); pairs sharing a band are candidates
+BANDS = 16
+# Estimated Jaccard similarity of word-pair sets at which candidates are checked exactly
+NEAR_DUPLICATE_THRESHOLD = 0.7
+# Word pairs one text may add to the other (e.g. a source tag) and still match
+MAX_ADDED_SHINGLES = 2
+# Permutations hashed per pass (bounds the temporary shingles x block matrix)
+PERMUTATION_BLOCK = 16
+
+# Mersenne prime modulus of the universal hash functions
+_PRIME = (1 << 31) - 1
+# Multiplier combining two 32-bit word hashes into one shingle hash
+_PAIR = 1_000_003
+# Punctuation and whitespace runs separating words
+_SEPARATORS = re.compile(r'[\W_]+')
+
+def _word_hashes(text: str) -> List[int]:
+    words = [word for word in _SEPARATORS.split(normalize_text(text).lower()) if word]
+    hashes = [zlib.crc32(word.encode('utf-8')) for word in words]
+    # Texts of fewer than two words still get one shingle
+    return hashes + [0] * (2 - len(hashes)) if len(hashes) < 2 else hashes
+
+def shingle_hashes(texts: Sequence[str]) -> List[np.ndarray]:
+    """Hashes of the adjacent word pairs of each text
+
+    Words are compared lowercased with punctuation ignored. Pairs make a
+    one-word substitution (which can flip a headline's sentiment) change two
+    shingles, while an appended source tag changes one.
+    """
+    words = [_word_hashes(text) for text in texts]
+    if not words:
+        return []
+    flat = np.fromiter((value for text in words for value in text), dtype=np.int64)
+    lengths = np.array([len(text) for text in words])
+    pairs = flat[:-1] * _PAIR + flat[1:]
+    # Keep pairs that start and end inside the same text
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    return [pairs[start:start + length - 1] for start, length in zip(starts, lengths)]
+
+def minhash_signatures(
+    texts: Sequence[str],
+    num_permutations: int = NUM_PERMUTATIONS,
+    seed: int = 0
+) -> np.ndarray:
+    """MinHash signatures, one row per text
+
+    The share of equal columns between two rows estimates the Jaccard
+    similarity of the texts' shingle sets.
+    """
+    return _signatures(shingle_hashes(texts), num_permutations, seed)
+
+def _signatures(shingles: List[np.ndarray], num_permutations: int, seed: int = 0) -> np.ndarray:
+    if not shingles:
+        return np.empty((0, num_permutations), dtype=np.int64)
+    values = np.concatenate(shingles) % _PRIME
+    starts = np.concatenate([[0], np.cumsum([len(item) for item in shingles])[:-1]])
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, num_permutations, dtype=np.int64)
+    b = rng.integers(0, _PRIME, num_permutations, dtype=np.int64)
+    signatures = np.empty((len(shingles), num_permutations), dtype=np.int64)
+    for block in range(0, num_permutations, PERMUTATION_BLOCK):
+        columns = slice(block, block + PERMUTATION_BLOCK)
+        hashed = (values[:, None] * a[columns] + b[columns]) % _PRIME
+        signatures[:, columns] = np.minimum.reduceat(hashed, starts, axis=0)
+    return signatures
+
+def is_near_duplicate(first: np.ndarray, second: np.ndarray, max_added: int = MAX_ADDED_SHINGLES) -> bool:
+    """Whether one shingle set equals the other plus at most max_added shingles
+
+    A substituted word removes pairs from one text and adds pairs to the
+    other, so it never passes, however long the texts are.
+    """
+    only_first = np.setdiff1d(first, second).size
+    only_second = np.setdiff1d(second, first).size
+    return min(only_first, only_second) == 0 and max(only_first, only_second) <= max_added
+
+def band_keys(signatures: np.ndarray, bands: int = BANDS) -> np.ndarray:
+    """One 64-bit key per signature and LSH band (equal rows give equal keys)"""
+    rows = signatures.shape[1] // bands
+    banded = signatures[:, :bands * rows].reshape(len(signatures), bands, rows).astype(np.uint64)
+    keys = np.zeros(banded.shape[:2], dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for row in range(rows):
+            keys = keys * np.uint64(0x100000001B3) + banded[:, :, row]
+    return keys
+
+class NearDuplicateIndex:
+    """LSH index of MinHash signatures that maps texts to earlier near-duplicates
+
+    Only cluster representatives are indexed. Each new text is compared with
+    the representatives sharing one of its band keys; the most similar one
+    at or above threshold that also passes the exact is_near_duplicate check
+    becomes its representative, otherwise the text becomes a representative
+    itself. Every member is therefore a near-duplicate of its representative
+    directly, so chains of small edits do not merge different stories, and
+    long texts differing by one substituted word stay apart.
+    """
+
+    def __init__(
+        self,
+        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+        bands: int = BANDS,
+        num_permutations: int = NUM_PERMUTATIONS
+    ):
+        if num_permutations % bands:
+            raise ValueError("num_permutations must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.num_permutations = num_permutations
+        self.size = 0
+        self._signatures = np.empty((0, num_permutations), dtype=np.int64)
+        self._shingles: List[np.ndarray] = []
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, texts: Sequence[str]) -> List[int]:
+        """Index texts and return each one's representative id
+
+        Ids number the texts in the order they were added, across calls.
+        """
+        shingles = [np.unique(item) for item in shingle_hashes(texts)]
+        signatures = _signatures(shingles, self.num_permutations)
+        keys = band_keys(signatures, self.bands).tolist()
+        start = self.size
+        self._signatures = np.concatenate([self._signatures, signatures])
+        self._shingles.extend(shingles)
+        assigned = []
+        for offset, row in enumerate(keys):
+            text_id = start + offset
+            candidates = {
+                representative
+                for band, key in enumerate(row)
+                for representative in self._buckets.get((band, key), ())
+            }
+            representative = text_id
+            if candidates:
+                candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+                similarity = (self._signatures[candidates] == self._signatures[text_id]).mean(axis=1)
+                for best in np.argsort(-similarity, kind='stable'):
+                    if similarity[best] < self.threshold:
+                        break
+                    if is_near_duplicate(self._shingles[candidates[best]], self._shingles[text_id]):
+                        representative = int(candidates[best])
+                        break
+            if representative == text_id:
+                for band, key in enumerate(row):
+                    self._buckets.setdefault((band, key), []).append(text_id)
+            assigned.append(representative)
+        self.size += len(keys)
+        return assigned
+
+def near_duplicate_clusters(
+    texts: Sequence[str],
+    threshold: float = NEAR_DUPLICATE_THRESHOLD,
+    bands: int = BANDS,
+    num_permutations: int = NUM_PERMUTATIONS
+) -> np.ndarray:
+    """Group texts that are near-duplicates (see NearDuplicateIndex)
+
+    Returns:
+        For each text, the position of its cluster's representative (the
+        first text of the cluster)
+    """
+    index = NearDuplicateIndex(threshold, bands, num_permutations)
+    return np.array(index.add(texts), dtype=np.int64)
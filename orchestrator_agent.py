@@ -1,14 +1,30 @@
-from typing import Dict, Any, List
+import asyncio
+from concurrent.futures import Executor
+from typing import Dict, Any, AsyncIterator, List, Mapping, Optional, Sequence, Tuple, Union
 from .base_agent import BaseAgent, AgentResponse
+from .instrumentation import current_collector
 from .chart_analysis_agent import ChartAnalysisAgent
 from .technical_analysis_agent import TechnicalAnalysisAgent
 from .sentiment_analysis_agent import SentimentAnalysisAgent
 from .report_generation_agent import ReportGenerationAgent
+from .pipeline import PipelineNode, PipelineScheduler
+from .process_backend import ProcessPoolBackend
+from .result_cache import ResultCache
+
+ANALYSIS_OUTPUTS = ['chart_analysis', 'technical_analysis', 'sentiment_analysis']
 
 class OrchestratorAgent(BaseAgent):
     """Agent responsible for orchestrating the analysis workflow"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        cpu_executor: Optional[Executor] = None,
+        model_executor: Optional[Executor] = None,
+        process_backend: Optional[ProcessPoolBackend] = None,
+        instrument: bool = False,
+        cache: Optional[ResultCache] = None,
+        sentiment_agent: Optional[SentimentAnalysisAgent] = None
+    ):
         super().__init__(
             name="OrchestratorAgent",
             description="Coordinates the analysis workflow between all agents"
@@ -16,36 +32,85 @@ class OrchestratorAgent(BaseAgent):
         # Initialize all agents
         self.chart_agent = ChartAnalysisAgent()
         self.technical_agent = TechnicalAnalysisAgent()
-        self.sentiment_agent = SentimentAnalysisAgent()
+        self.sentiment_agent = sentiment_agent or SentimentAnalysisAgent()
         self.report_agent = ReportGenerationAgent()
         
+        # OpenCV and pandas/ta work goes to the CPU executor, FinBERT to the
+        # model executor; None falls back to the event loop's default executor
+        self.chart_agent.set_executor(cpu_executor)
+        self.technical_agent.set_executor(cpu_executor)
+        self.sentiment_agent.set_executor(model_executor)
+        
+        # Optionally move the CPU-bound agents to worker processes
+        self.chart_agent.set_process_backend(process_backend)
+        self.technical_agent.set_process_backend(process_backend)
+        
+        # Declare what each agent needs from the request and from upstream agents
+        self.pipeline = PipelineScheduler([
+            PipelineNode('chart_analysis', self.chart_agent, inputs={'image': 'chart_data'}),
+            PipelineNode('technical_analysis', self.technical_agent, inputs={'price_data': 'price_data'}),
+            PipelineNode('sentiment_analysis', self.sentiment_agent, inputs={'text_data': 'text_data'}),
+            PipelineNode(
+                'report',
+                self.report_agent,
+                upstream={name: name for name in ANALYSIS_OUTPUTS},
+                cacheable=False
+            )
+        ], cache=cache)
+        self.enable_instrumentation(instrument)
+    
+    def enable_instrumentation(self, enabled: bool = True) -> None:
+        """Record timings for this agent and every agent in the pipeline"""
+        super().enable_instrumentation(enabled)
+        for node in self.pipeline.nodes.values():
+            node.agent.enable_instrumentation(enabled)
+    
+    def register_agent(
+        self,
+        name: str,
+        agent: BaseAgent,
+        inputs: Optional[Dict[str, str]] = None,
+        upstream: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Add an agent to the pipeline
+        
+        Args:
+            name: Output name callers use to request this agent's results
+            agent: The agent to run
+            inputs: Mapping of agent input key to request key
+            upstream: Mapping of agent input key to upstream output name
+        """
+        self.pipeline.add_node(PipelineNode(name, agent, inputs=inputs, upstream=upstream))
+        if self.instrumentation_enabled:
+            agent.enable_instrumentation()
+        
     async def process(self, input_data: Dict[str, Any]) -> AgentResponse:
         try:
-            # Extract input data
-            chart_data = input_data.get('chart_data')
-            price_data = input_data.get('price_data')
-            text_data = input_data.get('text_data')
+            # Without explicit outputs, run the full analysis and report
+            outputs = input_data.get('outputs')
+            if outputs is None:
+                return await self._process_report(input_data)
             
-            if not all([chart_data, price_data, text_data]):
+            missing = self._validate_input_data(input_data, outputs)
+            if missing:
                 return AgentResponse(
                     success=False,
                     data={},
-                    error="Missing required input data"
+                    error=f"Missing required input data: {', '.join(missing)}"
                 )
             
-            # Run parallel analysis
-            analysis_results = await self._run_parallel_analysis(
-                chart_data,
-                price_data,
-                text_data
-            )
-            
-            # Generate final report
-            final_report = await self._generate_final_report(analysis_results)
+            # Run only the stages the requested outputs depend on
+            results = await self.pipeline.run(input_data, outputs)
+            self._record_agent_metrics(results)
             
             return AgentResponse(
                 success=True,
-                data=final_report
+                data={
+                    name: results[name].data if results[name].success
+                    else self._handle_agent_error(name, results[name].error)
+                    for name in outputs
+                }
             )
             
         except Exception as e:
@@ -55,56 +120,113 @@ class OrchestratorAgent(BaseAgent):
                 error=str(e)
             )
     
-    async def _run_parallel_analysis(
+    async def process_many(
         self,
-        chart_data: Any,
-        price_data: Any,
-        text_data: Any
-    ) -> Dict[str, Any]:
-        """Run analysis in parallel using all agents"""
-        # Run chart analysis
-        chart_response = await self.chart_agent.process({
-            'image': chart_data
-        })
-        
-        # Run technical analysis
-        technical_response = await self.technical_agent.process({
-            'price_data': price_data
-        })
-        
-        # Run sentiment analysis
-        sentiment_response = await self.sentiment_agent.process({
-            'text_data': text_data
-        })
-        
-        # Combine results
-        return {
-            'chart_analysis': chart_response.data if chart_response.success else {},
-            'technical_analysis': technical_response.data if technical_response.success else {},
-            'sentiment_analysis': sentiment_response.data if sentiment_response.success else {}
-        }
+        inputs: Union[Sequence[Dict[str, Any]], Mapping[str, Dict[str, Any]]],
+        max_concurrency: int = 4
+    ) -> Union[List[AgentResponse], Dict[str, AgentResponse]]:
+        """Process a batch of inputs (e.g. a watchlist) through the shared agents
+        
+        Args:
+            inputs: List of input dicts, or a mapping of symbol to input dict
+            max_concurrency: Maximum number of inputs analyzed at the same time
+        
+        Returns:
+            Responses in the order the inputs were given; a dict keyed by symbol
+            when a mapping was passed
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_one(input_data: Dict[str, Any]) -> AgentResponse:
+            async with semaphore:
+                return await self.process(input_data)
+        
+        if isinstance(inputs, Mapping):
+            symbols = list(inputs.keys())
+            responses = await asyncio.gather(*(run_one(inputs[s]) for s in symbols))
+            return dict(zip(symbols, responses))
+        
+        return list(await asyncio.gather(*(run_one(d) for d in inputs)))
+    
+    async def process_stream(
+        self,
+        input_data: Dict[str, Any]
+    ) -> AsyncIterator[Tuple[str, AgentResponse]]:
+        """
+        Stream (name, response) pairs as each agent finishes
+        
+        Fast agents (e.g. technical analysis) are emitted long before slow ones;
+        without explicit outputs the final report is emitted last as 'report'.
+        """
+        outputs = input_data.get('outputs')
+        missing = self._validate_input_data(input_data, outputs or ['report'])
+        if missing:
+            yield self.name, AgentResponse(
+                success=False,
+                data={},
+                error=f"Missing required input data: {', '.join(missing)}"
+            )
+            return
+        
+        results: Dict[str, AgentResponse] = {}
+        async for name, response in self.pipeline.stream(input_data, outputs or ['report']):
+            results[name] = response
+            if name == 'report' and outputs is None:
+                response = self._final_report(results)
+            yield name, response
+    
+    async def _process_report(self, input_data: Dict[str, Any]) -> AgentResponse:
+        """Run every analysis agent and the report generation agent"""
+        if self._validate_input_data(input_data, ['report']):
+            return AgentResponse(
+                success=False,
+                data={},
+                error="Missing required input data"
+            )
+        
+        results = await self.pipeline.run(input_data, ['report'])
+        self._record_agent_metrics(results)
+        return self._final_report(results)
     
-    async def _generate_final_report(self, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate final report using the report generation agent"""
-        report_response = await self.report_agent.process(analysis_results)
+    def _final_report(self, results: Dict[str, AgentResponse]) -> AgentResponse:
+        """Build the orchestrator response from the report stage"""
+        report_response = results['report']
         
         if not report_response.success:
-            return {
-                'error': report_response.error,
-                'partial_results': analysis_results
-            }
+            return AgentResponse(
+                success=True,
+                data={
+                    'error': report_response.error,
+                    'partial_results': {
+                        name: results[name].data if results[name].success else {}
+                        for name in ANALYSIS_OUTPUTS
+                    }
+                }
+            )
         
-        return report_response.data
+        return AgentResponse(
+            success=True,
+            data=report_response.data
+        )
+    
+    def _record_agent_metrics(self, results: Dict[str, AgentResponse]) -> None:
+        """Roll the per-agent metrics up into this request's metrics"""
+        collector = current_collector()
+        if collector is None:
+            return
+        for name, response in results.items():
+            collector.record_agent(name, response.metrics)
     
     def _validate_input_data(
         self,
-        chart_data: Any,
-        price_data: Any,
-        text_data: Any
-    ) -> bool:
-        """Validate input data before processing"""
-        # TODO: Implement input validation
-        return True
+        input_data: Dict[str, Any],
+        outputs: List[str]
+    ) -> List[str]:
+        """Validate input data before processing, returning the missing keys"""
+        return self.pipeline.missing_inputs(input_data, outputs)
     
     def _handle_agent_error(
         self,
@@ -117,26 +239,3 @@ class OrchestratorAgent(BaseAgent):
             'error': error,
             'status': 'failed'
         }
-    
-    def _update_agent_contexts(self, analysis_results: Dict[str, Any]) -> None:
-        """Update context for all agents based on analysis results"""
-        # Update chart agent context
-        self.chart_agent.update_context({
-            'technical_indicators': analysis_results.get('technical_analysis', {}).get('indicators', {}),
-            'sentiment_context': analysis_results.get('sentiment_analysis', {}).get('overall_sentiment', {})
-        })
-        
-        # Update technical agent context
-        self.technical_agent.update_context({
-            'chart_patterns': analysis_results.get('chart_analysis', {}).get('patterns', []),
-            'sentiment_context': analysis_results.get('sentiment_analysis', {}).get('overall_sentiment', {})
-        })
-        
-        # Update sentiment agent context
-        self.sentiment_agent.update_context({
-            'technical_context': analysis_results.get('technical_analysis', {}).get('summary', {}),
-            'chart_context': analysis_results.get('chart_analysis', {}).get('patterns', [])
-        })
-        
-        # Update report agent context
-        self.report_agent.update_context(analysis_results) 
\ No newline at end of file
@@ -0,0 +1,239 @@
+from typing import Any, Dict, List, Mapping, Sequence, Tuple, Union
+import numpy as np
+
+# Most recent hits returned per symbol for each of patterns and signals
+MAX_HITS = 50
+# Doji bodies are at most this fraction of the bar's range
+DOJI_BODY = 0.1
+# Hammer and shooting star shadows are at least this multiple of the body
+SHADOW_RATIO = 2.0
+# Bars over which the move preceding a reversal candle is measured
+TREND_LOOKBACK = 5
+# Price crossovers this far through the reference (fraction of close) score 1
+CROSS_SCALE = 0.01
+# RSI crossovers this many points through the threshold score 1
+RSI_SCALE = 10.0
+RSI_OVERSOLD = 30.0
+RSI_OVERBOUGHT = 70.0
+
+# Direction implied by each candlestick pattern
+CANDLESTICK_PATTERNS = {
+    'doji': 'neutral',
+    'hammer': 'bullish',
+    'shooting_star': 'bearish',
+    'bullish_engulfing': 'bullish',
+    'bearish_engulfing': 'bearish',
+    'bullish_harami': 'bullish',
+    'bearish_harami': 'bearish',
+    'morning_star': 'bullish',
+    'evening_star': 'bearish'
+}
+
+# Direction implied by each indicator crossover
+CROSSOVER_SIGNALS = {
+    'macd_bullish_cross': 'bullish',
+    'macd_bearish_cross': 'bearish',
+    'price_above_sma_20': 'bullish',
+    'price_below_sma_20': 'bearish',
+    'golden_cross': 'bullish',
+    'death_cross': 'bearish',
+    'rsi_oversold': 'bullish',
+    'rsi_overbought': 'bearish'
+}
+
+# Sparse hits of one pattern: flat positions and their strengths
+Hits = Tuple[np.ndarray, np.ndarray]
+
+def _lagged(current: np.ndarray, lag: int) -> np.ndarray:
+    """Place a mask computed for bars lag.. back onto the full time axis"""
+    mask = np.zeros(current.shape[:-1] + (current.shape[-1] + lag,), dtype=bool)
+    mask[..., lag:] = current
+    return mask
+
+def _sparse(mask: np.ndarray, strength: Any) -> Hits:
+    """Flat positions of a mask with strength(positions) clipped to [0, 1]"""
+    at = np.flatnonzero(mask)
+    return at, np.clip(strength(at), 0.0, 1.0)
+
+def candlestick_patterns(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray
+) -> Dict[str, Hits]:
+    """Scan every bar for each pattern in CANDLESTICK_PATTERNS
+
+    Works along the last axis. Patterns are found with whole-array boolean
+    masks; strengths are only computed at the hits. Positions index the
+    flattened (C-order) input.
+    """
+    o, h, l, c = (np.ascontiguousarray(v, dtype=np.float64) for v in (open_, high, low, close))
+    n = c.shape[-1]
+    body = np.abs(c - o)
+    span = h - l
+    top = np.maximum(o, c)
+    bottom = np.minimum(o, c)
+    upper = h - top
+    lower = bottom - l
+    rising = c > o
+    falling = c < o
+    flat = {
+        'c': c.ravel(), 'body': body.ravel(), 'span': span.ravel(),
+        'upper': upper.ravel(), 'lower': lower.ravel(), 'top': top.ravel(), 'bottom': bottom.ravel()
+    }
+    hits: Dict[str, Hits] = {}
+
+    def ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(denominator > 0, numerator / denominator, 1.0)
+
+    # Single bars
+    hits['doji'] = _sparse(
+        (span > 0) & (body <= DOJI_BODY * span),
+        lambda at: 1 - ratio(flat['body'][at], DOJI_BODY * flat['span'][at])
+    )
+    if n > TREND_LOOKBACK:
+        declined = _lagged(c[..., :-TREND_LOOKBACK] > c[..., TREND_LOOKBACK:], TREND_LOOKBACK)
+        declined = _lagged(declined[..., :-1], 1)
+        advanced = _lagged(c[..., :-TREND_LOOKBACK] < c[..., TREND_LOOKBACK:], TREND_LOOKBACK)
+        advanced = _lagged(advanced[..., :-1], 1)
+        long_lower = (body > DOJI_BODY * span) & (lower >= SHADOW_RATIO * body) & (upper <= body)
+        long_upper = (body > DOJI_BODY * span) & (upper >= SHADOW_RATIO * body) & (lower <= body)
+        hits['hammer'] = _sparse(
+            long_lower & declined,
+            lambda at: ratio(flat['lower'][at], flat['span'][at])
+        )
+        hits['shooting_star'] = _sparse(
+            long_upper & advanced,
+            lambda at: ratio(flat['upper'][at], flat['span'][at])
+        )
+    else:
+        hits['hammer'] = hits['shooting_star'] = (np.empty(0, dtype=np.int64), np.empty(0))
+
+    # Two bars: the current body engulfs, or sits inside, the previous one
+    if n > 1:
+        engulfs = _lagged(
+            (top[..., 1:] >= top[..., :-1]) & (bottom[..., 1:] <= bottom[..., :-1]) & (body[..., 1:] > body[..., :-1]),
+            1
+        )
+        inside = _lagged(
+            (top[..., 1:] <= top[..., :-1]) & (bottom[..., 1:] >= bottom[..., :-1]) & (body[..., 1:] < body[..., :-1]),
+            1
+        )
+        turns_up = _lagged(rising[..., 1:] & falling[..., :-1], 1)
+        turns_down = _lagged(falling[..., 1:] & rising[..., :-1], 1)
+        engulfing = lambda at: 1 - ratio(flat['body'][at - 1], flat['body'][at])
+        harami = lambda at: 1 - ratio(flat['body'][at], flat['body'][at - 1])
+        hits['bullish_engulfing'] = _sparse(engulfs & turns_up, engulfing)
+        hits['bearish_engulfing'] = _sparse(engulfs & turns_down, engulfing)
+        hits['bullish_harami'] = _sparse(inside & turns_up, harami)
+        hits['bearish_harami'] = _sparse(inside & turns_down, harami)
+    else:
+        for name in ['bullish_engulfing', 'bearish_engulfing', 'bullish_harami', 'bearish_harami']:
+            hits[name] = (np.empty(0, dtype=np.int64), np.empty(0))
+
+    # Three bars: a long body, a small pause, then a close past its midpoint
+    if n > 2:
+        long_first = body[..., :-2] >= 0.5 * span[..., :-2]
+        pause = body[..., 1:-1] <= 0.3 * body[..., :-2]
+        midpoint = (o[..., :-2] + c[..., :-2]) / 2
+        morning = long_first & pause & falling[..., :-2] & rising[..., 2:] & (c[..., 2:] > midpoint)
+        evening = long_first & pause & rising[..., :-2] & falling[..., 2:] & (c[..., 2:] < midpoint)
+        recovery = lambda at: ratio(
+            np.abs(flat['c'][at] - (flat['top'][at - 2] + flat['bottom'][at - 2]) / 2),
+            flat['body'][at - 2] / 2
+        )
+        hits['morning_star'] = _sparse(_lagged(morning, 2), recovery)
+        hits['evening_star'] = _sparse(_lagged(evening, 2), recovery)
+    else:
+        hits['morning_star'] = hits['evening_star'] = (np.empty(0, dtype=np.int64), np.empty(0))
+    return hits
+
+def _crossings(a: np.ndarray, b: Any, scale: Any) -> Tuple[Hits, Hits]:
+    """Upward and downward crossings of a through b
+
+    Strength is the swing of a - b across the crossing relative to scale.
+    """
+    gap = np.ascontiguousarray(a - b)
+    up = _lagged((gap[..., 1:] > 0) & (gap[..., :-1] <= 0), 1)
+    down = _lagged((gap[..., 1:] < 0) & (gap[..., :-1] >= 0), 1)
+    flat_gap = gap.ravel()
+    scale = np.asarray(scale, dtype=np.float64)
+    flat_scale = np.ascontiguousarray(scale).ravel() if scale.ndim else scale
+
+    def swing(at: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            strength = np.abs(flat_gap[at] - flat_gap[at - 1]) / (flat_scale[at] if scale.ndim else flat_scale)
+        return np.nan_to_num(strength, nan=0.0)
+
+    return _sparse(up, swing), _sparse(down, swing)
+
+def crossover_signals(close: np.ndarray, indicators: Mapping[str, Any]) -> Dict[str, Hits]:
+    """Scan indicator histories for each crossover in CROSSOVER_SIGNALS
+
+    Args:
+        close: Closing prices (time on the last axis)
+        indicators: Arrays keyed like compute_indicators' output, aligned with close
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if close.shape[-1] < 2:
+        return {name: (np.empty(0, dtype=np.int64), np.empty(0)) for name in CROSSOVER_SIGNALS}
+    values = {key: np.asarray(indicators[key], dtype=np.float64) for key in ['macd', 'macd_signal', 'sma_20', 'sma_50', 'rsi']}
+    price_scale = CROSS_SCALE * close
+    hits: Dict[str, Hits] = {}
+    hits['macd_bullish_cross'], hits['macd_bearish_cross'] = _crossings(values['macd'], values['macd_signal'], price_scale)
+    hits['price_above_sma_20'], hits['price_below_sma_20'] = _crossings(close, values['sma_20'], price_scale)
+    hits['golden_cross'], hits['death_cross'] = _crossings(values['sma_20'], values['sma_50'], price_scale)
+    # RSI signals fire when it leaves the oversold or overbought zone
+    hits['rsi_oversold'], _ = _crossings(values['rsi'], RSI_OVERSOLD, RSI_SCALE)
+    _, hits['rsi_overbought'] = _crossings(values['rsi'], RSI_OVERBOUGHT, RSI_SCALE)
+    return hits
+
+def collect_hits(
+    hits: Mapping[str, Hits],
+    directions: Mapping[str, str],
+    shape: Tuple[int, ...],
+    index: Sequence[Any],
+    max_hits: int = MAX_HITS
+) -> Union[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
+    """Turn sparse hits into records, most recent first
+
+    Keeps the latest max_hits per symbol. For (symbols x time) shapes one list
+    is returned per symbol.
+
+    Returns:
+        Records with the bar's 'index' label, pattern 'type', 'direction'
+        and 'strength' (0-1)
+    """
+    length = max(shape[-1], 1)
+    rows = int(np.prod(shape[:-1], dtype=np.int64))
+    names = list(hits)
+    # Only each row's latest max_hits of a pattern can make the merged cut
+    latest = []
+    for name in names:
+        at, strength = hits[name]
+        at_rows = at // length
+        keep = np.searchsorted(at_rows, at_rows, side='right') - np.arange(len(at)) <= max_hits
+        latest.append((at[keep], strength[keep]))
+    positions = np.concatenate([at for at, _ in latest] + [np.empty(0, dtype=np.int64)])
+    strengths = np.concatenate([strength for _, strength in latest] + [np.empty(0)])
+    kinds = np.repeat(np.arange(len(names)), [len(at) for at, _ in latest])
+    order = np.lexsort((kinds, positions))
+    hit_rows, hit_times = np.divmod(positions[order], length)
+    ends = np.searchsorted(hit_rows, np.arange(rows), side='right')
+    starts = np.concatenate([[0], ends[:-1]])
+
+    records: List[List[Dict[str, Any]]] = []
+    for row in range(rows):
+        selected = order[max(starts[row], ends[row] - max_hits):ends[row]][::-1]
+        times = hit_times[max(starts[row], ends[row] - max_hits):ends[row]][::-1]
+        records.append([
+            {
+                'index': index[time],
+                'type': names[kinds[hit]],
+                'direction': directions[names[kinds[hit]]],
+                'strength': float(strengths[hit])
+            }
+            for hit, time in zip(selected, times)
+        ])
+    return records[0] if len(shape) == 1 else records
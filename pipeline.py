@@ -0,0 +1,259 @@
+import asyncio
+import copy
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from .base_agent import BaseAgent, AgentResponse
+from .result_cache import ResultCache, hash_inputs
+
+logger = logging.getLogger(__name__)
+
+def is_missing(value: Any) -> bool:
+    """Check whether a request value is absent or empty"""
+    if value is None:
+        return True
+    if isinstance(value, (str, list, tuple, dict)):
+        return len(value) == 0
+    return False
+
+def _hash_node_inputs(agent_type: str, identity: Dict[str, Any], input_data: Dict[str, Any]) -> str:
+    """Cache key of a node's inputs
+
+    Inputs naming files (such as a chart image path) also hash the file's
+    size and modification time, so a file rewritten in place gets a new key.
+    """
+    files = {}
+    for name, value in input_data.items():
+        if isinstance(value, str) and os.path.isfile(value):
+            stat = os.stat(value)
+            files[name] = (stat.st_size, stat.st_mtime_ns)
+    return hash_inputs(agent_type, identity, input_data, files)
+
+class PipelineNode:
+    """A pipeline stage: an agent plus the inputs and upstream outputs it needs"""
+
+    def __init__(
+        self,
+        name: str,
+        agent: BaseAgent,
+        inputs: Optional[Dict[str, str]] = None,
+        upstream: Optional[Dict[str, str]] = None,
+        cacheable: bool = True
+    ):
+        """
+        Args:
+            name: Name of the node, also the key of its output
+            agent: Agent whose process method runs the stage
+            inputs: Mapping of agent input key to request key
+            upstream: Mapping of agent input key to upstream node name
+            cacheable: Whether results may be served from the result cache
+        """
+        self.name = name
+        self.agent = agent
+        self.inputs = inputs or {}
+        self.upstream = upstream or {}
+        self.cacheable = cacheable
+
+    @property
+    def dependencies(self) -> List[str]:
+        """Names of the upstream nodes this node waits for"""
+        return list(dict.fromkeys(self.upstream.values()))
+
+    def missing_inputs(self, request: Dict[str, Any]) -> List[str]:
+        """List the request keys this node needs but did not receive"""
+        return [key for key in self.inputs.values() if is_missing(request.get(key))]
+
+    def build_input(
+        self,
+        request: Dict[str, Any],
+        upstream_results: Dict[str, AgentResponse]
+    ) -> Dict[str, Any]:
+        """Assemble the agent input from the request and upstream results"""
+        input_data = {
+            agent_key: request.get(request_key)
+            for agent_key, request_key in self.inputs.items()
+        }
+        # Failed upstream stages contribute empty results, as before
+        for agent_key, node_name in self.upstream.items():
+            response = upstream_results.get(node_name)
+            input_data[agent_key] = response.data if response is not None and response.success else {}
+        return input_data
+
+class PipelineScheduler:
+    """Runs agents as a dependency graph, skipping stages nobody asked for"""
+
+    def __init__(
+        self,
+        nodes: Optional[Iterable[PipelineNode]] = None,
+        cache: Optional[ResultCache] = None
+    ):
+        self.nodes: Dict[str, PipelineNode] = {}
+        self.cache = cache
+        for node in nodes or []:
+            self.add_node(node)
+
+    def add_node(self, node: PipelineNode) -> None:
+        """Register a node; its upstream nodes may be registered later"""
+        if node.name in self.nodes:
+            raise ValueError(f"Duplicate pipeline node: {node.name}")
+        self.nodes[node.name] = node
+
+    def plan(self, outputs: Optional[Iterable[str]] = None) -> List[str]:
+        """Return the nodes needed for the requested outputs in dependency order"""
+        targets = list(outputs) if outputs is not None else list(self.nodes)
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str) -> None:
+            if name not in self.nodes:
+                raise ValueError(f"Unknown pipeline node: {name}")
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Dependency cycle at pipeline node: {name}")
+            state[name] = 'visiting'
+            for dependency in self.nodes[name].dependencies:
+                visit(dependency)
+            state[name] = 'done'
+            order.append(name)
+
+        for target in targets:
+            visit(target)
+        return order
+
+    def missing_inputs(
+        self,
+        request: Dict[str, Any],
+        outputs: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """List request keys required by the planned nodes but not provided"""
+        missing: List[str] = []
+        for name in self.plan(outputs):
+            for key in self.nodes[name].missing_inputs(request):
+                if key not in missing:
+                    missing.append(key)
+        return missing
+
+    async def run(
+        self,
+        request: Dict[str, Any],
+        outputs: Optional[Iterable[str]] = None
+    ) -> Dict[str, AgentResponse]:
+        """Run the planned nodes, each as soon as its dependencies finish
+
+        Returns:
+            Responses of every node that ran, keyed by node name
+        """
+        results: Dict[str, AgentResponse] = {}
+        async for name, response in self.stream(request, outputs):
+            results[name] = response
+        return results
+
+    async def stream(
+        self,
+        request: Dict[str, Any],
+        outputs: Optional[Iterable[str]] = None
+    ) -> AsyncIterator[Tuple[str, AgentResponse]]:
+        """Run the planned nodes, yielding (name, response) as each one finishes"""
+        results: Dict[str, AgentResponse] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        finished: asyncio.Queue = asyncio.Queue()
+
+        async def run_node(node: PipelineNode) -> AgentResponse:
+            try:
+                if node.dependencies:
+                    await asyncio.gather(*(tasks[name] for name in node.dependencies))
+                response = await self._run_node(node, request, results)
+            except Exception as e:
+                response = AgentResponse(success=False, data={}, error=str(e))
+            results[node.name] = response
+            finished.put_nowait((node.name, response))
+            return response
+
+        # Nodes are created in dependency order, so upstream tasks always exist
+        for name in self.plan(outputs):
+            tasks[name] = asyncio.ensure_future(run_node(self.nodes[name]))
+
+        try:
+            for _ in range(len(tasks)):
+                yield await finished.get()
+        finally:
+            # Stop any remaining work if the consumer goes away early
+            for task in tasks.values():
+                task.cancel()
+
+    async def _run_node(
+        self,
+        node: PipelineNode,
+        request: Dict[str, Any],
+        results: Dict[str, AgentResponse]
+    ) -> AgentResponse:
+        """Run a single node, isolating its failure from the rest of the graph"""
+        missing = node.missing_inputs(request)
+        if missing:
+            return AgentResponse(
+                success=False,
+                data={},
+                error=f"Missing required input data: {', '.join(missing)}"
+            )
+        try:
+            input_data = node.build_input(request, results)
+            key = await self._cache_key(node, input_data)
+            if key is not None:
+                cached = await node.agent.run_blocking(self.cache.get, key)
+                if cached is not None:
+                    return self._cache_hit(node, cached)
+
+            response = await node.agent.process(input_data)
+
+            if key is not None and response.success:
+                await self._cache_store(node, key, response)
+            return response
+        except Exception as e:
+            return AgentResponse(
+                success=False,
+                data={},
+                error=str(e)
+            )
+
+    async def _cache_key(self, node: PipelineNode, input_data: Dict[str, Any]) -> Optional[str]:
+        """Hash a node's inputs and its agent's cache identity, or None if it cannot be cached"""
+        if self.cache is None or not node.cacheable:
+            return None
+        agent = node.agent
+        try:
+            # Hashing large frames and images is CPU work too
+            return await agent.run_blocking(
+                _hash_node_inputs,
+                type(agent).__qualname__,
+                agent.cache_identity(),
+                input_data
+            )
+        except TypeError:
+            return None
+
+    async def _cache_store(self, node: PipelineNode, key: str, response: AgentResponse) -> None:
+        """Cache a successful response; a failing cache never fails the node"""
+        try:
+            stored = copy.copy(response)
+            stored.data = copy.deepcopy(response.data)
+            stored.metrics = None
+            await node.agent.run_blocking(self.cache.set, key, stored)
+        except Exception:
+            logger.warning("Could not cache the result of node %s", node.name, exc_info=True)
+
+    def _cache_hit(self, node: PipelineNode, cached: AgentResponse) -> AgentResponse:
+        """Return a copy of a cached response, flagged as a hit when instrumented"""
+        # Callers may modify the data; the cached entry must stay intact
+        response = copy.copy(cached)
+        response.data = copy.deepcopy(cached.data)
+        if node.agent.instrumentation_enabled:
+            response.metrics = {
+                'agent': node.agent.name,
+                'cache_hit': True,
+                'wall_time': 0.0,
+                'cpu_time': 0.0,
+                'peak_memory': 0,
+                'steps': {}
+            }
+        return response
@@ -0,0 +1,81 @@
+from typing import Any, Dict, Mapping, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+# Columns every OHLCV input must provide (matched case-insensitively)
+REQUIRED_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+# Columns used as the time index when present in non-DataFrame inputs
+INDEX_COLUMNS = ['date', 'datetime', 'timestamp', 'time']
+
+def resolve_columns(names: Sequence[Any], required: Sequence[str] = REQUIRED_COLUMNS) -> Dict[str, Any]:
+    """Map each required column to the input's column name, ignoring case
+
+    Exact lowercase names win over other spellings. Raises ValueError naming the
+    first missing column.
+    """
+    by_lower: Dict[str, Any] = {}
+    for name in names:
+        key = str(name).lower()
+        if key not in by_lower or str(name) == key:
+            by_lower[key] = name
+    resolved = {}
+    for column in required:
+        if column not in by_lower:
+            raise ValueError(f"Missing required column: {column}")
+        resolved[column] = by_lower[column]
+    return resolved
+
+def is_arrow_table(value: Any) -> bool:
+    """Duck-type check for pyarrow Tables and RecordBatches"""
+    return hasattr(value, 'column_names') and hasattr(value, 'column') and hasattr(value, 'num_rows')
+
+def arrow_column(table: Any, name: str) -> np.ndarray:
+    """View an Arrow column as NumPy, copying only for chunked or null-bearing data"""
+    column = table.column(name)
+    if hasattr(column, 'num_chunks') and column.num_chunks == 1:
+        column = column.chunk(0)
+    return column.to_numpy(zero_copy_only=False)
+
+def _columns_of(price_data: Any) -> Optional[Dict[Any, Any]]:
+    """Column views of a columnar input, or None if it is not columnar"""
+    if isinstance(price_data, Mapping):
+        return dict(price_data)
+    if isinstance(price_data, np.ndarray) and price_data.dtype.names:
+        return {name: price_data[name] for name in price_data.dtype.names}
+    if is_arrow_table(price_data):
+        return {name: arrow_column(price_data, name) for name in price_data.column_names}
+    return None
+
+def _split_index(columns: Dict[Any, Any]) -> Optional[pd.Index]:
+    """Remove a date-like column from the columns and return it as the index"""
+    for name in list(columns):
+        if str(name).lower() in INDEX_COLUMNS:
+            return pd.Index(columns.pop(name), name=str(name).lower())
+    return None
+
+def to_price_frame(price_data: Any, required: Sequence[str] = REQUIRED_COLUMNS) -> pd.DataFrame:
+    """Build an OHLCV DataFrame from columnar input without copying the columns
+
+    Accepts a DataFrame, a dict of arrays, a NumPy structured array or a pyarrow
+    Table. Required columns are matched case-insensitively and renamed to
+    lowercase. Lists of records are still accepted but are materialized row by
+    row, so they are much slower for long histories.
+    """
+    if isinstance(price_data, pd.DataFrame):
+        resolved = resolve_columns(list(price_data.columns), required)
+        renames = {name: column for column, name in resolved.items() if name != column}
+        # Renaming shares the column data (and keeps any extra columns)
+        return price_data.rename(columns=renames) if renames else price_data
+
+    columns = _columns_of(price_data)
+    if columns is None:
+        # Compatibility path for lists of records
+        return to_price_frame(pd.DataFrame(price_data), required)
+
+    index = _split_index(columns)
+    resolved = resolve_columns(list(columns), required)
+    data = {column: columns[name] for column, name in resolved.items()}
+    for name, values in columns.items():
+        if name not in resolved.values():
+            data.setdefault(name, values)
+    return pd.DataFrame(data, index=index, copy=False)
@@ -0,0 +1,191 @@
+import asyncio
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple, Type
+import numpy as np
+import pandas as pd
+from .base_agent import BaseAgent
+
+# (shared memory name, shape, dtype) of an array placed in shared memory
+SharedArrayHandle = Tuple[str, Tuple[int, ...], str]
+
+# Agent instances reused by each worker process, keyed by agent class
+_WORKER_AGENTS: Dict[type, BaseAgent] = {}
+
+def share_array(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, SharedArrayHandle]:
+    """Copy an array into a new shared memory block"""
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+def attach_array(handle: SharedArrayHandle) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Map an array placed in shared memory by another process"""
+    name, shape, dtype = handle
+    if sys.version_info >= (3, 13):
+        # The creating process owns the block and unlinks it
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+def _release(blocks: List[shared_memory.SharedMemory], unlink: bool = False) -> None:
+    """Close (and optionally unlink) shared memory blocks"""
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            # A result still references the mapping; it is unmapped once freed
+            pass
+        if unlink:
+            shm.unlink()
+
+def _worker_agent(agent_cls: Type[BaseAgent], options: Dict[str, Any]) -> BaseAgent:
+    """Get the worker-local agent instance, configured like the caller's agent"""
+    agent = _WORKER_AGENTS.get(agent_cls)
+    if agent is None:
+        agent = agent_cls()
+        _WORKER_AGENTS[agent_cls] = agent
+    for key, value in options.items():
+        setattr(agent, key, value)
+    return agent
+
+def _analyze_image_worker(
+    agent_cls: Type[BaseAgent],
+    options: Dict[str, Any],
+    handle: SharedArrayHandle
+) -> Dict[str, Any]:
+    """Run an agent's image analysis on an image held in shared memory"""
+    shm, image = attach_array(handle)
+    try:
+        return _worker_agent(agent_cls, options)._run_analysis(image)
+    finally:
+        del image
+        _release([shm])
+
+def _analyze_frame_worker(
+    agent_cls: Type[BaseAgent],
+    options: Dict[str, Any],
+    column_handles: Dict[str, SharedArrayHandle],
+    pickled_columns: Dict[str, Any],
+    column_order: List[Any],
+    index_spec: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Run an agent's DataFrame analysis on columns held in shared memory"""
+    blocks = []
+    columns: Dict[Any, Any] = dict(pickled_columns)
+    try:
+        for column, handle in column_handles.items():
+            shm, values = attach_array(handle)
+            blocks.append(shm)
+            columns[column] = values
+        index = _rebuild_index(index_spec, blocks)
+        df = pd.DataFrame({column: columns[column] for column in column_order}, index=index, copy=False)
+        return _worker_agent(agent_cls, options)._run_analysis(df)
+    finally:
+        columns = df = index = None
+        _release(blocks)
+
+def _share_index(index: pd.Index) -> Tuple[Dict[str, Any], Optional[shared_memory.SharedMemory]]:
+    """Describe an index so a worker can rebuild it, sharing its values if large"""
+    if isinstance(index, pd.RangeIndex):
+        return {'kind': 'pickled', 'index': index}, None
+    if isinstance(index, pd.DatetimeIndex):
+        tz = str(index.tz) if index.tz is not None else None
+        values = index.tz_convert(None) if tz is not None else index
+        shm, handle = share_array(values.to_numpy())
+        return {
+            'kind': 'datetime',
+            'handle': handle,
+            'tz': tz,
+            'freq': index.freqstr,
+            'name': index.name
+        }, shm
+    if index.dtype.kind in 'iufb':
+        shm, handle = share_array(index.to_numpy())
+        return {'kind': 'numeric', 'handle': handle, 'name': index.name}, shm
+    return {'kind': 'pickled', 'index': index}, None
+
+def _rebuild_index(index_spec: Dict[str, Any], blocks: List[shared_memory.SharedMemory]) -> pd.Index:
+    """Rebuild an index described by _share_index"""
+    if index_spec['kind'] == 'pickled':
+        return index_spec['index']
+    shm, values = attach_array(index_spec['handle'])
+    blocks.append(shm)
+    if index_spec['kind'] == 'datetime':
+        index = pd.DatetimeIndex(values.copy(), name=index_spec['name'])
+        if index_spec['tz'] is not None:
+            index = index.tz_localize('UTC').tz_convert(index_spec['tz'])
+        if index_spec['freq'] is not None:
+            index = pd.DatetimeIndex(index, freq=index_spec['freq'])
+        return index
+    return pd.Index(values, name=index_spec['name'], copy=True)
+
+class ProcessPoolBackend:
+    """Runs CPU-bound agent analysis in worker processes
+
+    Large arrays (chart images, OHLCV columns) are handed to the workers
+    through shared memory instead of being pickled; each worker runs the same
+    analysis code as the in-process path, so results are identical.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, mp_context: Optional[Any] = None):
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context or multiprocessing.get_context('spawn')
+        )
+
+    async def analyze_image(self, agent: BaseAgent, image: np.ndarray) -> Dict[str, Any]:
+        """Run agent._run_analysis on an image in a worker process"""
+        shm, handle = share_array(image)
+        try:
+            return await self._submit(
+                _analyze_image_worker,
+                type(agent),
+                agent.worker_options(),
+                handle
+            )
+        finally:
+            _release([shm], unlink=True)
+
+    async def analyze_frame(self, agent: BaseAgent, df: pd.DataFrame) -> Dict[str, Any]:
+        """Run agent._run_analysis on a DataFrame in a worker process"""
+        blocks = []
+        column_handles: Dict[str, SharedArrayHandle] = {}
+        pickled_columns: Dict[str, Any] = {}
+        try:
+            for column in df.columns:
+                values = df[column].to_numpy()
+                if values.dtype.kind in 'iufb':
+                    shm, handle = share_array(values)
+                    blocks.append(shm)
+                    column_handles[column] = handle
+                else:
+                    # Object, string and extension columns are small enough to pickle
+                    pickled_columns[column] = df[column].array
+            index_spec, index_block = _share_index(df.index)
+            if index_block is not None:
+                blocks.append(index_block)
+
+            return await self._submit(
+                _analyze_frame_worker,
+                type(agent),
+                agent.worker_options(),
+                column_handles,
+                pickled_columns,
+                list(df.columns),
+                index_spec
+            )
+        finally:
+            _release(blocks, unlink=True)
+
+    async def _submit(self, func: Any, *args: Any) -> Any:
+        """Submit work to the pool and await it without blocking the event loop"""
+        return await asyncio.wrap_future(self.executor.submit(func, *args))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker processes"""
+        self.executor.shutdown(wait=wait)
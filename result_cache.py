@@ -0,0 +1,249 @@
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .price_data import arrow_column, is_arrow_table
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different copies hash the same"""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', text)).strip()
+
+def _update_array(hasher: Any, values: np.ndarray) -> None:
+    """Feed an array's dtype, shape and contents to the hasher"""
+    hasher.update(f"{values.dtype.str}{values.shape}".encode())
+    if values.dtype.kind == 'O':
+        for item in values.ravel():
+            _update(hasher, item)
+    else:
+        hasher.update(np.ascontiguousarray(values).tobytes())
+
+def _update_series(hasher: Any, series: pd.Series) -> None:
+    """Feed a pandas column to the hasher"""
+    dtype = series.dtype
+    hasher.update(str(dtype).encode())
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufc':
+        hasher.update(np.ascontiguousarray(series.to_numpy()).tobytes())
+    elif dtype.kind in 'mM':
+        # Datetimes (including tz-aware) hash their integer representation
+        hasher.update(np.ascontiguousarray(series.array.asi8).tobytes())
+    else:
+        hasher.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+
+def _update(hasher: Any, value: Any) -> None:
+    """Feed a value to the hasher, tagged with its type"""
+    if value is None or isinstance(value, (bool, int, float, complex)):
+        hasher.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, str):
+        hasher.update(b'str:')
+        hasher.update(normalize_text(value).encode('utf-8'))
+        hasher.update(b';')
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        hasher.update(b'bytes:')
+        hasher.update(bytes(value))
+    elif isinstance(value, np.ndarray):
+        hasher.update(b'ndarray:')
+        _update_array(hasher, value)
+    elif isinstance(value, np.generic):
+        hasher.update(f"{value.dtype.str}:{value!r};".encode())
+    elif isinstance(value, pd.DataFrame):
+        hasher.update(b'dataframe:')
+        _update_series(hasher, value.index.to_series())
+        for column in value.columns:
+            _update(hasher, column)
+            _update_series(hasher, value[column])
+    elif isinstance(value, pd.Series):
+        hasher.update(b'series:')
+        _update_series(hasher, value.index.to_series())
+        _update_series(hasher, value)
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f"{type(value).__name__}[{len(value)}]:".encode())
+        for item in value:
+            _update(hasher, item)
+    elif isinstance(value, dict):
+        hasher.update(f"dict[{len(value)}]:".encode())
+        for key in sorted(value, key=repr):
+            _update(hasher, key)
+            _update(hasher, value[key])
+    elif is_arrow_table(value):
+        hasher.update(f"table[{value.num_rows}]:".encode())
+        for name in value.column_names:
+            _update(hasher, name)
+            _update_array(hasher, arrow_column(value, name))
+    elif hasattr(value, 'tobytes') and hasattr(value, 'mode') and hasattr(value, 'size'):
+        # PIL image: hash the decoded pixels, not the file encoding
+        hasher.update(f"image:{value.mode}{value.size}".encode())
+        hasher.update(value.tobytes())
+    else:
+        raise TypeError(f"Cannot compute a stable hash for {type(value).__name__}")
+
+def hash_inputs(*values: Any) -> str:
+    """Compute a stable content hash of agent inputs
+
+    DataFrames hash their column bytes, images their pixel bytes and text its
+    normalized form. Raises TypeError for values without a stable encoding.
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    for value in values:
+        _update(hasher, value)
+    return hasher.hexdigest()
+
+class ResultCache:
+    """Content-addressed cache with an in-memory LRU tier and optional disk tier"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None
+    ):
+        """
+        Args:
+            max_entries: Maximum number of results kept in memory
+            ttl: Seconds after which a result expires (None keeps results forever)
+            disk_dir: Directory for the on-disk tier (None disables it)
+            disk_max_bytes: Maximum total size of the on-disk tier
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'memory_hits': 0, 'disk_hits': 0, 'evictions': 0}
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look up a result, returning None on a miss"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[0]):
+                self._memory.move_to_end(key)
+                self._stats['hits'] += 1
+                self._stats['memory_hits'] += 1
+                return entry[1]
+            if entry is not None:
+                del self._memory[key]
+
+            entry = self._disk_get(key)
+            if entry is not None:
+                self._memory_set(key, entry[1], entry[0])
+                self._stats['hits'] += 1
+                self._stats['disk_hits'] += 1
+                return entry[1]
+
+            self._stats['misses'] += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a result in every enabled tier"""
+        created_at = time.time()
+        with self._lock:
+            self._memory_set(key, value, created_at)
+            if self.disk_dir is not None:
+                self._disk_set(key, value, created_at)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes
+            }
+
+    def clear(self) -> None:
+        """Remove every cached result"""
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._disk):
+                self._disk_remove(key)
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def _memory_set(self, key: str, value: Any, created_at: float) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.pkl")
+
+    def _load_disk_index(self) -> None:
+        """Index existing cache files, least recently used first"""
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for filename in files:
+                if filename.endswith('.pkl'):
+                    stat = os.stat(os.path.join(root, filename))
+                    entries.append((stat.st_mtime, filename[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, Any]]:
+        if self.disk_dir is None or key not in self._disk:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                created_at, value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            self._disk_remove(key)
+            return None
+        if self._expired(created_at):
+            self._disk_remove(key)
+            return None
+        os.utime(path)
+        self._disk.move_to_end(key)
+        return created_at, value
+
+    def _disk_set(self, key: str, value: Any, created_at: float) -> None:
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write atomically so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((created_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Unpicklable values and full disks leave no partial file behind
+            os.remove(tmp_path)
+            raise
+
+        if key in self._disk:
+            self._disk_bytes -= self._disk.pop(key)
+        size = os.path.getsize(path)
+        self._disk[key] = size
+        self._disk_bytes += size
+        while self.disk_max_bytes is not None and self._disk_bytes > self.disk_max_bytes and len(self._disk) > 1:
+            self._disk_remove(next(iter(self._disk)))
+            self._stats['evictions'] += 1
+
+    def _disk_remove(self, key: str) -> None:
+        self._disk_bytes -= self._disk.pop(key, 0)
+        try:
+            os.remove(self._disk_path(key))
+        except FileNotFoundError:
+            pass
@@ -1,20 +1,48 @@
-from typing import Dict, Any, List
-from transformers import pipeline
+from typing import Dict, Any, List, Optional, Tuple
 from .base_agent import BaseAgent, AgentResponse
+from .instrumentation import timed_step
+from .inference_backends import with_backend
+from .micro_batching import LengthBucketedClassifier
+from .model_registry import ModelRegistry, default_registry, model_identity
+from .near_duplicates import NEAR_DUPLICATE_THRESHOLD, near_duplicate_clusters
+from .result_cache import normalize_text
+from .sentiment_cache import SentimentCache
+from .topics import MAX_TOPICS, TopicExtractor
 
 class SentimentAnalysisAgent(BaseAgent):
     """Agent responsible for analyzing market sentiment from text data"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        sentiment_analyzer: Optional[Any] = None,
+        sentiment_cache: Optional[SentimentCache] = None,
+        batch_size: int = 32,
+        max_length: int = 512,
+        model_registry: Optional[ModelRegistry] = None,
+        backend: str = 'fp32',
+        near_duplicate_threshold: Optional[float] = NEAR_DUPLICATE_THRESHOLD
+    ):
         super().__init__(
             name="SentimentAnalysisAgent",
             description="Analyzes market sentiment from news and social media"
         )
-        # Initialize sentiment analysis pipeline
-        self.sentiment_analyzer = pipeline(
-            "sentiment-analysis",
-            model="ProsusAI/finbert"  # Financial sentiment analysis model
-        )
+        # Use the shared FinBERT pipeline (loaded on first use) unless one is
+        # supplied, batching texts of similar token length together; backend
+        # selects fp32, int8 or ONNX Runtime inference
+        if sentiment_analyzer is None:
+            sentiment_analyzer = LengthBucketedClassifier(
+                (model_registry or default_registry).lazy('finbert', backend),
+                batch_size=batch_size,
+                max_length=max_length
+            )
+        else:
+            sentiment_analyzer = with_backend(sentiment_analyzer, backend)
+        self.sentiment_analyzer = sentiment_analyzer
+        self.backend = backend
+        # Optional per-text result cache shared across requests and restarts
+        self.sentiment_cache = sentiment_cache
+        # Near-duplicate texts share one FinBERT call (None disables)
+        self.near_duplicate_threshold = near_duplicate_threshold
         
     async def process(self, input_data: Dict[str, Any]) -> AgentResponse:
         try:
@@ -42,28 +70,99 @@ class SentimentAnalysisAgent(BaseAgent):
                 error=str(e)
             )
     
+    def worker_options(self) -> Dict[str, Any]:
+        return {'backend': self.backend}
+    
+    def cache_identity(self) -> Dict[str, Any]:
+        return {
+            **self.worker_options(),
+            'model': model_identity(self.sentiment_analyzer),
+            'near_duplicate_threshold': self.near_duplicate_threshold
+        }
+    
+    def set_sentiment_cache(self, cache: Optional[SentimentCache]) -> None:
+        """Reuse per-text sentiment results across requests (None disables caching)"""
+        self.sentiment_cache = cache
+    
     async def _analyze_sentiment(self, text_data: Any) -> Dict[str, Any]:
         """Analyze sentiment from text data"""
+        return await self.run_blocking(self._run_analysis, text_data)
+    
+    def _run_analysis(self, text_data: Any) -> Dict[str, Any]:
+        """Run the blocking FinBERT inference steps"""
+        # One inference pass feeds every sentiment output
+        texts = self._texts(text_data)
+        sentiments, clusters = self._classify_texts(texts)
+        overall_sentiment = self._get_overall_sentiment(sentiments)
         results = {
-            'overall_sentiment': self._get_overall_sentiment(text_data),
-            'sentiment_breakdown': self._get_sentiment_breakdown(text_data),
-            'key_topics': self._extract_key_topics(text_data),
-            'market_impact': self._assess_market_impact(text_data)
+            'overall_sentiment': overall_sentiment,
+            'sentiment_breakdown': self._get_sentiment_breakdown(sentiments),
+            'key_topics': self._extract_key_topics(texts, sentiments),
+            'market_impact': self._assess_market_impact(overall_sentiment),
+            'duplicate_clusters': clusters
         }
         return results
     
-    def _get_overall_sentiment(self, text_data: Any) -> Dict[str, Any]:
-        """Calculate overall sentiment score"""
+    @staticmethod
+    def _texts(text_data: Any) -> List[str]:
         if isinstance(text_data, str):
-            texts = [text_data]
-        elif isinstance(text_data, list):
-            texts = text_data
-        else:
-            raise ValueError("Text data must be string or list of strings")
+            return [text_data]
+        if isinstance(text_data, list):
+            return text_data
+        raise ValueError("Text data must be string or list of strings")
+    
+    @timed_step
+    def _classify_texts(self, texts: List[str]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Classify each text, running FinBERT once per distinct uncached story
+        
+        Texts that normalize to the same string share one result, within the
+        request and, with a sentiment cache, across requests. Uncached texts
+        that are near-duplicates of each other (see near_duplicates) share
+        the result of the first one.
+        
+        Returns:
+            One result per text, and the clusters of texts sharing a result
+            ('representative' and 'members' positions, 'size')
+        """
+        # First original spelling of each distinct normalized text
+        normalized = [normalize_text(text) for text in texts]
+        distinct: Dict[str, str] = {}
+        for key, text in zip(normalized, texts):
+            distinct.setdefault(key, text)
+        
+        known: Dict[str, Dict[str, Any]] = {}
+        cache_keys: Dict[str, str] = {}
+        if self.sentiment_cache is not None:
+            cache_keys = {key: self.sentiment_cache.key(key, self.backend) for key in distinct}
+            cached = self.sentiment_cache.get_many(cache_keys.values())
+            known = {key: cached[cache_keys[key]] for key in distinct if cache_keys[key] in cached}
         
-        # Analyze sentiment for each text
-        sentiments = self.sentiment_analyzer(texts)
+        # Distinct text whose result each distinct text uses
+        source = {key: key for key in distinct}
+        missing = [key for key in distinct if key not in known]
+        if len(missing) > 1 and self.near_duplicate_threshold is not None:
+            labels = near_duplicate_clusters([distinct[key] for key in missing], self.near_duplicate_threshold)
+            for key, label in zip(missing, labels):
+                source[key] = missing[label]
+            missing = [key for key in missing if source[key] == key]
+        if missing:
+            computed = dict(zip(missing, self.sentiment_analyzer([distinct[key] for key in missing])))
+            known.update(computed)
+            if self.sentiment_cache is not None:
+                self.sentiment_cache.set_many({cache_keys[key]: result for key, result in computed.items()})
         
+        members: Dict[str, List[int]] = {}
+        for position, key in enumerate(normalized):
+            members.setdefault(source[key], []).append(position)
+        clusters = [
+            {'representative': positions[0], 'members': positions, 'size': len(positions)}
+            for positions in members.values() if len(positions) > 1
+        ]
+        return [dict(known[source[key]]) for key in normalized], clusters
+    
+    @timed_step
+    def _get_overall_sentiment(self, sentiments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Calculate overall sentiment score"""
         # Calculate average sentiment
         sentiment_scores = {
             'positive': 0,
@@ -83,25 +182,25 @@ class SentimentAnalysisAgent(BaseAgent):
         
         return sentiment_scores
     
-    def _get_sentiment_breakdown(self, text_data: Any) -> List[Dict[str, Any]]:
+    @timed_step
+    def _get_sentiment_breakdown(self, sentiments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Get detailed sentiment breakdown for each text"""
-        if isinstance(text_data, str):
-            texts = [text_data]
-        elif isinstance(text_data, list):
-            texts = text_data
-        else:
-            raise ValueError("Text data must be string or list of strings")
-        
-        return self.sentiment_analyzer(texts)
+        return sentiments
     
-    def _extract_key_topics(self, text_data: Any) -> List[Dict[str, Any]]:
-        """Extract key topics from the text"""
-        # TODO: Implement topic extraction
-        return []
+    @timed_step
+    def _extract_key_topics(
+        self,
+        texts: List[str],
+        sentiments: List[Dict[str, Any]],
+        max_topics: int = MAX_TOPICS
+    ) -> List[Dict[str, Any]]:
+        """Extract key topics from the text, each with the sentiment of the texts mentioning it"""
+        # Accumulators sized to this request's terms, not the full hash space
+        return TopicExtractor(compact=True).partial_fit(texts, sentiments).topics(max_topics)
     
-    def _assess_market_impact(self, text_data: Any) -> Dict[str, Any]:
+    @timed_step
+    def _assess_market_impact(self, sentiment_scores: Dict[str, Any]) -> Dict[str, Any]:
         """Assess potential market impact of the sentiment"""
-        sentiment_scores = self._get_overall_sentiment(text_data)
         
         # Calculate market impact score (-1 to 1)
         impact_score = (
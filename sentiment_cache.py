@@ -0,0 +1,145 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+from .result_cache import normalize_text
+
+# Keys looked up per SQLite query (below SQLite's bound-parameter limit)
+_QUERY_CHUNK = 500
+
+class SentimentCache:
+    """Per-text sentiment results with an in-memory LRU tier and optional SQLite tier
+
+    Entries are keyed by a hash of the model name, the inference backend
+    (other than fp32) and the normalized text, so the same headline is
+    classified once across symbols, requests and (with a database path)
+    restarts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        path: Optional[str] = None,
+        model: str = "ProsusAI/finbert"
+    ):
+        """
+        Args:
+            max_entries: Maximum number of results kept in memory
+            path: SQLite database file for the persistent tier (None disables it)
+            model: Model identifier mixed into every key
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.model = model
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'memory_hits': 0, 'disk_hits': 0, 'evictions': 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS sentiments "
+                    "(key TEXT PRIMARY KEY, label TEXT NOT NULL, score REAL NOT NULL)"
+                )
+
+    def key(self, text: str, backend: str = 'fp32') -> str:
+        """Cache key of a text for this cache's model on an inference backend"""
+        model = self.model if backend == 'fp32' else f"{self.model}:{backend}"
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(model.encode('utf-8'))
+        hasher.update(b'\0')
+        hasher.update(normalize_text(text).encode('utf-8'))
+        return hasher.hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up several keys at once, returning only the hits"""
+        keys = list(dict.fromkeys(keys))
+        with self._lock:
+            found: Dict[str, Dict[str, Any]] = {}
+            for key in keys:
+                result = self._memory.get(key)
+                if result is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = result
+            self._stats['memory_hits'] += len(found)
+
+            missing = [key for key in keys if key not in found]
+            if self._db is not None and missing:
+                on_disk = self._disk_get(missing)
+                for key, result in on_disk.items():
+                    self._memory_set(key, result)
+                found.update(on_disk)
+                self._stats['disk_hits'] += len(on_disk)
+
+            self._stats['hits'] += len(found)
+            self._stats['misses'] += len(keys) - len(found)
+            return {key: dict(result) for key, result in found.items()}
+
+    def set_many(self, results: Dict[str, Dict[str, Any]]) -> None:
+        """Store results (dicts with 'label' and 'score') in every enabled tier"""
+        entries = {key: {'label': result['label'], 'score': float(result['score'])} for key, result in results.items()}
+        with self._lock:
+            for key, result in entries.items():
+                self._memory_set(key, result)
+            if self._db is not None and entries:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO sentiments (key, label, score) VALUES (?, ?, ?)",
+                        [(key, result['label'], result['score']) for key, result in entries.items()]
+                    )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            disk_entries = 0
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM sentiments").fetchone()[0]
+            return {
+                **self._stats,
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries
+            }
+
+    def clear(self) -> None:
+        """Remove every cached result"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM sentiments")
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _memory_set(self, key: str, result: Dict[str, Any]) -> None:
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _disk_get(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[start:start + _QUERY_CHUNK]
+            rows = self._db.execute(
+                f"SELECT key, label, score FROM sentiments WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            for key, label, score in rows:
+                found[key] = {'label': label, 'score': score}
+        return found
@@ -0,0 +1,200 @@
+import asyncio
+import io
+import math
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from PIL import Image
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from .base_agent import AgentResponse
+from .chart_qa_agent import ChartQAAgent
+from .indicators import IndicatorBlock
+from .micro_batching import BatchedQuestionAnswerer, BatchedTextClassifier
+from .model_registry import ModelRegistry, default_registry
+from .orchestrator_agent import OrchestratorAgent
+from .sentiment_analysis_agent import SentimentAnalysisAgent
+from .sentiment_cache import SentimentCache
+
+def _to_jsonable(value: Any) -> Any:
+    """Convert agent results (pandas, NumPy, NaN) into JSON-compatible values"""
+    if isinstance(value, AgentResponse):
+        return _to_jsonable({
+            'success': value.success,
+            'data': value.data,
+            'error': value.error,
+            'metrics': value.metrics
+        })
+    if isinstance(value, IndicatorBlock):
+        return _to_jsonable(value.to_dict())
+    if isinstance(value, dict):
+        return {str(key): _to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(item) for item in value]
+    if isinstance(value, pd.DataFrame):
+        return _to_jsonable(value.to_dict('list'))
+    if isinstance(value, (pd.Series, pd.Index)):
+        return _to_jsonable(value.tolist())
+    if isinstance(value, np.ndarray):
+        return _to_jsonable(value.tolist())
+    if isinstance(value, np.generic):
+        return _to_jsonable(value.item())
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value
+
+async def _read_image(upload: UploadFile) -> Image.Image:
+    """Decode an uploaded chart image"""
+    try:
+        image = Image.open(io.BytesIO(await upload.read()))
+        image.load()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid chart image: {e}")
+    return image
+
+async def _read_price_data(upload: UploadFile) -> pd.DataFrame:
+    """Parse uploaded OHLCV data from CSV, JSON or Parquet"""
+    content = await upload.read()
+    filename = (upload.filename or '').lower()
+    try:
+        if filename.endswith('.parquet'):
+            df = pd.read_parquet(io.BytesIO(content))
+        elif filename.endswith('.json') or upload.content_type == 'application/json':
+            df = pd.read_json(io.BytesIO(content))
+        else:
+            df = pd.read_csv(io.BytesIO(content))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid price data: {e}")
+
+    # Accept yfinance-style capitalized columns and a leading date column
+    df.columns = [str(column).lower() for column in df.columns]
+    for column in ('date', 'datetime', 'timestamp'):
+        if column in df.columns:
+            df = df.set_index(pd.to_datetime(df.pop(column), utc=True))
+            break
+    return df
+
+def create_app(
+    orchestrator: Optional[OrchestratorAgent] = None,
+    chart_qa_agent: Optional[ChartQAAgent] = None,
+    max_batch_size: int = 32,
+    max_wait: float = 0.01,
+    model_threads: int = 64,
+    sentiment_cache: Optional[SentimentCache] = None,
+    model_registry: Optional[ModelRegistry] = None,
+    warmup: bool = True
+) -> FastAPI:
+    """
+    Create the HTTP service exposing the orchestrator and ChartQAAgent
+
+    FinBERT and question-answering calls from concurrent requests are
+    coalesced into batched pipeline invocations.
+
+    Args:
+        orchestrator: Orchestrator to serve (created if not given)
+        chart_qa_agent: Chart QA agent to serve (created if not given)
+        max_batch_size: Maximum number of items per batched model call
+        max_wait: Seconds to wait for more items before running a batch
+        model_threads: Threads available for requests waiting on model batches
+        sentiment_cache: Per-text FinBERT result cache shared by all requests
+        model_registry: Registry the default agents load their models from
+        warmup: Load the agents' models at startup instead of on the first request
+    """
+    # Waiting callers occupy a thread each, so the pool bounds batch fill-up
+    model_executor = ThreadPoolExecutor(max_workers=model_threads, thread_name_prefix="model")
+
+    registry = model_registry or default_registry
+    if orchestrator is None:
+        orchestrator = OrchestratorAgent(
+            model_executor=model_executor,
+            sentiment_agent=SentimentAnalysisAgent(model_registry=registry)
+        )
+    else:
+        orchestrator.sentiment_agent.set_executor(model_executor)
+    if chart_qa_agent is None:
+        chart_qa_agent = ChartQAAgent(model_registry=registry)
+    chart_qa_agent.set_executor(model_executor)
+
+    sentiment_agent = orchestrator.sentiment_agent
+    if sentiment_cache is not None:
+        sentiment_agent.set_sentiment_cache(sentiment_cache)
+    sentiment_batcher = BatchedTextClassifier(
+        sentiment_agent.sentiment_analyzer,
+        max_batch_size=max_batch_size,
+        max_wait=max_wait
+    )
+    sentiment_agent.sentiment_analyzer = sentiment_batcher
+    qa_batcher = BatchedQuestionAnswerer(
+        chart_qa_agent.qa_model,
+        max_batch_size=max_batch_size,
+        max_wait=max_wait
+    )
+    chart_qa_agent.qa_model = qa_batcher
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        if warmup:
+            await asyncio.get_running_loop().run_in_executor(model_executor, registry.warmup)
+        try:
+            yield
+        finally:
+            sentiment_batcher.close()
+            qa_batcher.close()
+            model_executor.shutdown(wait=False)
+
+    app = FastAPI(title="Financial Chart Analysis", lifespan=lifespan)
+    app.state.orchestrator = orchestrator
+    app.state.chart_qa_agent = chart_qa_agent
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        return {'status': 'ok'}
+
+    @app.get("/stats")
+    async def stats() -> Dict[str, Any]:
+        result = {
+            'sentiment_batching': sentiment_batcher.stats(),
+            'qa_batching': qa_batcher.stats(),
+            'models': registry.stats()
+        }
+        if sentiment_agent.sentiment_cache is not None:
+            result['sentiment_cache'] = sentiment_agent.sentiment_cache.stats()
+        return result
+
+    @app.post("/analyze")
+    async def analyze(
+        chart: Optional[UploadFile] = File(None),
+        price_data: Optional[UploadFile] = File(None),
+        text_data: List[str] = Form([]),
+        outputs: Optional[List[str]] = Form(None)
+    ) -> Dict[str, Any]:
+        input_data: Dict[str, Any] = {'text_data': text_data}
+        if chart is not None:
+            input_data['chart_data'] = await _read_image(chart)
+        if price_data is not None:
+            input_data['price_data'] = await _read_price_data(price_data)
+        if outputs:
+            input_data['outputs'] = outputs
+
+        result = await orchestrator.process(input_data)
+        return _to_jsonable(result)
+
+    @app.post("/chart-qa")
+    async def chart_qa(
+        chart: UploadFile = File(...),
+        question: str = Form(...)
+    ) -> Dict[str, Any]:
+        result = await chart_qa_agent.process({
+            'chart_image': await _read_image(chart),
+            'question': question
+        })
+        return _to_jsonable(result)
+
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000)
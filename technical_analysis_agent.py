@@ -1,33 +1,73 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from ta.trend import SMAIndicator, EMAIndicator, MACD
 from ta.momentum import RSIIndicator
 from ta.volatility import BollingerBands
 from .base_agent import BaseAgent, AgentResponse
+from .indicators import (
+    SERIES_NAMES, IndicatorBlock, IndicatorState, classify_trend, compute_indicators,
+    trend_statistics, volatility
+)
+from .instrumentation import timed_step
+from .levels import key_levels
+from .patterns import (
+    CANDLESTICK_PATTERNS, CROSSOVER_SIGNALS, candlestick_patterns, collect_hits, crossover_signals
+)
+from .price_data import to_price_frame
+from .timeframes import BarPyramid
 
 class TechnicalAnalysisAgent(BaseAgent):
     """Agent responsible for technical analysis of financial data"""
     
+    # Fields a panel must provide, each as a (symbols x time) matrix
+    PANEL_FIELDS = ['close', 'high', 'low', 'volume']
+    # Supported representations of the indicator output
+    INDICATOR_FORMATS = ['series', 'block']
+    
     def __init__(self):
         super().__init__(
             name="TechnicalAnalysisAgent",
             description="Performs technical analysis on financial data"
         )
+        # Optional ProcessPoolBackend for running analysis in worker processes
+        self.process_backend: Optional[Any] = None
+        # Incremental indicator state per symbol, for live bar updates
+        self.indicator_states: Dict[str, IndicatorState] = {}
+        # Indicator output: float64 pandas Series, or one float32 IndicatorBlock
+        self.indicator_format = 'series'
+        # Bars of indicator history returned (None returns the full history)
+        self.indicator_window: Optional[int] = None
         
     async def process(self, input_data: Dict[str, Any]) -> AgentResponse:
         try:
+            # Panels of aligned symbols are analyzed in one vectorized pass
+            panel_data = input_data.get('panel_data')
+            if panel_data is not None:
+                return AgentResponse(
+                    success=True,
+                    data=await self.run_blocking(self.analyze_panel, panel_data)
+                )
+            
+            # Cached multi-timeframe bars are analyzed per timeframe
+            pyramid = input_data.get('pyramid')
+            if pyramid is not None:
+                return AgentResponse(
+                    success=True,
+                    data=await self.run_blocking(self.analyze_timeframes, pyramid, input_data.get('timeframes'))
+                )
+            
             # Extract price data
             price_data = input_data.get('price_data')
-            if not price_data:
+            if price_data is None or len(price_data) == 0:
                 return AgentResponse(
                     success=False,
                     data={},
                     error="No price data provided"
                 )
             
-            # Convert to DataFrame if needed
-            df = self._prepare_data(price_data)
+            # Convert to DataFrame if needed (off the event loop)
+            df = await self.run_blocking(self._prepare_data, price_data)
             
             # Perform technical analysis
             analysis_results = await self._analyze_data(df)
@@ -44,33 +84,256 @@ class TechnicalAnalysisAgent(BaseAgent):
                 error=str(e)
             )
     
-    def _prepare_data(self, price_data: Any) -> pd.DataFrame:
-        """Prepare price data for analysis"""
-        if isinstance(price_data, pd.DataFrame):
-            df = price_data
+    def set_process_backend(self, backend: Optional[Any]) -> None:
+        """Run the CPU-bound analysis in worker processes (None runs in-process)"""
+        self.process_backend = backend
+    
+    def set_indicator_output(self, indicator_format: str = 'block', window: Optional[int] = None) -> None:
+        """Choose how indicators are returned
+        
+        Args:
+            indicator_format: 'series' for a dict of float64 pandas Series, or
+                'block' for a compact float32 IndicatorBlock
+            window: Number of most recent bars to return (1 for the latest
+                value only, None for the full history)
+        """
+        if indicator_format not in self.INDICATOR_FORMATS:
+            raise ValueError(f"Unknown indicator format: {indicator_format}")
+        if window is not None and window < 1:
+            raise ValueError("window must be at least 1")
+        self.indicator_format = indicator_format
+        self.indicator_window = window
+    
+    def worker_options(self) -> Dict[str, Any]:
+        return {
+            'indicator_format': self.indicator_format,
+            'indicator_window': self.indicator_window
+        }
+    
+    def indicator_history(self, price_data: Any) -> IndicatorBlock:
+        """Full indicator history as a block, whatever the configured window"""
+        df = self._prepare_data(price_data)
+        close = self._close_values(df)
+        if np.isfinite(close).all():
+            return IndicatorBlock.from_arrays(compute_indicators(close), df.index)
+        return IndicatorBlock.from_arrays(self._calculate_indicators_ta(df), df.index)
+    
+    def seed(self, symbol: str, price_data: Any) -> Dict[str, float]:
+        """Start incremental indicator updates for a symbol from its price history"""
+        df = self._prepare_data(price_data)
+        state = IndicatorState.from_history(df['close'].to_numpy(dtype=np.float64))
+        self.indicator_states[symbol] = state
+        return state.values()
+    
+    def update(self, symbol: str, bar: Mapping[str, Any]) -> Dict[str, float]:
+        """Fold a new bar into a symbol's indicators in constant time
+        
+        Returns the indicator values at the new bar, equal to the last row of a
+        full recompute over the symbol's history. Symbols that were never seeded
+        start from an empty history.
+        """
+        state = self.indicator_states.get(symbol)
+        if state is None:
+            state = self.indicator_states[symbol] = IndicatorState()
+        return state.update(bar['close'])
+    
+    def reset(self, symbol: Optional[str] = None) -> None:
+        """Drop the incremental state of one symbol, or of every symbol"""
+        if symbol is None:
+            self.indicator_states.clear()
         else:
-            df = pd.DataFrame(price_data)
+            self.indicator_states.pop(symbol, None)
+    
+    def analyze_panel(self, panel_data: Mapping[str, Any]) -> Dict[Any, Dict[str, Any]]:
+        """Analyze many symbols at once from aligned price matrices
+        
+        Args:
+            panel_data: 'close', 'high', 'low' and 'volume' (and optionally
+                'open') as (symbols x time) arrays or as DataFrames with a time
+                index and one column per symbol, plus optional 'symbols' and
+                'index' labels
+        
+        Returns:
+            Analysis per symbol, in the same format as a single-symbol call
+        """
+        symbols, index, fields = self._prepare_panel(panel_data)
+        close = fields['close']
+        indicators = self._calculate_panel_indicators(close, index)
+        patterns = self._identify_panel_patterns(fields, index)
+        signals = self._generate_panel_signals(close, indicators, index)
+        summaries = self._generate_panel_summaries(fields)
+        return {
+            symbol: {
+                'indicators': self._format_indicators(
+                    {key: values[row] for key, values in indicators.items()},
+                    index
+                ),
+                'patterns': patterns[row],
+                'signals': signals[row],
+                'summary': summaries[row]
+            }
+            for row, symbol in enumerate(symbols)
+        }
+    
+    def analyze_timeframes(
+        self,
+        pyramid: BarPyramid,
+        timeframes: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Analyze the cached bars of a BarPyramid at each timeframe
+        
+        Args:
+            pyramid: Bars of one symbol at several timeframes
+            timeframes: Timeframes to analyze (all of the pyramid's by default)
         
-        # Ensure required columns exist
-        required_columns = ['open', 'high', 'low', 'close', 'volume']
-        for col in required_columns:
-            if col not in df.columns:
-                raise ValueError(f"Missing required column: {col}")
+        Returns:
+            Analysis per timeframe, in the same format as a single-symbol call
+        """
+        return {
+            timeframe: self._run_analysis(frame)
+            for timeframe, frame in pyramid.frames(timeframes).items()
+        }
+    
+    @timed_step
+    def _prepare_panel(self, panel_data: Mapping[str, Any]) -> Tuple[List[Any], pd.Index, Dict[str, np.ndarray]]:
+        """Validate panel fields and convert them to (symbols x time) float arrays"""
+        symbols = panel_data.get('symbols')
+        index = panel_data.get('index')
+        fields: Dict[str, np.ndarray] = {}
+        for field in ['open'] + self.PANEL_FIELDS:
+            values = panel_data.get(field)
+            if values is None:
+                if field in self.PANEL_FIELDS:
+                    raise ValueError(f"Missing required panel field: {field}")
+                continue
+            if isinstance(values, pd.DataFrame):
+                if symbols is None:
+                    symbols = list(values.columns)
+                if index is None:
+                    index = values.index
+                values = values.to_numpy(dtype=np.float64, na_value=np.nan).T
+            values = np.asarray(values, dtype=np.float64)
+            if values.ndim != 2:
+                raise ValueError(f"Panel field {field} must be a (symbols x time) matrix")
+            fields[field] = values
         
-        return df
+        shape = fields['close'].shape
+        for field, values in fields.items():
+            if values.shape != shape:
+                raise ValueError(f"Panel field {field} has shape {values.shape}, expected {shape}")
+        symbols = list(symbols) if symbols is not None else list(range(shape[0]))
+        if len(symbols) != shape[0]:
+            raise ValueError(f"Got {len(symbols)} symbols for {shape[0]} panel rows")
+        index = pd.Index(index) if index is not None else pd.RangeIndex(shape[1])
+        if len(index) != shape[1]:
+            raise ValueError(f"Got {len(index)} index labels for {shape[1]} panel columns")
+        return symbols, index, fields
+    
+    @timed_step
+    def _calculate_panel_indicators(self, close: np.ndarray, index: pd.Index) -> Dict[str, np.ndarray]:
+        """Calculate technical indicators for every row of a close matrix"""
+        finite = np.isfinite(close).all(axis=1)
+        if finite.all():
+            return compute_indicators(close)
+        indicators = {key: np.full(close.shape, np.nan) for key in SERIES_NAMES}
+        rows = np.flatnonzero(finite)
+        if len(rows):
+            for key, values in compute_indicators(close[rows]).items():
+                indicators[key][rows] = values
+        # Rows with gaps follow ta's NaN handling, as single-symbol calls do
+        for row in np.flatnonzero(~finite):
+            frame = pd.DataFrame({'close': close[row]}, index=index)
+            for key, values in self._calculate_indicators_ta(frame).items():
+                indicators[key][row] = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        return indicators
+    
+    @timed_step
+    def _identify_panel_patterns(self, fields: Dict[str, np.ndarray], index: pd.Index) -> List[List[Dict[str, Any]]]:
+        """Scan every panel row for candlestick patterns (needs the 'open' field)"""
+        if 'open' not in fields:
+            return [[] for _ in range(len(fields['close']))]
+        hits = candlestick_patterns(fields['open'], fields['high'], fields['low'], fields['close'])
+        return collect_hits(hits, CANDLESTICK_PATTERNS, fields['close'].shape, index)
+    
+    @timed_step
+    def _generate_panel_signals(
+        self,
+        close: np.ndarray,
+        indicators: Dict[str, np.ndarray],
+        index: pd.Index
+    ) -> List[List[Dict[str, Any]]]:
+        """Scan every panel row for indicator crossovers"""
+        return collect_hits(crossover_signals(close, indicators), CROSSOVER_SIGNALS, close.shape, index)
+    
+    @timed_step
+    def _generate_panel_summaries(self, fields: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """Summarize trend, volatility and key levels for every panel row"""
+        close = fields['close']
+        slopes, r_squared = trend_statistics(close)
+        volatilities = volatility(close)
+        levels = key_levels(fields['high'], fields['low'], close, fields['volume'])
+        return [
+            {
+                'trend': classify_trend(slopes[row], r_squared[row]),
+                'strength': self._strength(r_squared[row]),
+                'volatility': float(volatilities[row]),
+                'key_levels': levels[row]
+            }
+            for row in range(len(close))
+        ]
+    
+    @timed_step
+    def _prepare_data(self, price_data: Any) -> pd.DataFrame:
+        """Prepare price data for analysis
+        
+        DataFrames, dicts of arrays, structured arrays and Arrow tables are
+        used without copying their columns; lists of records are converted.
+        """
+        return to_price_frame(price_data)
     
     async def _analyze_data(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Perform technical analysis on the data"""
+        if self.process_backend is not None:
+            return await self.process_backend.analyze_frame(self, df)
+        return await self.run_blocking(self._run_analysis, df)
+    
+    def _run_analysis(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Run the blocking pandas/ta analysis steps"""
+        indicators = self._calculate_indicators(df)
         results = {
-            'indicators': self._calculate_indicators(df),
+            'indicators': self._format_indicators(indicators, df.index),
             'patterns': self._identify_patterns(df),
-            'signals': self._generate_signals(df),
+            'signals': self._generate_signals(df, indicators),
             'summary': self._generate_summary(df)
         }
         return results
     
+    @timed_step
     def _calculate_indicators(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Calculate technical indicators"""
+        """Calculate technical indicators over the full history"""
+        close = self._close_values(df)
+        if not np.isfinite(close).all():
+            # Gaps follow ta's NaN handling exactly
+            return self._calculate_indicators_ta(df)
+        return compute_indicators(close)
+    
+    def _format_indicators(self, indicators: Dict[str, Any], index: pd.Index) -> Dict[str, Any]:
+        """Shape indicator arrays into the configured output format and window"""
+        if self.indicator_format == 'block':
+            return IndicatorBlock.from_arrays(indicators, index, self.indicator_window)
+        start = 0 if self.indicator_window is None else max(0, len(index) - self.indicator_window)
+        return {
+            key: pd.Series(
+                np.asarray(values)[start:],
+                index=index[start:],
+                name=SERIES_NAMES[key],
+                copy=False
+            )
+            for key, values in indicators.items()
+        }
+    
+    def _calculate_indicators_ta(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Calculate technical indicators with the ta library"""
         indicators = {}
         
         # Moving Averages
@@ -95,18 +358,25 @@ class TechnicalAnalysisAgent(BaseAgent):
         
         return indicators
     
+    @timed_step
     def _identify_patterns(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Identify chart patterns"""
-        patterns = []
-        # TODO: Implement pattern identification
-        return patterns
+        """Identify candlestick patterns, most recent first"""
+        close = self._close_values(df)
+        hits = candlestick_patterns(
+            self._column_values(df, 'open'),
+            self._column_values(df, 'high'),
+            self._column_values(df, 'low'),
+            close
+        )
+        return collect_hits(hits, CANDLESTICK_PATTERNS, close.shape, df.index)
     
-    def _generate_signals(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Generate trading signals based on indicators"""
-        signals = []
-        # TODO: Implement signal generation
-        return signals
+    @timed_step
+    def _generate_signals(self, df: pd.DataFrame, indicators: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Generate trading signals from indicator crossovers, most recent first"""
+        close = self._close_values(df)
+        return collect_hits(crossover_signals(close, indicators), CROSSOVER_SIGNALS, close.shape, df.index)
     
+    @timed_step
     def _generate_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Generate a summary of the technical analysis"""
         summary = {
@@ -118,20 +388,37 @@ class TechnicalAnalysisAgent(BaseAgent):
         return summary
     
     def _determine_trend(self, df: pd.DataFrame) -> str:
-        """Determine the current trend"""
-        # TODO: Implement trend determination
-        return "neutral"
+        """Determine the current trend from a fit over the most recent closes"""
+        slope, r_squared = trend_statistics(self._close_values(df))
+        return classify_trend(slope, r_squared)
     
     def _calculate_trend_strength(self, df: pd.DataFrame) -> float:
-        """Calculate the strength of the current trend"""
-        # TODO: Implement trend strength calculation
-        return 0.0
+        """Calculate the strength of the current trend (R-squared of the fit)"""
+        _, r_squared = trend_statistics(self._close_values(df))
+        return self._strength(r_squared)
     
     def _calculate_volatility(self, df: pd.DataFrame) -> float:
         """Calculate current volatility"""
-        return df['close'].pct_change().std()
+        return float(volatility(self._close_values(df)))
+    
+    @staticmethod
+    def _close_values(df: pd.DataFrame) -> np.ndarray:
+        return TechnicalAnalysisAgent._column_values(df, 'close')
+    
+    @staticmethod
+    def _column_values(df: pd.DataFrame, column: str) -> np.ndarray:
+        return df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    @staticmethod
+    def _strength(r_squared: float) -> float:
+        return 0.0 if np.isnan(r_squared) else float(r_squared)
     
-    def _identify_key_levels(self, df: pd.DataFrame) -> Dict[str, List[float]]:
-        """Identify key support and resistance levels"""
-        # TODO: Implement key level identification
-        return {'support': [], 'resistance': []} 
\ No newline at end of file
+    @timed_step
+    def _identify_key_levels(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Identify key support and resistance levels with their strength"""
+        return key_levels(
+            self._column_values(df, 'high'),
+            self._column_values(df, 'low'),
+            self._close_values(df),
+            self._column_values(df, 'volume')
+        )
\ No newline at end of file
@@ -0,0 +1,71 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pytest
+from agents.backtest import backtest, parameter_grid, sweep
+
+def random_walk(length: int, seed: int = 0) -> np.ndarray:
+    return 100.0 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0.0, 0.01, length)))
+
+def naive_backtest(close, positions, cost, periods_per_year):
+    """One bar at a time: hold yesterday's position through today's return"""
+    equity, peak, drawdown = 1.0, 1.0, 0.0
+    held, turnover, invested, hits, nets = 0.0, 0.0, 0, 0, []
+    for t in range(len(close)):
+        position = 0.0 if t == 0 or math.isnan(positions[t - 1]) else positions[t - 1]
+        change = 0.0 if t == 0 else close[t] / close[t - 1] - 1.0
+        traded = abs(position - held)
+        held = position
+        net = position * change - cost * traded
+        equity *= 1.0 + net
+        peak = max(peak, equity)
+        drawdown = max(drawdown, 1.0 - equity / peak)
+        turnover += traded
+        if position != 0:
+            invested += 1
+            hits += net > 0
+        nets.append(net)
+    mean = sum(nets) / len(nets)
+    std = math.sqrt(sum((net - mean) ** 2 for net in nets) / len(nets))
+    return {
+        'pnl': equity - 1.0,
+        'max_drawdown': drawdown,
+        'hit_rate': hits / invested if invested else 0.0,
+        'turnover': turnover,
+        'costs': cost * turnover,
+        'exposure': invested / len(close),
+        'sharpe': mean / std * math.sqrt(periods_per_year) if std > 0 else 0.0
+    }
+
+def test_backtest_matches_a_per_bar_loop():
+    close = random_walk(60)
+    rng = np.random.default_rng(1)
+    # Long, short and flat runs, plus a parameter set that never trades
+    positions = np.stack([
+        np.repeat(rng.choice([-1.0, 0.0, 1.0], 12), 5),
+        rng.choice([-1.0, 0.0, 0.5, 1.0], 60),
+        np.zeros(60)
+    ])
+    positions[1, 10] = np.nan
+    metrics = backtest(close, positions, cost=0.001, periods_per_year=252)
+    for row in range(len(positions)):
+        expected = naive_backtest(close, positions[row], 0.001, 252)
+        for key, value in expected.items():
+            assert metrics[key][row] == pytest.approx(value, rel=1e-9, abs=1e-12), key
+
+@pytest.mark.parametrize('strategy, grid', [
+    ('sma_crossover', parameter_grid(fast=[5, 10], slow=[20, 30], long_only=[False, True])),
+    ('rsi', parameter_grid(window=[7, 14], oversold=[30], overbought=[65, 70]))
+])
+def test_sweep_in_processes_matches_the_serial_run(strategy, grid):
+    close = np.stack([random_walk(300, seed) for seed in range(2)])
+    serial = sweep(close, strategy, grid, chunk_size=3)
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context('spawn')) as executor:
+        parallel = sweep(close, strategy, grid, executor=executor, chunk_size=3)
+    assert [record['params'] for record in parallel] == [record['params'] for record in serial] == grid
+    for expected, actual in zip(serial, parallel):
+        assert set(actual) == set(expected)
+        for key in expected:
+            if key != 'params':
+                np.testing.assert_array_equal(actual[key], expected[key])
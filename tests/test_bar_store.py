@@ -0,0 +1,49 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from agents.bar_store import BarStore, random_walk_loader
+
+END = "2024-06-28"
+
+def test_round_trip_and_incremental_ingest(tmp_path):
+    store = BarStore(str(tmp_path))
+    assert store.ingest("BRK.B", random_walk_loader, periods=100, end="2024-05-31", seed=1) == 100
+    bars = random_walk_loader("BRK.B", periods=120, end=END, seed=2)
+    # Only bars after the last stored one are appended
+    assert store.ingest("BRK.B", lambda symbol: bars) == 20
+    assert store.symbols() == ["BRK.B"] and store.count("BRK.B") == 120
+
+    stored = store.read("BRK.B", start="2024-06-03")
+    expected = bars.loc["2024-06-03":]
+    np.testing.assert_array_equal(stored.index.to_numpy(), expected.index.to_numpy())
+    pd.testing.assert_frame_equal(stored.reset_index(drop=True), expected.reset_index(drop=True))
+
+def test_torn_append_is_ignored_and_truncated(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.append("AAPL", random_walk_loader("AAPL", periods=10, end="2024-06-14", seed=0))
+    # An append interrupted before its time column was written
+    for column in ('open', 'close'):
+        with open(os.path.join(str(tmp_path), "AAPL", column), 'ab') as f:
+            np.arange(3, dtype=np.float64).tofile(f)
+    assert store.count("AAPL") == 10
+    assert len(store.read("AAPL")) == 10
+
+    bars = random_walk_loader("AAPL", periods=20, end=END, seed=0)
+    assert store.append("AAPL", bars) == 10
+    stored = store.read("AAPL")
+    np.testing.assert_array_equal(stored['close'].to_numpy(), np.concatenate([
+        random_walk_loader("AAPL", periods=10, end="2024-06-14", seed=0)['close'].to_numpy(),
+        bars['close'].to_numpy()[10:]
+    ]))
+    for column in ('open', 'close', 'time'):
+        assert os.path.getsize(os.path.join(str(tmp_path), "AAPL", column)) == 20 * 8
+
+@pytest.mark.parametrize('symbol', ["..", "../outside", "a/b", "", "/etc", "AAPL\x00"])
+def test_invalid_symbols_are_rejected(tmp_path, symbol):
+    store = BarStore(str(tmp_path / "bars"))
+    with pytest.raises(ValueError):
+        store.append(symbol, random_walk_loader("X", periods=5, end=END, seed=0))
+    with pytest.raises(ValueError):
+        store.read(symbol)
+    assert os.listdir(str(tmp_path)) == ["bars"]
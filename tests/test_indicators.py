@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from agents.indicators import SERIES_NAMES, IndicatorState, compute_indicators
+from agents.technical_analysis_agent import TechnicalAnalysisAgent
+
+def random_walk(length: int, seed: int = 0) -> np.ndarray:
+    return 100.0 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0.0, 0.01, length)))
+
+def ta_indicators(close: np.ndarray) -> dict:
+    reference = TechnicalAnalysisAgent()._calculate_indicators_ta(pd.DataFrame({'close': close}))
+    return {key: values.to_numpy(dtype=np.float64, na_value=np.nan) for key, values in reference.items()}
+
+def assert_matches(actual: np.ndarray, expected: np.ndarray) -> None:
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+@pytest.mark.parametrize('close', [
+    random_walk(500),
+    # Shorter than the longest window (SMA 50): those indicators stay NaN
+    random_walk(30, seed=1),
+    # Constant prices: RSI's average gain and loss are both 0
+    np.full(120, 42.0),
+    # Flat start, then moving
+    np.concatenate([np.full(40, 10.0), random_walk(80, seed=2)])
+], ids=['long', 'short', 'constant', 'flat-start'])
+def test_compute_indicators_matches_ta(close):
+    indicators = compute_indicators(close)
+    reference = ta_indicators(close)
+    assert set(indicators) == set(reference) == set(SERIES_NAMES)
+    for key in SERIES_NAMES:
+        assert_matches(indicators[key], reference[key])
+
+def test_compute_indicators_matches_ta_per_row():
+    close = np.stack([random_walk(200, seed) for seed in range(3)])
+    indicators = compute_indicators(close)
+    for row in range(len(close)):
+        reference = ta_indicators(close[row])
+        for key in SERIES_NAMES:
+            assert_matches(indicators[key][row], reference[key])
+
+def test_embedded_nans_follow_ta():
+    close = random_walk(150, seed=3)
+    close[[40, 41, 90]] = np.nan
+    agent = TechnicalAnalysisAgent()
+    indicators = agent._calculate_indicators(pd.DataFrame({'close': close}))
+    reference = ta_indicators(close)
+    for key in SERIES_NAMES:
+        assert_matches(np.asarray(indicators[key], dtype=np.float64), reference[key])
+
+    # In a panel, only rows with gaps take the ta path
+    panel = np.stack([random_walk(150, seed=4), close])
+    rows = agent._calculate_panel_indicators(panel, pd.RangeIndex(150))
+    for row in range(len(panel)):
+        reference = ta_indicators(panel[row])
+        for key in SERIES_NAMES:
+            assert_matches(rows[key][row], reference[key])
+
+def assert_row_matches(values: dict, indicators: dict, row: int) -> None:
+    for key in SERIES_NAMES:
+        assert_matches(np.array([values[key]]), indicators[key][row:row + 1])
+
+def test_streaming_updates_match_a_full_recompute():
+    # Long enough for the sliding windows to refresh, with a flat run for std 0
+    close = np.concatenate([random_walk(300, seed=5), np.full(30, 95.0), random_walk(300, seed=6)])
+    indicators = compute_indicators(close)
+    agent = TechnicalAnalysisAgent()
+    for row, value in enumerate(close):
+        # Starts from an empty state, so the warm-up bars are covered too
+        assert_row_matches(agent.update('AAPL', {'close': value}), indicators, row)
+
+def test_seeded_symbol_continues_like_a_full_recompute():
+    close = random_walk(400, seed=7)
+    history = 120
+    agent = TechnicalAnalysisAgent()
+    bars = pd.DataFrame({column: close[:history] for column in ('open', 'high', 'low', 'close')})
+    bars['volume'] = 1_000.0
+    seeded = agent.seed('MSFT', bars)
+    assert_row_matches(seeded, compute_indicators(close[:history]), history - 1)
+
+    indicators = compute_indicators(close)
+    for row in range(history, len(close)):
+        assert_row_matches(agent.update('MSFT', {'close': close[row]}), indicators, row)
+
+    # A seed shorter than the longest window finishes warming up on updates
+    state = IndicatorState.from_history(close[:10])
+    for row in range(10, 60):
+        assert_row_matches(state.update(close[row]), indicators, row)
@@ -0,0 +1,66 @@
+import pytest
+import torch
+from agents.benchmark import build_stub_pipelines, generate_headlines
+from agents.inference_backends import compare_backends, with_backend
+from agents.micro_batching import LengthBucketedClassifier
+from agents.model_registry import ModelRegistry
+from agents.sentiment_analysis_agent import SentimentAnalysisAgent
+from agents.sentiment_cache import SentimentCache
+
+@pytest.fixture(scope='module')
+def pipelines():
+    return build_stub_pipelines()
+
+def _is_quantized(model):
+    return any(isinstance(module, torch.ao.nn.quantized.dynamic.Linear) for module in model.modules())
+
+def test_int8_agrees_with_fp32(pipelines):
+    report = compare_backends(pipelines['sentiment'], generate_headlines(64), repeats=1)
+    assert report['int8']['agreement'] >= 0.95
+    assert report['int8']['max_score_diff'] < 0.05
+    questions = [{'question': "Who beats estimates?", 'context': text} for text in generate_headlines(8)]
+    assert compare_backends(pipelines['qa'], questions, repeats=1)['int8']['agreement'] >= 0.95
+
+def test_with_backend_rewraps_length_bucketed_classifier(pipelines):
+    classifier = LengthBucketedClassifier(pipelines['sentiment'], batch_size=4, max_length=64)
+    converted = with_backend(classifier, 'int8')
+    assert isinstance(converted, LengthBucketedClassifier)
+    assert (converted.batch_size, converted.max_length) == (4, 64)
+    assert _is_quantized(converted.pipeline.model)
+    assert not _is_quantized(classifier.pipeline.model)
+    converted(generate_headlines(8))
+    assert converted.stats()['items'] == 8 and classifier.stats()['items'] == 0
+
+def test_with_backend_rejects_analyzer_without_model():
+    with pytest.raises(ValueError):
+        with_backend(lambda texts: [], 'int8')
+
+def test_registry_backend_variants(pipelines):
+    registry = ModelRegistry()
+    registry.register('finbert', lambda: pipelines['sentiment'])
+    proxy = registry.lazy('finbert', 'int8')
+    assert proxy.name == 'finbert:int8'
+    assert len(proxy(generate_headlines(4))) == 4
+    assert registry.is_loaded('finbert:int8') and not registry.is_loaded('finbert')
+    assert _is_quantized(registry.get('finbert:int8').model)
+    with pytest.raises(ValueError):
+        registry.lazy('finbert', 'fp16')
+
+    # Variants built from a replaced loader are dropped with it
+    registry.register('finbert', lambda: pipelines['sentiment'])
+    assert 'finbert:int8' not in registry
+    assert registry.names() == ['finbert']
+
+def test_backend_is_part_of_cache_keys(pipelines):
+    cache = SentimentCache()
+    agent = SentimentAnalysisAgent(pipelines['sentiment'], sentiment_cache=cache, backend='int8')
+    assert agent.worker_options() == {'backend': 'int8'}
+    assert cache.key("Apple beats estimates", 'int8') != cache.key("Apple beats estimates")
+
+def test_onnx_agrees_with_fp32(pipelines):
+    pytest.importorskip('onnxruntime')
+    converted = with_backend(pipelines['sentiment'], 'onnx')
+    # The temporary export is removed once loaded
+    assert converted.model.path is None
+    report = compare_backends(pipelines['sentiment'], generate_headlines(32), backends=('onnx',), repeats=1)
+    assert report['onnx']['agreement'] >= 0.95
@@ -0,0 +1,40 @@
+import asyncio
+from agents.base_agent import AgentResponse, BaseAgent
+
+# Bytes the allocating agent holds at its peak
+ALLOCATION = 8 * 2 ** 20
+
+class AllocatingAgent(BaseAgent):
+    """Allocates and frees a buffer, then waits"""
+
+    def __init__(self, size: int, delay: float = 0.0):
+        super().__init__(name="AllocatingAgent", description="Allocates memory")
+        self.size = size
+        self.delay = delay
+
+    async def process(self, input_data):
+        buffer = bytearray(self.size)
+        del buffer
+        await asyncio.sleep(self.delay)
+        return AgentResponse(success=True, data={})
+
+def test_overlapping_call_keeps_the_peak_of_a_running_call():
+    large = AllocatingAgent(ALLOCATION, delay=0.05)
+    small = AllocatingAgent(1024)
+    for agent in (large, small):
+        agent.enable_instrumentation()
+
+    async def run():
+        first = asyncio.ensure_future(large.process({}))
+        await asyncio.sleep(0.01)
+        # Starts after the large agent freed its buffer but before it finished
+        await small.process({})
+        return await first
+
+    assert asyncio.run(run()).metrics['peak_memory'] >= ALLOCATION
+
+def test_peak_is_measured_from_the_call_baseline():
+    agent = AllocatingAgent(ALLOCATION)
+    agent.enable_instrumentation()
+    peak = asyncio.run(agent.process({})).metrics['peak_memory']
+    assert ALLOCATION <= peak < 2 * ALLOCATION
@@ -0,0 +1,54 @@
+import asyncio
+from agents.near_duplicates import near_duplicate_clusters
+from agents.sentiment_analysis_agent import SentimentAnalysisAgent
+
+ARTICLE = (
+    "Acme Corp {verb} its full-year revenue guidance on Tuesday after quarterly sales of "
+    "its cloud software beat analyst expectations, sending shares higher in early trading "
+    "as investors weighed the outlook for enterprise spending this year."
+)
+
+def test_source_tag_is_a_near_duplicate():
+    texts = [
+        "Apple raises quarterly earnings estimates after strong iPhone sales",
+        "Apple raises quarterly earnings estimates after strong iPhone sales - Reuters",
+        "Apple raises quarterly earnings estimates after strong iPhone sales!"
+    ]
+    assert near_duplicate_clusters(texts).tolist() == [0, 0, 0]
+
+def test_substituted_word_in_long_text_is_not_a_near_duplicate():
+    raised = ARTICLE.format(verb="raised")
+    cut = ARTICLE.format(verb="cut")
+    assert len(cut.split()) >= 30
+    assert near_duplicate_clusters([raised, cut]).tolist() == [0, 1]
+    assert near_duplicate_clusters([raised, cut + " (Bloomberg)"]).tolist() == [0, 1]
+
+def test_substituted_word_in_headline_is_not_a_near_duplicate():
+    texts = [
+        "Apple raises quarterly earnings estimates after strong iPhone sales",
+        "Apple misses quarterly earnings estimates after strong iPhone sales"
+    ]
+    assert near_duplicate_clusters(texts).tolist() == [0, 1]
+
+def test_agent_scores_each_story_once():
+    calls = []
+
+    def analyzer(texts):
+        calls.append(list(texts))
+        return [
+            {'label': 'negative' if ' cut ' in text else 'positive', 'score': 0.9}
+            for text in texts
+        ]
+
+    agent = SentimentAnalysisAgent(sentiment_analyzer=analyzer)
+    texts = [
+        ARTICLE.format(verb="raised"),
+        ARTICLE.format(verb="raised") + " - Reuters",
+        ARTICLE.format(verb="cut")
+    ]
+    response = asyncio.run(agent.process({'text_data': texts}))
+    assert response.success, response.error
+    assert len(calls) == 1 and len(calls[0]) == 2
+    labels = [result['label'] for result in response.data['sentiment_breakdown']]
+    assert labels == ['positive', 'positive', 'negative']
+    assert response.data['duplicate_clusters'] == [{'representative': 0, 'members': [0, 1], 'size': 2}]
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import numpy as np
+import pytest
+from PIL import Image
+from agents.base_agent import AgentResponse, BaseAgent
+from agents.model_registry import ModelRegistry
+from agents.pipeline import PipelineNode, PipelineScheduler
+from agents.result_cache import ResultCache
+from agents.sentiment_analysis_agent import SentimentAnalysisAgent
+
+class BrightnessAgent(BaseAgent):
+    """Mean pixel value of an image file"""
+
+    def __init__(self):
+        super().__init__(name="BrightnessAgent", description="Mean pixel value")
+        self.calls = 0
+
+    async def process(self, input_data):
+        self.calls += 1
+        pixels = np.asarray(Image.open(input_data['image']))
+        return AgentResponse(success=True, data={'brightness': float(pixels.mean()), 'notes': []})
+
+class FailingCache(ResultCache):
+    def set(self, key, value):
+        raise OSError("disk full")
+
+def _scheduler(agent, cache):
+    return PipelineScheduler([PipelineNode('chart', agent, inputs={'image': 'chart'})], cache=cache)
+
+def _save_chart(path, value, mtime):
+    Image.new('L', (8, 8), value).save(path)
+    os.utime(path, ns=(mtime, mtime))
+
+def test_rewritten_image_path_is_not_served_from_cache(tmp_path):
+    path = str(tmp_path / "chart.png")
+    agent = BrightnessAgent()
+    scheduler = _scheduler(agent, ResultCache())
+    _save_chart(path, 10, 1_000_000_000)
+    assert asyncio.run(scheduler.run({'chart': path}))['chart'].data['brightness'] == 10
+    assert asyncio.run(scheduler.run({'chart': path}))['chart'].data['brightness'] == 10
+    assert agent.calls == 1
+
+    _save_chart(path, 200, 2_000_000_000)
+    assert asyncio.run(scheduler.run({'chart': path}))['chart'].data['brightness'] == 200
+    assert agent.calls == 2
+
+def test_cache_write_failure_keeps_the_result(tmp_path):
+    path = str(tmp_path / "chart.png")
+    _save_chart(path, 10, 1_000_000_000)
+    response = asyncio.run(_scheduler(BrightnessAgent(), FailingCache()).run({'chart': path}))['chart']
+    assert response.success and response.data['brightness'] == 10
+
+def test_cached_data_is_not_shared_with_callers(tmp_path):
+    path = str(tmp_path / "chart.png")
+    _save_chart(path, 10, 1_000_000_000)
+    scheduler = _scheduler(BrightnessAgent(), ResultCache())
+    first = asyncio.run(scheduler.run({'chart': path}))['chart']
+    first.data['notes'].append("edited")
+    second = asyncio.run(scheduler.run({'chart': path}))['chart']
+    second.data['notes'].append("edited again")
+    assert asyncio.run(scheduler.run({'chart': path}))['chart'].data['notes'] == []
+
+def test_failed_disk_write_leaves_no_temporary_file(tmp_path):
+    cache = ResultCache(disk_dir=str(tmp_path))
+    with pytest.raises(Exception):
+        cache.set("ab" * 20, lambda: None)
+    assert [name for _, _, files in os.walk(tmp_path) for name in files] == []
+
+def _positive(texts):
+    return [{'label': 'positive', 'score': 0.9} for _ in texts]
+
+def _negative(texts):
+    return [{'label': 'negative', 'score': 0.9} for _ in texts]
+
+def _sentiment(cache, agent):
+    scheduler = PipelineScheduler([PipelineNode('sentiment', agent, inputs={'text_data': 'texts'})], cache=cache)
+    response = asyncio.run(scheduler.run({'texts': ["Apple beats estimates"]}))['sentiment']
+    return response.data['sentiment_breakdown'][0]['label']
+
+def test_model_and_settings_are_part_of_the_cache_key(tmp_path):
+    cache = ResultCache(disk_dir=str(tmp_path))
+    assert _sentiment(cache, SentimentAnalysisAgent(_positive)) == 'positive'
+    assert _sentiment(cache, SentimentAnalysisAgent(_negative)) == 'negative'
+    assert _sentiment(cache, SentimentAnalysisAgent(_negative, near_duplicate_threshold=None)) == 'negative'
+    assert cache.stats()['hits'] == 0
+    assert _sentiment(cache, SentimentAnalysisAgent(_positive)) == 'positive'
+    assert cache.stats()['hits'] == 1
+
+    # Registry models are told apart by their identity, without loading them
+    for identity, analyzer in (("finbert@v1", _positive), ("finbert@v2", _negative)):
+        registry = ModelRegistry()
+        registry.register('finbert', lambda analyzer=analyzer: analyzer, identity=identity)
+        agent = SentimentAnalysisAgent(model_registry=registry)
+        assert agent.cache_identity()['model'] == identity and not registry.is_loaded('finbert')
+        assert _sentiment(cache, agent) == analyzer([""])[0]['label']
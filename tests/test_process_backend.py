@@ -0,0 +1,82 @@
+import asyncio
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from multiprocessing import shared_memory
+from agents import process_backend
+from agents.benchmark import generate_ohlcv
+from agents.chart_analysis_agent import ChartAnalysisAgent
+from agents.process_backend import ProcessPoolBackend
+from agents.technical_analysis_agent import TechnicalAnalysisAgent
+
+class BrightnessChartAgent(ChartAnalysisAgent):
+    """Chart agent whose analysis depends on every pixel of the image"""
+
+    def _run_analysis(self, image):
+        return {
+            'shape': list(image.shape),
+            'row_means': image.mean(axis=1).tolist(),
+            'brightest_row': int(image.sum(axis=1).argmax())
+        }
+
+@pytest.fixture(scope="module")
+def backend():
+    backend = ProcessPoolBackend(max_workers=1)
+    yield backend
+    backend.shutdown()
+
+@pytest.fixture
+def shared_names(monkeypatch):
+    """Names of the shared memory blocks the backend creates"""
+    names = []
+    share_array = process_backend.share_array
+
+    def recording_share_array(array):
+        shm, handle = share_array(array)
+        names.append(shm.name)
+        return shm, handle
+
+    monkeypatch.setattr(process_backend, 'share_array', recording_share_array)
+    return names
+
+def _run(agent, input_data, backend=None):
+    agent.set_process_backend(backend)
+    response = asyncio.run(agent.process(input_data))
+    assert response.success, response.error
+    return response.data
+
+def _dumps(data):
+    return json.dumps(data, sort_keys=True, default=str)
+
+def _assert_unlinked(names):
+    assert names
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+@pytest.mark.parametrize('indicator_format', ['series', 'block'])
+def test_frame_analysis_matches_the_in_process_path(backend, shared_names, indicator_format):
+    agent = TechnicalAnalysisAgent()
+    # Worker agents must pick up the caller's settings
+    agent.set_indicator_output(indicator_format, window=100)
+    input_data = {'price_data': generate_ohlcv(600, seed=3)}
+    remote = _run(agent, input_data, backend)
+    local = _run(agent, input_data)
+
+    assert list(remote['indicators']) == list(local['indicators'])
+    for key in local['indicators']:
+        pd.testing.assert_series_equal(remote['indicators'][key], local['indicators'][key], check_exact=True)
+        assert len(local['indicators'][key]) == 100
+    # NaN never equals itself, so compare the rest serialized
+    rest = {key: value for key, value in local.items() if key != 'indicators'}
+    assert _dumps({key: remote[key] for key in rest}) == _dumps(rest)
+    _assert_unlinked(shared_names)
+
+def test_image_analysis_matches_the_in_process_path(backend, shared_names):
+    image = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    agent = BrightnessChartAgent()
+    remote = _run(agent, {'image': image}, backend)
+    assert remote == _run(agent, {'image': image})
+    assert remote['shape'] == [120, 160]
+    _assert_unlinked(shared_names)
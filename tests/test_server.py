@@ -0,0 +1,80 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from PIL import Image
+from fastapi.testclient import TestClient
+from agents.model_registry import ModelRegistry
+from agents.server import create_app
+
+def sentiment_pipeline(texts, **kwargs):
+    if any("corrupt" in text for text in texts):
+        raise ValueError("Cannot classify a corrupt text")
+    return [{'label': 'negative' if 'misses' in text else 'positive', 'score': 0.9} for text in texts]
+
+def qa_pipeline(question, context, **kwargs):
+    answers = [{'answer': 'up', 'score': 0.8, 'start': 0, 'end': 2} for _ in question]
+    # Like transformers, unwrap single-item batches
+    return answers[0] if len(answers) == 1 else answers
+
+def caption_pipeline(image, **kwargs):
+    return [{'generated_text': 'a line chart'}]
+
+@pytest.fixture
+def registry():
+    registry = ModelRegistry()
+    registry.register('finbert', lambda: sentiment_pipeline)
+    registry.register('question_answering', lambda: qa_pipeline)
+    registry.register('chart_captioning', lambda: caption_pipeline)
+    return registry
+
+def _png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), 'white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def test_lifespan_warms_up_and_closes_batchers(registry):
+    app = create_app(model_registry=registry)
+    assert not registry.is_loaded('finbert')
+    with TestClient(app) as client:
+        assert registry.is_loaded('finbert') and registry.is_loaded('question_answering')
+        assert client.get('/health').json() == {'status': 'ok'}
+        classify = app.state.orchestrator.sentiment_agent.sentiment_analyzer
+        assert classify(["Apple beats estimates"])[0]['label'] == 'positive'
+    with pytest.raises(RuntimeError):
+        classify(["Apple beats estimates"])
+
+def test_analyze_and_chart_qa(registry):
+    with TestClient(create_app(model_registry=registry, max_wait=0.001)) as client:
+        response = client.post('/analyze', data={
+            'text_data': ["Apple beats estimates", "Tesla misses delivery targets"],
+            'outputs': ['sentiment_analysis']
+        }).json()
+        assert response['success'], response['error']
+        labels = [result['label'] for result in response['data']['sentiment_analysis']['sentiment_breakdown']]
+        assert labels == ['positive', 'negative']
+
+        response = client.post(
+            '/chart-qa',
+            data={'question': "Which way is the trend?"},
+            files={'chart': ('chart.png', _png(), 'image/png')}
+        ).json()
+        assert response['success'], response['error']
+        assert response['data']['answer'] == 'up'
+
+        stats = client.get('/stats').json()
+        assert stats['sentiment_batching']['items'] == 2
+        assert stats['qa_batching']['requests'] == 1
+
+def test_bad_text_only_fails_its_own_request(registry):
+    # Both requests' texts land in one coalesced batch
+    app = create_app(model_registry=registry, max_batch_size=3, max_wait=0.5, warmup=False)
+    with TestClient(app) as client:
+        def analyze(texts):
+            return client.post('/analyze', data={'text_data': texts, 'outputs': ['sentiment_analysis']}).json()
+
+        with ThreadPoolExecutor(2) as pool:
+            good = pool.submit(analyze, ["Apple beats estimates", "Tesla misses delivery targets"])
+            bad = pool.submit(analyze, ["A corrupt upload"])
+            good, bad = good.result(), bad.result()
+        assert good['data']['sentiment_analysis']['sentiment_breakdown'][1]['label'] == 'negative'
+        assert "corrupt" in bad['data']['sentiment_analysis']['error']
@@ -0,0 +1,34 @@
+from agents.benchmark import generate_headlines
+from agents.topics import TopicExtractor
+
+def test_popular_term_names_its_bucket_whenever_it_arrives():
+    # Two buckets: the popular term collides with dozens of rare ones seen first
+    extractor = TopicExtractor(hash_bits=1, min_df=1)
+    extractor.partial_fit([f"rare{index}" for index in range(50)])
+    extractor.partial_fit(["tariffs"] * 200)
+    assert extractor.topics(max_topics=1)[0]['topic'] == "tariffs"
+
+def test_topics_with_sentiment():
+    texts = [
+        "Oil prices surge as OPEC cuts output",
+        "Oil prices climb on supply worries",
+        "Tech stocks slump after weak guidance"
+    ]
+    sentiments = [
+        {'label': 'positive', 'score': 0.8},
+        {'label': 'positive', 'score': 0.6},
+        {'label': 'negative', 'score': 0.9}
+    ]
+    records = TopicExtractor().partial_fit(texts, sentiments).topics(max_topics=1)
+    assert records[0]['topic'] == "oil prices"
+    assert records[0]['documents'] == 2
+    assert records[0]['sentiment']['positive'] == 0.7
+    assert records[0]['impact_score'] == 0.7
+
+def test_compact_extractor_matches_the_dense_one():
+    texts = generate_headlines(500, seed=3)
+    sentiments = [{'label': ('positive', 'negative', 'neutral')[i % 3], 'score': 0.5 + i % 5 / 10} for i in range(500)]
+    compact = TopicExtractor(compact=True).partial_fit(texts, sentiments)
+    assert compact.topics() == TopicExtractor().partial_fit(texts, sentiments).topics()
+    # Accumulators sized to the terms used, not the 2**18 hash space
+    assert len(compact._df) < 4096
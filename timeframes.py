@@ -0,0 +1,148 @@
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from .price_data import REQUIRED_COLUMNS, to_price_frame
+
+# Timeframes built by default, finest (the base bars) first
+DEFAULT_TIMEFRAMES = ['1min', '5min', '1h', '1D']
+
+def resample_bars(
+    times: np.ndarray,
+    columns: Mapping[str, np.ndarray],
+    period: int
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Aggregate time-ordered OHLCV bars into buckets of period nanoseconds
+
+    Bars are grouped by the bucket their int64 start time falls in, and each
+    group is reduced with one reduceat per column. Buckets are labelled by
+    their start time; empty buckets are skipped.
+    """
+    if len(times) == 0:
+        return times.copy(), {field: np.empty(0) for field in REQUIRED_COLUMNS}
+    buckets = times // period
+    starts = np.flatnonzero(np.concatenate([[True], buckets[1:] != buckets[:-1]]))
+    ends = np.concatenate([starts[1:], [len(times)]]) - 1
+    return buckets[starts] * period, {
+        'open': columns['open'][starts],
+        'high': np.maximum.reduceat(columns['high'], starts),
+        'low': np.minimum.reduceat(columns['low'], starts),
+        'close': columns['close'][ends],
+        'volume': np.add.reduceat(columns['volume'], starts)
+    }
+
+class _BarBuffer:
+    """Growable OHLCV columns with int64 nanosecond start times"""
+
+    def __init__(self):
+        self.size = 0
+        self.times = np.empty(0, dtype=np.int64)
+        self.columns = {field: np.empty(0) for field in REQUIRED_COLUMNS}
+
+    def truncate(self, size: int) -> None:
+        self.size = min(self.size, size)
+
+    def extend(self, times: np.ndarray, columns: Mapping[str, np.ndarray]) -> None:
+        """Append bars, growing the buffers geometrically so appends are amortized O(1)"""
+        end = self.size + len(times)
+        if end > len(self.times):
+            capacity = max(end, 2 * len(self.times), 64)
+            self.times = np.resize(self.times, capacity)
+            self.columns = {field: np.resize(values, capacity) for field, values in self.columns.items()}
+        self.times[self.size:end] = times
+        for field, values in self.columns.items():
+            values[self.size:end] = columns[field]
+        self.size = end
+
+    def view(self, start: int = 0) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        return self.times[start:self.size], {field: values[start:self.size] for field, values in self.columns.items()}
+
+class BarPyramid:
+    """OHLCV bars of one symbol at several timeframes, kept in sync
+
+    The finest timeframe holds the base bars as given; each coarser one is
+    built once from the timeframe below it and cached. New base bars only
+    re-aggregate the buckets they touch, so updates cost time proportional
+    to the new data rather than the history. The last bar of each coarser
+    timeframe covers a possibly incomplete bucket and is revised as more
+    base bars arrive.
+
+    Timeframes are pandas duration strings, finest first, each a whole
+    multiple of the one below it. Buckets are aligned to UTC.
+    """
+
+    def __init__(self, timeframes: Sequence[str] = DEFAULT_TIMEFRAMES):
+        periods = [pd.Timedelta(timeframe).value for timeframe in timeframes]
+        if not periods:
+            raise ValueError("At least one timeframe is required")
+        for finer, coarser, timeframe in zip(periods, periods[1:], timeframes[1:]):
+            if coarser <= finer or coarser % finer:
+                raise ValueError(f"Timeframe {timeframe} is not a multiple of the one below it")
+        self.timeframes = list(timeframes)
+        self._periods = periods
+        self._levels = [_BarBuffer() for _ in timeframes]
+        self._tz: Optional[Any] = None
+
+    def __len__(self) -> int:
+        return self._levels[0].size
+
+    def load(self, price_data: Any) -> None:
+        """Replace all bars with a base history (any price_data format with a time index)"""
+        self._levels = [_BarBuffer() for _ in self.timeframes]
+        self._tz = None
+        self.append(price_data)
+
+    def append(self, price_data: Any) -> None:
+        """Add base bars, rebuilding only the coarser buckets they fall in
+
+        Accepts the same formats as load, or a single bar as a mapping of
+        scalars with a 'time' (or 'timestamp') entry. Bars at or before the
+        last stored time replace the stored bars from that time on.
+        """
+        if isinstance(price_data, Mapping) and all(np.ndim(value) == 0 for value in price_data.values()):
+            price_data = {key: [value] for key, value in price_data.items()}
+        df = to_price_frame(price_data)
+        if isinstance(df.index, pd.RangeIndex):
+            raise ValueError("Bars need a time index or a time column")
+        index = pd.DatetimeIndex(pd.to_datetime(df.index))
+        if len(index) == 0:
+            return
+        if not index.is_monotonic_increasing:
+            raise ValueError("Bars must be in time order")
+        if self._tz is None and len(self) == 0:
+            self._tz = index.tz
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        times = index.as_unit('ns').asi8
+        columns = {field: df[field].to_numpy(dtype=np.float64, na_value=np.nan) for field in REQUIRED_COLUMNS}
+
+        base = self._levels[0]
+        changed = int(np.searchsorted(base.times[:base.size], times[0], side='left'))
+        base.truncate(changed)
+        base.extend(times, columns)
+
+        for below, level, period in zip(self._levels, self._levels[1:], self._periods[1:]):
+            # Rebuild from the bucket holding the first changed bar below
+            bucket_start = below.times[changed] // period * period
+            changed = int(np.searchsorted(level.times[:level.size], bucket_start, side='left'))
+            level.truncate(changed)
+            source = int(np.searchsorted(below.times[:below.size], bucket_start, side='left'))
+            level.extend(*resample_bars(*below.view(source), period))
+
+    def frame(self, timeframe: str) -> pd.DataFrame:
+        """Bars of one timeframe as an OHLCV DataFrame
+
+        The columns are views of the cached bars, so a frame's last row can
+        change when later appends revise that bucket; copy it to keep a
+        snapshot.
+        """
+        if timeframe not in self.timeframes:
+            raise KeyError(f"Unknown timeframe: {timeframe}")
+        times, columns = self._levels[self.timeframes.index(timeframe)].view()
+        index = pd.DatetimeIndex(times.view('datetime64[ns]'))
+        if self._tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self._tz)
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def frames(self, timeframes: Optional[Sequence[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Frames of several timeframes (all by default)"""
+        return {timeframe: self.frame(timeframe) for timeframe in (timeframes or self.timeframes)}
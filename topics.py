@@ -0,0 +1,237 @@
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+
+# Hash buckets are 2**HASH_BITS; collisions merge rare terms, memory stays fixed
+HASH_BITS = 18
+# Documents tokenized and counted together per vectorized update
+CHUNK_SIZE = 4096
+# Topics returned by default
+MAX_TOPICS = 10
+# Candidates considered per returned topic when folding words into phrases
+TOPIC_POOL = 3
+# Terms must appear in at least this many documents (once the corpus is this large)
+MIN_DF = 2
+
+# Sentiment labels aggregated per topic, in accumulator row order
+SENTIMENT_LABELS = ['positive', 'negative', 'neutral']
+
+# Common words never used as topics, alone or in pairs
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers him his how i if in into is it its itself just me more most my
+no nor not now of off on once only or other our ours out over own same says said she should so
+some such than that the their theirs them then there these they this those through to too under
+until up very was we were what when where which while who whom why will with would you your
+new amid ahead via vs
+""".split())
+
+_TOKEN = re.compile(r"[a-z][a-z0-9&-]*[a-z0-9]|[a-z]")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of a text"""
+    return _TOKEN.findall(text.lower())
+
+def terms(text: str) -> List[str]:
+    """Candidate topic terms: content words and adjacent content-word pairs"""
+    words = tokenize(text)
+    content = [len(word) > 1 and word not in STOP_WORDS for word in words]
+    unigrams = [word for word, keep in zip(words, content) if keep]
+    bigrams = [
+        f"{first} {second}"
+        for first, second, keep_first, keep_second in zip(words, words[1:], content, content[1:])
+        if keep_first and keep_second
+    ]
+    return unigrams + bigrams
+
+class TopicExtractor:
+    """Streaming hashed TF-IDF keyword extractor with per-topic sentiment
+
+    Documents are fed in chunks with partial_fit; each chunk becomes a sparse
+    (document, term bucket) count matrix in coordinate form and is folded
+    into fixed-size per-bucket accumulators, so memory does not grow with
+    the number of documents. In compact mode the accumulators instead grow
+    with the buckets used, which suits one-off calls on a few documents. Each bucket is reported under the term found
+    in most of its documents. A term's corpus score is idf times the sum of
+    its length-normalized term frequencies; since idf is constant per term
+    the sum can be kept incrementally while document frequencies grow.
+    """
+
+    def __init__(self, hash_bits: int = HASH_BITS, min_df: int = MIN_DF, compact: bool = False):
+        """
+        Args:
+            hash_bits: Terms are hashed into 2**hash_bits buckets
+            min_df: Minimum document count of a topic
+            compact: Size the accumulators to the buckets actually used
+                instead of all 2**hash_bits (for one-off, small corpora)
+        """
+        self.hash_bits = hash_bits
+        self.min_df = min_df
+        self.compact = compact
+        self.documents = 0
+        size = 0 if compact else 1 << hash_bits
+        self._df = np.zeros(size, dtype=np.int64)
+        self._tf = np.zeros(size)
+        # Per label: documents with that label and their summed scores
+        self._label_documents = np.zeros((len(SENTIMENT_LABELS), size), dtype=np.int64)
+        self._label_scores = np.zeros((len(SENTIMENT_LABELS), size))
+        # Name reported for each slot, with its majority-vote weight
+        self._terms: Dict[int, str] = {}
+        self._term_weights = np.zeros(size, dtype=np.int64)
+        # Accumulator slot of each used bucket and the reverse (compact mode;
+        # otherwise slot == bucket)
+        self._slots: Dict[int, int] = {}
+        self._slot_buckets: List[int] = []
+        # Slots holding at least one term, sorted
+        self._touched = np.empty(0, dtype=np.int64)
+
+    def _grow(self, size: int) -> None:
+        """Extend the compact accumulators with zeroed slots to at least size"""
+        pad = max(size, 2 * len(self._df)) - len(self._df)
+        for name in ('_df', '_tf', '_label_documents', '_label_scores', '_term_weights'):
+            values = getattr(self, name)
+            setattr(self, name, np.pad(values, [(0, 0)] * (values.ndim - 1) + [(0, pad)]))
+
+    def _name_buckets(self, document_counts: Counter, slots: Dict[str, int]) -> None:
+        """Keep the heavy hitter of each bucket as its slot's name
+
+        A one-slot majority vote over document counts: the stored name gains
+        its own documents and loses other terms' documents, and is replaced
+        once another term outweighs it. A term found in most of a bucket's
+        documents always ends up as its name, whenever it arrives.
+        """
+        for term, count in document_counts.most_common():
+            slot = slots[term]
+            if self._terms.get(slot) == term:
+                self._term_weights[slot] += count
+            elif self._term_weights[slot] >= count:
+                self._term_weights[slot] -= count
+            else:
+                self._terms[slot] = term
+                self._term_weights[slot] = count - self._term_weights[slot]
+
+    def partial_fit(
+        self,
+        texts: Iterable[str],
+        sentiments: Optional[Iterable[Dict[str, Any]]] = None
+    ) -> 'TopicExtractor':
+        """Add documents, with their sentiment results ('label', 'score') if known"""
+        texts = iter(texts)
+        sentiments = iter(sentiments) if sentiments is not None else None
+        while True:
+            chunk = [text for _, text in zip(range(CHUNK_SIZE), texts)]
+            if not chunk:
+                return self
+            labels = [next(sentiments) for _ in chunk] if sentiments is not None else None
+            self._fit_chunk(chunk, labels)
+
+    def _fit_chunk(self, texts: Sequence[str], sentiments: Optional[Sequence[Dict[str, Any]]]) -> None:
+        documents = [terms(text) for text in texts]
+        document_counts = Counter(term for document in documents for term in set(document))
+        # Each distinct term of the chunk is hashed once
+        mask = (1 << self.hash_bits) - 1
+        bucket_of = {term: zlib.crc32(term.encode('utf-8')) & mask for term in document_counts}
+        if self.compact:
+            for bucket in bucket_of.values():
+                if bucket not in self._slots:
+                    self._slots[bucket] = len(self._slot_buckets)
+                    self._slot_buckets.append(bucket)
+            if len(self._slots) > len(self._df):
+                self._grow(len(self._slots))
+            bucket_of = {term: self._slots[bucket] for term, bucket in bucket_of.items()}
+        self._name_buckets(document_counts, bucket_of)
+        buckets = [[bucket_of[term] for term in document] for document in documents]
+        lengths = np.array([len(doc) for doc in buckets], dtype=np.int64)
+        if lengths.sum() == 0:
+            self.documents += len(texts)
+            return
+        size = len(self._df)
+        docs = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        flat = np.fromiter((bucket for doc in buckets for bucket in doc), dtype=np.int64, count=int(lengths.sum()))
+        # Sparse term counts: one entry per distinct (document, bucket)
+        pairs, counts = np.unique(docs * size + flat, return_counts=True)
+        pair_docs, pair_buckets = np.divmod(pairs, size)
+
+        # Accumulate over the buckets this chunk touches only
+        touched, slots = np.unique(pair_buckets, return_inverse=True)
+        self._touched = np.union1d(self._touched, touched)
+        self._df[touched] += np.bincount(slots, minlength=len(touched))
+        self._tf[touched] += np.bincount(slots, weights=counts / lengths[pair_docs], minlength=len(touched))
+        if sentiments is not None:
+            rows = np.array([
+                SENTIMENT_LABELS.index(label) if label in SENTIMENT_LABELS else -1
+                for label in (str(result['label']).lower() for result in sentiments)
+            ])
+            scores = np.array([float(result['score']) for result in sentiments])
+            for row in range(len(SENTIMENT_LABELS)):
+                labelled = rows[pair_docs] == row
+                self._label_documents[row, touched] += np.bincount(slots[labelled], minlength=len(touched))
+                self._label_scores[row, touched] += np.bincount(
+                    slots[labelled], weights=scores[pair_docs[labelled]], minlength=len(touched)
+                )
+        self.documents += len(texts)
+
+    def topics(self, max_topics: int = MAX_TOPICS) -> List[Dict[str, Any]]:
+        """Highest-scoring terms with their document counts and sentiment
+
+        Returns:
+            Records with the 'topic' term, TF-IDF 'score', 'documents'
+            containing it and, when sentiments were given, 'sentiment'
+            (mean score per label over those documents, like
+            overall_sentiment) and 'impact_score' (positive - negative)
+        """
+        min_df = self.min_df if self.documents >= self.min_df else 1
+        # Only slots that have seen a term can score
+        seen = self._touched[self._df[self._touched] >= min_df]
+        scores = self._tf[seen] * (np.log((1 + self.documents) / (1 + self._df[seen])) + 1.0)
+        seen, scores = seen[scores > 0], scores[scores > 0]
+        # Best first, ties in bucket order, so both layouts pick the same
+        # topics; spare candidates replace words folded into their phrases below
+        buckets = np.asarray(self._slot_buckets, dtype=np.int64)[seen] if self.compact else seen
+        top = np.lexsort((buckets, -scores))[:TOPIC_POOL * max_topics]
+        seen, scores = seen[top], scores[top]
+        candidates, candidate_scores = seen.tolist(), scores.tolist()
+        names = [self._terms.get(slot, '') for slot in candidates]
+        ranked = sorted(range(len(candidates)), key=lambda i: (-candidate_scores[i], -names[i].count(' ')))
+
+        # A phrase and its words covering the same documents are one topic
+        selected: List[int] = []
+        for i in ranked:
+            words = set(names[i].split())
+            if not any(
+                self._df[candidates[i]] == self._df[candidates[j]] and words & set(names[j].split())
+                for j in selected
+            ):
+                selected.append(i)
+            if len(selected) == max_topics:
+                break
+
+        records = []
+        for i in selected:
+            slot = candidates[i]
+            record = {
+                'topic': names[i],
+                'score': float(candidate_scores[i]),
+                'documents': int(self._df[slot])
+            }
+            labelled = self._label_documents[:, slot].sum()
+            if labelled:
+                sentiment = {
+                    label: float(self._label_scores[row, slot] / labelled)
+                    for row, label in enumerate(SENTIMENT_LABELS)
+                }
+                record['sentiment'] = sentiment
+                record['impact_score'] = sentiment['positive'] - sentiment['negative']
+            records.append(record)
+        return records
+
+def extract_topics(
+    texts: Iterable[str],
+    sentiments: Optional[Iterable[Dict[str, Any]]] = None,
+    max_topics: int = MAX_TOPICS
+) -> List[Dict[str, Any]]:
+    """Key topics of a corpus in one streaming pass (see TopicExtractor)"""
+    return TopicExtractor(compact=True).partial_fit(texts, sentiments).topics(max_topics)